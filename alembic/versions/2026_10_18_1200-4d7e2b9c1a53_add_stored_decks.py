@@ -0,0 +1,45 @@
+"""Add stored decks shared by users
+
+Revision ID: 4d7e2b9c1a53
+Revises: baeafb64d7f7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4d7e2b9c1a53"
+down_revision: Union[str, None] = "baeafb64d7f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "storeddeck",
+        sa.Column("deck_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("size_in_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("deck_id"),
+    )
+    op.add_column(
+        "userfile",
+        sa.Column("deck_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.create_index(op.f("ix_userfile_deck_id"), "userfile", ["deck_id"], unique=False)
+    op.create_foreign_key(
+        "userfile_deck_id_fkey", "userfile", "storeddeck", ["deck_id"], ["deck_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("userfile_deck_id_fkey", "userfile", type_="foreignkey")
+    op.drop_index(op.f("ix_userfile_deck_id"), table_name="userfile")
+    op.drop_column("userfile", "deck_id")
+    op.drop_table("storeddeck")
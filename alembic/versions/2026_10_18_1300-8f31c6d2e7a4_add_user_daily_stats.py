@@ -0,0 +1,38 @@
+"""Add user daily stats
+
+Revision ID: 8f31c6d2e7a4
+Revises: 4d7e2b9c1a53
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f31c6d2e7a4"
+down_revision: Union[str, None] = "4d7e2b9c1a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "userdailystats",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False),
+        sa.Column("correct", sa.Integer(), nullable=False),
+        sa.Column("wrong", sa.Integer(), nullable=False),
+        sa.Column("hints", sa.Integer(), nullable=False),
+        sa.Column("listens", sa.Integer(), nullable=False),
+        sa.Column("skips", sa.Integer(), nullable=False),
+        sa.Column("distinct_words", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("userdailystats")
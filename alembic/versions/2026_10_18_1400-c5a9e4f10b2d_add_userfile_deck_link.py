@@ -0,0 +1,50 @@
+"""Keep compiled deck links apart from original file links
+
+Revision ID: c5a9e4f10b2d
+Revises: 8f31c6d2e7a4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a9e4f10b2d"
+down_revision: Union[str, None] = "8f31c6d2e7a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "userfile",
+        sa.Column("deck_link", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.alter_column(
+        "userfile",
+        "file_link",
+        existing_type=sqlmodel.sql.sqltypes.AutoString(),
+        nullable=True,
+    )
+    op.execute(
+        "UPDATE userfile SET deck_link = file_link, file_link = NULL "
+        "WHERE file_link LIKE '%.wdck%'"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE userfile SET file_link = deck_link "
+        "WHERE file_link IS NULL AND deck_link IS NOT NULL"
+    )
+    op.alter_column(
+        "userfile",
+        "file_link",
+        existing_type=sqlmodel.sql.sqltypes.AutoString(),
+        nullable=False,
+    )
+    op.drop_column("userfile", "deck_link")
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from benchmarks.openai_stub import STUB_BASE_URL, start_stub_server, stub_usage
+
+os.environ.setdefault("OPENAI_TOKEN", "benchmark")
+os.environ["OPENAI_BASE_URL"] = STUB_BASE_URL
+
+from services.gpt_service.client import ask_gpt_async, make_check_prompt  # noqa: E402
+from services.gpt_service.schemas import LLMPriorities  # noqa: E402
+from services.grading_service.batch_grader import BatchAnswerGrader  # noqa: E402
+
+PROMPT_PRICE_PER_1K_TOKENS_USD = 0.0005
+COMPLETION_PRICE_PER_1K_TOKENS_USD = 0.0015
+BATCH_ANSWERS_MARKER = "Відповіді користувачів: "
+
+
+def respond_to_grading(prompt: str) -> str:
+    if BATCH_ANSWERS_MARKER not in prompt or "verdicts" not in prompt:
+        return "✅ Правильно!"
+
+    answers = json.loads(prompt.split(BATCH_ANSWERS_MARKER, 1)[1])
+    return json.dumps(
+        {"verdicts": [{"id": answer["id"], "verdict": "correct"} for answer in answers]}
+    )
+
+
+async def grade_one_by_one(word: str, correct_translation: str, user_translation: str):
+    return await ask_gpt_async(
+        prompt=make_check_prompt(
+            word=word,
+            correct_translation=correct_translation,
+            user_translation=user_translation,
+        ),
+        priority=LLMPriorities.GRADING,
+    )
+
+
+async def run_scenario(name: str, grade, answers_count: int, arrival_rate: float) -> dict:
+    stub_usage.clear()
+    latencies = []
+
+    async def one_answer(index: int):
+        started = time.perf_counter()
+        await grade(
+            word=f"word {index}",
+            correct_translation=f"переклад {index}",
+            user_translation=f"відповідь {index}",
+        )
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    tasks = []
+    for index in range(answers_count):
+        tasks.append(asyncio.create_task(one_answer(index=index)))
+        await asyncio.sleep(random.expovariate(arrival_rate))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    cost = (
+        stub_usage["prompt_tokens"] / 1000 * PROMPT_PRICE_PER_1K_TOKENS_USD
+        + stub_usage["completion_tokens"] / 1000 * COMPLETION_PRICE_PER_1K_TOKENS_USD
+    )
+    latencies.sort()
+    return {
+        "scenario": name,
+        "answers_per_sec": round(answers_count / elapsed, 1),
+        "model_requests": stub_usage["requests"],
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        "cost_per_1k_answers_usd": round(cost / answers_count * 1000, 4),
+    }
+
+
+async def main(answers_count: int, arrival_rate: float, window_ms: int, max_items: int):
+    batch_grader = BatchAnswerGrader(window_in_sec=window_ms / 1000, max_items=max_items)
+    results = [
+        await run_scenario(
+            name="one call per answer",
+            grade=grade_one_by_one,
+            answers_count=answers_count,
+            arrival_rate=arrival_rate,
+        ),
+        await run_scenario(
+            name=f"micro-batched ({window_ms} ms / {max_items} items)",
+            grade=batch_grader.grade,
+            answers_count=answers_count,
+            arrival_rate=arrival_rate,
+        ),
+    ]
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare one-call-per-answer grading with micro-batched grading"
+    )
+    parser.add_argument("--answers", type=int, default=1000)
+    parser.add_argument("--arrival-rate", type=float, default=200)
+    parser.add_argument("--latency-ms", type=int, default=400)
+    parser.add_argument("--window-ms", type=int, default=100)
+    parser.add_argument("--max-items", type=int, default=20)
+    arguments = parser.parse_args()
+
+    start_stub_server(
+        latency_in_sec=arguments.latency_ms / 1000, respond=respond_to_grading
+    )
+    asyncio.run(
+        main(
+            answers_count=arguments.answers,
+            arrival_rate=arguments.arrival_rate,
+            window_ms=arguments.window_ms,
+            max_items=arguments.max_items,
+        )
+    )
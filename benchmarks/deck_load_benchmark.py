@@ -0,0 +1,66 @@
+import argparse
+import statistics
+import time
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+from constants.constants import PATH_TO_WORD_FILES
+from services.deck_service.compiled_deck import CompiledDeck
+from services.deck_service.deck_reader import parse_deck
+
+
+def start_quiz_from_xlsx(file_bytes: bytes) -> dict:
+    pd.read_excel(BytesIO(file_bytes))
+    dataframe = pd.read_excel(BytesIO(file_bytes))
+    return dict(dataframe.itertuples(index=False, name=None))
+
+
+def start_quiz_from_compiled(deck_bytes: bytes) -> dict:
+    return CompiledDeck.from_bytes(deck_bytes).as_dict()
+
+
+def measure(name: str, load, payload: bytes, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        load(payload)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    return {
+        "scenario": name,
+        "payload_bytes": len(payload),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p99_ms": round(timings[int(len(timings) * 0.99) - 1] * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare quiz start from raw xlsx bytes with a compiled deck"
+    )
+    parser.add_argument("--deck", default="B1 LEVEL WORDS.xlsx")
+    parser.add_argument("--repeats", type=int, default=50)
+    arguments = parser.parse_args()
+
+    xlsx_bytes = (Path(PATH_TO_WORD_FILES) / arguments.deck).read_bytes()
+    deck = parse_deck(file_bytes=xlsx_bytes)
+    print(f"{arguments.deck}: {len(deck)} word pairs")
+
+    for result in (
+        measure(
+            name="xlsx, two pandas parses",
+            load=start_quiz_from_xlsx,
+            payload=xlsx_bytes,
+            repeats=arguments.repeats,
+        ),
+        measure(
+            name="compiled deck decode",
+            load=start_quiz_from_compiled,
+            payload=deck.to_bytes(),
+            repeats=arguments.repeats * 20,
+        ),
+    ):
+        print(result)
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from constants.enums import StateKeys
+from services.bot_services.fsm_storage import CompactRedisStorage, encode_state_data
+from services.cache_service.cache_service import fsm_redis_client
+from services.deck_service.quiz_session import QuizSession
+
+BOT_ID = 1
+QUIZ_STATE = "QuizStates:waiting_for_answer"
+
+
+def make_session_data(deck_id: str) -> dict:
+    session = QuizSession.start(deck_id=deck_id, size=random.randint(100, 5000))
+    session.cursor = random.randrange(session.size)
+    return {
+        StateKeys.QUIZ_SESSION.value: session.to_state(),
+        StateKeys.CURRENT_WORD.value: "to look forward to",
+        StateKeys.CURRENT_TRANSLATION.value: "з нетерпінням чекати",
+    }
+
+
+def percentile_ms(timings: list[float], percentile: float) -> float:
+    timings = sorted(timings)
+    return round(timings[max(int(len(timings) * percentile) - 1, 0)] * 1000, 3)
+
+
+async def run_sessions(
+        storage: BaseStorage, keys: list[StorageKey], deck_ids: list[str], rounds: int
+) -> dict:
+    set_timings = []
+    get_timings = []
+    semaphore = asyncio.Semaphore(200)
+
+    async def answer(key: StorageKey):
+        async with semaphore:
+            started = time.perf_counter()
+            await storage.get_state(key=key)
+            data = await storage.get_data(key=key)
+            get_timings.append(time.perf_counter() - started)
+
+            data = data or make_session_data(deck_id=random.choice(deck_ids))
+            started = time.perf_counter()
+            await storage.set_state(key=key, state=QUIZ_STATE)
+            await storage.set_data(key=key, data=data)
+            set_timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(answer(key=key) for key in keys))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "sessions": len(keys),
+        "updates_per_sec": round(len(keys) * rounds / elapsed, 1),
+        "get_p50_ms": percentile_ms(get_timings, 0.5),
+        "get_p99_ms": percentile_ms(get_timings, 0.99),
+        "set_p50_ms": percentile_ms(set_timings, 0.5),
+        "set_p99_ms": percentile_ms(set_timings, 0.99),
+    }
+
+
+async def main(storage_name: str, sessions: int, rounds: int):
+    keys = [
+        StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+        for user_id in range(1, sessions + 1)
+    ]
+    deck_ids = [f"{random.getrandbits(160):040x}" for _ in range(50)]
+
+    if storage_name == "redis":
+        storage = CompactRedisStorage(redis=fsm_redis_client)
+        await fsm_redis_client.flushdb()
+    else:
+        storage = MemoryStorage()
+
+    result = await run_sessions(
+        storage=storage, keys=keys, deck_ids=deck_ids, rounds=rounds
+    )
+
+    sample = make_session_data(deck_id=deck_ids[0])
+    result["json_bytes_per_session"] = len(json.dumps(sample).encode())
+    result["compact_bytes_per_session"] = len(encode_state_data(data=sample))
+    if storage_name == "redis":
+        info = await fsm_redis_client.info(section="memory")
+        result["redis_used_memory_per_session"] = info["used_memory"] // sessions
+
+    await storage.close()
+    print({"storage": storage_name, **result})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure FSM storage latency and footprint for many quiz sessions"
+    )
+    parser.add_argument("--storage", choices=("redis", "memory"), default="redis")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    arguments = parser.parse_args()
+
+    asyncio.run(
+        main(
+            storage_name=arguments.storage,
+            sessions=arguments.sessions,
+            rounds=arguments.rounds,
+        )
+    )
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.openai_stub import STUB_BASE_URL, start_stub_server
+
+os.environ.setdefault("OPENAI_TOKEN", "benchmark")
+os.environ["OPENAI_BASE_URL"] = STUB_BASE_URL
+os.environ.setdefault("OPENAI_REQUESTS_PER_MINUTE", "1000000")
+
+from openai import OpenAI  # noqa: E402
+
+from services.gpt_service.client import ask_gpt_async  # noqa: E402
+
+
+def make_executor_call():
+    sync_client = OpenAI(
+        api_key=os.environ["OPENAI_TOKEN"], base_url=os.environ["OPENAI_BASE_URL"]
+    )
+
+    async def ask_gpt_in_executor(prompt: str) -> str:
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(
+            executor=None,
+            func=lambda: sync_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0,
+            ),
+        )
+        return response.choices[0].message.content.strip()
+
+    return ask_gpt_in_executor
+
+
+async def run_scenario(name: str, ask, requests_count: int, concurrency: int) -> dict:
+    latencies = []
+    probe_latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = asyncio.Event()
+
+    async def one_request(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await ask(prompt=f"benchmark prompt {index}")
+            latencies.append(time.perf_counter() - started)
+
+    async def probe_default_executor():
+        loop = asyncio.get_running_loop()
+        while not finished.is_set():
+            started = time.perf_counter()
+            await loop.run_in_executor(None, lambda: None)
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+
+    probe = asyncio.create_task(probe_default_executor())
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request(index) for index in range(requests_count)))
+    elapsed = time.perf_counter() - started
+    finished.set()
+    await probe
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "throughput_rps": round(requests_count / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+        "executor_probe_p50_ms": round(statistics.median(probe_latencies) * 1000, 1),
+        "executor_probe_max_ms": round(max(probe_latencies) * 1000, 1),
+    }
+
+
+async def main(requests_count: int, concurrency: int):
+    results = [
+        await run_scenario(
+            name="run_in_executor + sync OpenAI",
+            ask=make_executor_call(),
+            requests_count=requests_count,
+            concurrency=concurrency,
+        ),
+        await run_scenario(
+            name="AsyncOpenAI + shared pool",
+            ask=ask_gpt_async,
+            requests_count=requests_count,
+            concurrency=concurrency,
+        ),
+    ]
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare executor-wrapped and native async OpenAI calls against a local stub"
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=int, default=300)
+    arguments = parser.parse_args()
+
+    start_stub_server(latency_in_sec=arguments.latency_ms / 1000)
+
+    asyncio.run(main(requests_count=arguments.requests, concurrency=arguments.concurrency))
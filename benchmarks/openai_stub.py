@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from aiohttp import web
+
+STUB_HOST = "127.0.0.1"
+STUB_PORT = 18080
+STUB_BASE_URL = f"http://{STUB_HOST}:{STUB_PORT}/v1"
+CHARACTERS_PER_TOKEN = 3
+
+stub_usage = Counter()
+
+
+def answer_correct(prompt: str) -> str:
+    return "✅ Правильно!"
+
+
+def make_stub_app(
+        latency_in_sec: float, respond: Callable[[str], str] = answer_correct
+) -> web.Application:
+    async def chat_completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        content = respond(prompt)
+        await asyncio.sleep(latency_in_sec)
+
+        prompt_tokens = len(prompt) // CHARACTERS_PER_TOKEN + 1
+        completion_tokens = len(content) // CHARACTERS_PER_TOKEN + 1
+        stub_usage.update(
+            requests=1,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+        return web.json_response(
+            {
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-3.5-turbo"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+def run_stub_server(latency_in_sec: float, respond: Callable[[str], str] = answer_correct):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    runner = web.AppRunner(make_stub_app(latency_in_sec=latency_in_sec, respond=respond))
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, STUB_HOST, STUB_PORT).start())
+    loop.run_forever()
+
+
+def start_stub_server(latency_in_sec: float, respond: Callable[[str], str] = answer_correct):
+    threading.Thread(
+        target=run_stub_server, args=(latency_in_sec, respond), daemon=True
+    ).start()
+    time.sleep(0.5)
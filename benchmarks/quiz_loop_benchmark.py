@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_TOKEN", "benchmark")
+os.environ["LLM_BACKEND"] = "offline"
+os.environ.setdefault("OPENAI_REQUESTS_PER_MINUTE", "1000000")
+os.environ.setdefault("OPENAI_MAX_IN_FLIGHT", "256")
+os.environ.setdefault("OPENAI_SHED_QUEUE_DEPTH", "100000")
+
+parser = argparse.ArgumentParser(
+    description="Run the quiz answer loop against the offline LLM backend (needs Redis)"
+)
+parser.add_argument("--users", type=int, default=200)
+parser.add_argument("--answers-per-user", type=int, default=50)
+parser.add_argument("--latency-ms", type=int, default=300)
+parser.add_argument("--hint-rate", type=float, default=0.1)
+parser.add_argument("--typo-rate", type=float, default=0.2)
+parser.add_argument("--wrong-rate", type=float, default=0.2)
+parser.add_argument("--deck", default="B1 LEVEL WORDS.xlsx")
+arguments = parser.parse_args()
+
+os.environ["LLM_OFFLINE_LATENCY_IN_SEC"] = str(arguments.latency_ms / 1000)
+
+from constants.constants import PATH_TO_WORD_FILES  # noqa: E402
+from processors.answer_grading_processor import (  # noqa: E402
+    AnswerGradingProcessor,
+    grading_metrics,
+)
+from services.bot_services.files import read_word_pairs  # noqa: E402
+from services.cache_service.generation_cache import hint_cache  # noqa: E402
+from services.gpt_service.client import openai_metrics  # noqa: E402
+
+
+def make_user_answer(translation: str) -> str:
+    roll = random.random()
+    if roll < arguments.wrong_rate:
+        return "щось зовсім інше"
+
+    if roll < arguments.wrong_rate + arguments.typo_rate and len(translation) > 3:
+        position = random.randrange(len(translation))
+        return translation[:position] + translation[position + 1:]
+
+    return translation
+
+
+async def run_user(word_pairs: list[tuple[str, str]], latencies: list[float]):
+    for _ in range(arguments.answers_per_user):
+        word, translation = random.choice(word_pairs)
+
+        if random.random() < arguments.hint_rate:
+            await hint_cache.get(word=word, translation=translation)
+
+        started = time.perf_counter()
+        await AnswerGradingProcessor.grade_answer(
+            word=word,
+            correct_translation=translation,
+            user_translation=make_user_answer(translation=translation),
+        )
+        latencies.append(time.perf_counter() - started)
+
+
+async def main():
+    word_pairs = read_word_pairs(file_path=Path(PATH_TO_WORD_FILES) / arguments.deck)
+    latencies = []
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(run_user(word_pairs=word_pairs, latencies=latencies) for _ in range(arguments.users))
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    grading = grading_metrics.snapshot()
+    print(
+        {
+            "answers": len(latencies),
+            "answers_per_sec": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+            "grading_sources": grading["counters"],
+            "llm_requests": openai_metrics.count("requests"),
+            "hint_cache_hit_ratio": round(hint_cache.get_hit_ratio(), 3),
+        }
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main())
@@ -5,3 +5,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TOKEN = getenv(key="BOT_TOKEN")
+
+HINT_STREAMING_ENABLED = getenv(key="HINT_STREAMING_ENABLED", default="false") == "true"
+HINT_EDIT_INTERVAL_IN_SEC = float(getenv(key="HINT_EDIT_INTERVAL_IN_SEC", default="1.2"))
+
+AUDIO_TTS_WORKERS = int(getenv(key="AUDIO_TTS_WORKERS", default="4"))
+AUDIO_FFMPEG_CONCURRENCY = int(getenv(key="AUDIO_FFMPEG_CONCURRENCY", default="4"))
+AUDIO_FFMPEG_TIMEOUT_IN_SEC = float(
+    getenv(key="AUDIO_FFMPEG_TIMEOUT_IN_SEC", default="20")
+)
+
+FSM_STORAGE = getenv(key="FSM_STORAGE", default="redis")
+FSM_SESSION_TTL_IN_SEC = int(
+    getenv(key="FSM_SESSION_TTL_IN_SEC", default=str(7 * 86400))
+)
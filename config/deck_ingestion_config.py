@@ -0,0 +1,19 @@
+from os import getenv
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DECK_MAX_FILE_SIZE_IN_BYTES = int(
+    getenv(key="DECK_MAX_FILE_SIZE_IN_BYTES", default=str(5 * 1024 * 1024))
+)
+DECK_MAX_DECOMPRESSED_SIZE_IN_BYTES = int(
+    getenv(key="DECK_MAX_DECOMPRESSED_SIZE_IN_BYTES", default=str(50 * 1024 * 1024))
+)
+DECK_MAX_ROWS = int(getenv(key="DECK_MAX_ROWS", default="20000"))
+DECK_PARSE_TIMEOUT_IN_SEC = float(getenv(key="DECK_PARSE_TIMEOUT_IN_SEC", default="10"))
+DECK_INGESTION_WORKERS = int(getenv(key="DECK_INGESTION_WORKERS", default="2"))
+DECK_INGESTION_MAX_PENDING = int(getenv(key="DECK_INGESTION_MAX_PENDING", default="8"))
+DECK_INGESTION_TASKS_PER_WORKER = int(
+    getenv(key="DECK_INGESTION_TASKS_PER_WORKER", default="100")
+)
@@ -21,3 +21,42 @@ ELASTIC_INDEXES = {
     ElasticAvailableIndexes.PURCHASES.value,
     ElasticAvailableIndexes.USER_ACTIVITY.value,
 }
+
+ACTIVITY_QUEUE_MAX_EVENTS = int(os.getenv("ACTIVITY_QUEUE_MAX_EVENTS", "20000"))
+ACTIVITY_BULK_MAX_EVENTS = int(os.getenv("ACTIVITY_BULK_MAX_EVENTS", "500"))
+ACTIVITY_FLUSH_INTERVAL_IN_SEC = float(
+    os.getenv("ACTIVITY_FLUSH_INTERVAL_IN_SEC", "2")
+)
+ACTIVITY_BULK_MAX_RETRIES = int(os.getenv("ACTIVITY_BULK_MAX_RETRIES", "3"))
+ACTIVITY_SHUTDOWN_TIMEOUT_IN_SEC = float(
+    os.getenv("ACTIVITY_SHUTDOWN_TIMEOUT_IN_SEC", "10")
+)
+
+ACTIVITY_SPOOL_DIR = os.getenv("ACTIVITY_SPOOL_DIR", "spool/activity")
+ACTIVITY_SPOOL_SEGMENT_MAX_BYTES = int(
+    os.getenv("ACTIVITY_SPOOL_SEGMENT_MAX_BYTES", str(8 * 1024 * 1024))
+)
+ACTIVITY_SPOOL_MAX_BYTES = int(
+    os.getenv("ACTIVITY_SPOOL_MAX_BYTES", str(512 * 1024 * 1024))
+)
+ACTIVITY_SPOOL_SEGMENT_MAX_AGE_IN_SEC = float(
+    os.getenv("ACTIVITY_SPOOL_SEGMENT_MAX_AGE_IN_SEC", "300")
+)
+ACTIVITY_REPLAY_INTERVAL_IN_SEC = float(
+    os.getenv("ACTIVITY_REPLAY_INTERVAL_IN_SEC", "30")
+)
+
+USER_ACTIVITY_ROLLOVER_MAX_AGE = os.getenv("USER_ACTIVITY_ROLLOVER_MAX_AGE", "1d")
+USER_ACTIVITY_ROLLOVER_MAX_SHARD_SIZE = os.getenv(
+    "USER_ACTIVITY_ROLLOVER_MAX_SHARD_SIZE", "10gb"
+)
+USER_ACTIVITY_WARM_AFTER = os.getenv("USER_ACTIVITY_WARM_AFTER", "7d")
+USER_ACTIVITY_DELETE_AFTER = os.getenv("USER_ACTIVITY_DELETE_AFTER", "365d")
+
+ACTIVITY_RAW_EVENT_SAMPLE_RATE = float(
+    os.getenv("ACTIVITY_RAW_EVENT_SAMPLE_RATE", "0.05")
+)
+ACTIVITY_ROLLUP_IDLE_IN_SEC = int(os.getenv("ACTIVITY_ROLLUP_IDLE_IN_SEC", "3600"))
+ACTIVITY_ROLLUP_LIVES_IN_SEC = int(
+    os.getenv("ACTIVITY_ROLLUP_LIVES_IN_SEC", str(2 * 86400))
+)
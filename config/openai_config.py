@@ -5,3 +5,41 @@ from dotenv import load_dotenv
 load_dotenv()
 
 OPENAI_TOKEN = os.getenv(key="OPENAI_TOKEN")
+OPENAI_BASE_URL = os.getenv(key="OPENAI_BASE_URL")
+OPENAI_MODEL = os.getenv(key="OPENAI_MODEL", default="gpt-3.5-turbo")
+OPENAI_GENERATION_TEMPERATURE = float(
+    os.getenv(key="OPENAI_GENERATION_TEMPERATURE", default="0.9")
+)
+
+OPENAI_MAX_IN_FLIGHT = int(os.getenv(key="OPENAI_MAX_IN_FLIGHT", default="16"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv(key="OPENAI_MAX_CONNECTIONS", default="32"))
+OPENAI_TIMEOUT_IN_SEC = float(os.getenv(key="OPENAI_TIMEOUT_IN_SEC", default="15"))
+OPENAI_MAX_RETRIES = int(os.getenv(key="OPENAI_MAX_RETRIES", default="3"))
+OPENAI_RETRY_BASE_DELAY_IN_SEC = float(
+    os.getenv(key="OPENAI_RETRY_BASE_DELAY_IN_SEC", default="0.5")
+)
+
+# Shared by every process through a Redis token bucket, so this is the
+# account-wide budget rather than a per-process one.
+OPENAI_REQUESTS_PER_MINUTE = int(
+    os.getenv(key="OPENAI_REQUESTS_PER_MINUTE", default="3500")
+)
+OPENAI_RATE_BURST = int(os.getenv(key="OPENAI_RATE_BURST", default="20"))
+OPENAI_RATE_BUCKET_TIMEOUT_IN_SEC = float(
+    os.getenv(key="OPENAI_RATE_BUCKET_TIMEOUT_IN_SEC", default="0.1")
+)
+OPENAI_SHED_QUEUE_DEPTH = int(os.getenv(key="OPENAI_SHED_QUEUE_DEPTH", default="64"))
+
+BATCH_GRADING_ENABLED = os.getenv(key="BATCH_GRADING_ENABLED", default="false") == "true"
+BATCH_GRADING_WINDOW_IN_SEC = float(
+    os.getenv(key="BATCH_GRADING_WINDOW_IN_SEC", default="0.1")
+)
+BATCH_GRADING_MAX_ITEMS = int(os.getenv(key="BATCH_GRADING_MAX_ITEMS", default="20"))
+
+LLM_BACKEND = os.getenv(key="LLM_BACKEND", default="openai")
+LLM_OFFLINE_LATENCY_IN_SEC = float(
+    os.getenv(key="LLM_OFFLINE_LATENCY_IN_SEC", default="0.3")
+)
+LLM_OFFLINE_LATENCY_JITTER_IN_SEC = float(
+    os.getenv(key="LLM_OFFLINE_LATENCY_JITTER_IN_SEC", default="0.1")
+)
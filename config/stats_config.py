@@ -0,0 +1,10 @@
+from os import getenv
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATS_TIMEZONE = getenv(key="STATS_TIMEZONE", default="Europe/Kyiv")
+STATS_DAY_LIVES_IN_SEC = int(
+    getenv(key="STATS_DAY_LIVES_IN_SEC", default=str(7 * 86400))
+)
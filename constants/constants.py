@@ -1,8 +1,17 @@
-AVAILABLE_FILE_FORMATS = ".xlsx"
+AVAILABLE_FILE_FORMATS = ("xlsx", "csv", "tsv")
 
 INSTRUCTION_FILE_NAME = "example file with words.xlsx"
 PATH_TO_INSTRUCTION_FILE = f"constants/files/{INSTRUCTION_FILE_NAME}"
 
+PATH_TO_WORD_FILES = "constants/files"
+BUILT_IN_WORD_FILES = [
+    "A2 LEVEL WORDS.xlsx",
+    "B1 LEVEL WORDS.xlsx",
+    "HOUSE WORDS.xlsx",
+    "TRAVEL WORDS.xlsx",
+]
+PATH_TO_ACCEPTED_ANSWERS_INDEX = f"{PATH_TO_WORD_FILES}/accepted_answers.json"
+
 MONTH_IN_SECOND = 2629800
 
 SIMPLE_SUB_COST = 1
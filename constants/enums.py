@@ -7,9 +7,9 @@ class FileTypes(Enum):
 
 
 class StateKeys(Enum):
-    QUIZ_DATA = "quiz_data"
+    QUIZ_SESSION = "quiz_session"
+    QUIZ_DECK_ID = "deck_id"
     FILE_TYPE = "file_type"
     ROW_INDEX = "index"
-    UPLOADED_FILE_DATA = "uploaded_file"
     CURRENT_WORD = "original_word"
     CURRENT_TRANSLATION = "translation_word"
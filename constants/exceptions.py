@@ -24,3 +24,19 @@ class UserNotExists(Exception):
 
 class NotValidPromocodeRequest(Exception):
     pass
+
+
+class LLMRequestShed(Exception):
+    pass
+
+
+class NotValidDeckFormat(FileExceptions):
+    pass
+
+
+class DeckIngestionRejected(FileExceptions):
+    pass
+
+
+class DeckIngestionBusy(FileExceptions):
+    pass
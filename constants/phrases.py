@@ -107,11 +107,14 @@ class InteractivePhrases(Enum):
     ASK_TO_SEND_FILE = "📝 Чудово! Зараз я перевірю тебе на словах. Надішли мені Excel-файл. \n\n<i>*Можеш переслати вже надісланий файл з нашого чату)</i>"
     START_QUIZ = "✅ Єєєє, погнали!\nЩоб зупинити гру — напиши команду \n\n/stop_quiz\n\n <i>або натисни кнопку 'Зупинити вікторину' у меню</i>"
     FINISH_QUIZ = "✅ Вікторина завершена! 🎉"
+    LLM_BUSY = "⏳ Зараз дуже багато запитів. Спробуй ще раз за хвилинку"
     START_FIRST_QUIZ_WORD = "✅ Переклади це слово:\n\n👉 <b>{current_word}</b>"
     CORRECT_USER_WORD = "Наступне слово 👉 <b>{next_original_word}</b>"
     INCORRECT_USER_WORD = "Правильна відповідь: <b>{correct_answer}</b>\n\nПереклади 👉 <b>{next_word}</b>"
     PASSED_USER_WORD = "Правильна відповідь була: <b>{correct_answer}</b>\n\nНаступне слово 👉 <b>{next_word}</b>"
     EMPTY_FILE = "❌ Файл не знайдено. Будь ласка, перезапусти вікторину."
+    FILE_REJECTED = "❌ Не вдалося прочитати файл: {reason}"
+    FILE_PROCESSING_BUSY = "⏳ Зараз обробляється багато файлів. Надішли файл ще раз за хвилинку"
     SUCCESS_GET_PREVIOUS_FILE = "✅ Попередній файл завантажено з сервера"
     SUCCESS_PURCHASE_PAYMENT = "✅ Успішна покупка"
     STOP_QUIZ = "🛑 Вікторина зупинена"
@@ -126,7 +129,7 @@ class InteractivePhrases(Enum):
 
     FILE_SEND_INSTRUCTION = (
         "📖 *Як користуватись цим режимом?*\n\n"
-        "1️⃣ Надішли мені `.xlsx` файл зі словами та перекладами\n"
+        "1️⃣ Надішли мені `.xlsx`, `.csv` або `.tsv` файл зі словами та перекладами\n"
         "2️⃣ Я буду показувати слова — ти пиши переклад\n\n"
         "_Просто скинь файл і я вже готовий)_\n"
         "📂 Ось приклад файлу, щоб почати 👇"
@@ -1,18 +1,22 @@
 import asyncio
 import random
+from html import escape
 
 from aiogram import F
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import CommandStart, Command
 from aiogram.fsm.context import FSMContext
-from aiogram.types import Message, FSInputFile, CallbackQuery
+from aiogram.types import Message, CallbackQuery
 
 from bot.processors.user_processor import UserProcessor
+from config.bot_config import HINT_STREAMING_ENABLED
 from constants.constants import (
     PATH_TO_INSTRUCTION_FILE,
     INSTRUCTION_FILE_NAME,
+    SUPERUSER_IDS,
 )
 from constants.enums import StateKeys
+from constants.exceptions import LLMRequestShed
 from constants.phrases import (
     InteractivePhrases,
     MOTIVATION_PHRASES_FOR_MISTAKES,
@@ -27,14 +31,19 @@ from services.bot_services.auidio import (
 from services.bot_services.bot_initializer import dispatcher
 from services.bot_services.bot_initializer import initialize_bot
 from services.bot_services.buttons import ButtonOrchestrator
-from services.bot_services.files import upload_files_to_cache
+from services.bot_services.message_streaming import ThrottledMessageEditor
 from services.bot_services.states import AvailableStates
+from services.bot_services.telegram_files import StaticFileRegistry
+from services.cache_service.generation_cache import hint_cache, sentence_cache
 from services.database import init_tables
+from services.deck_service.quiz_session import QuizSession
+from services.deck_service.deck_store import DeckStore
+from services.elastic_service.activity_pipeline import activity_pipeline
 from services.elastic_service.elastic_service import (
     create_elastic_indexes_if_not_exists,
 )
-from services.gpt_service.client import ask_gpt_async
-from services.gpt_service.prompts import CREATE_SENTENCE_PROMPT, DESCRIBE_WORD_PROMPT
+from services.grading_service.accepted_answers import AcceptedAnswersIndex
+from services.metrics import format_metrics_report
 from services.utils import escape_markdown_v2, mask_word
 
 
@@ -78,6 +87,18 @@ async def help_cmd(message: Message):
     return
 
 
+@dispatcher.message(Command("metrics"))
+async def metrics_cmd(message: Message):
+    if message.chat.id not in SUPERUSER_IDS:
+        return
+
+    await message.answer(
+        text=f"<pre>{escape(format_metrics_report())}</pre>",
+        disable_notification=True,
+    )
+    return
+
+
 @dispatcher.callback_query(F.data == "start_quiz_with_new_file")
 async def start_quiz_with_new_file(callback, state: FSMContext):
     UserActivityProcessor.user_tap_add_file_button(callback.message.chat.id)
@@ -88,11 +109,11 @@ async def start_quiz_with_new_file(callback, state: FSMContext):
         disable_notification=True,
     )
 
-    sample_file = FSInputFile(
-        path=PATH_TO_INSTRUCTION_FILE, filename=INSTRUCTION_FILE_NAME
-    )
-    await callback.message.answer_document(
-        document=sample_file, disable_notification=True
+    await StaticFileRegistry.send_document(
+        message=callback.message,
+        path=PATH_TO_INSTRUCTION_FILE,
+        filename=INSTRUCTION_FILE_NAME,
+        disable_notification=True,
     )
 
     result = await QuizProcessor.start_quiz_with_new_file(
@@ -167,6 +188,48 @@ async def handle_quiz_answer_or_stop(message: Message, state: FSMContext):
     await QuizProcessor.process_user_answer(message=message, state=state)
 
 
+def render_hint_message(current_word: str, hint_text: str, translation: str) -> str:
+    safe_hint_text = escape_markdown_v2(text=hint_text)
+
+    return (
+        f"Підказка до слова *{escape_markdown_v2(current_word)}*:\n\n"
+        f"> _{safe_hint_text}_\n\n\n\n"
+        f"👀👀👀 {mask_word(word=translation)}\n\n"
+    )
+
+
+async def edit_hint_with_stream(
+        callback: CallbackQuery, current_word: str, translation: str
+):
+    editor = ThrottledMessageEditor(message=callback.message)
+    hint_text = None
+    await callback.answer()
+
+    async for hint_text in hint_cache.stream(
+            word=current_word, translation=translation
+    ):
+        await editor.edit(
+            text=render_hint_message(
+                current_word=current_word,
+                hint_text=f"{hint_text.strip()} …",
+                translation=translation,
+            ),
+            parse_mode="MarkdownV2",
+            reply_markup=ButtonOrchestrator.generate_word_buttons(),
+        )
+
+    await editor.edit(
+        text=render_hint_message(
+            current_word=current_word,
+            hint_text=(hint_text or "").strip(),
+            translation=translation,
+        ),
+        parse_mode="MarkdownV2",
+        reply_markup=ButtonOrchestrator.generate_word_buttons(),
+        force=True,
+    )
+
+
 @dispatcher.callback_query(F.data == "get_hint")
 async def handle_get_hint(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
@@ -177,17 +240,21 @@ async def handle_get_hint(callback: CallbackQuery, state: FSMContext):
         callback.message.chat.id, original_word=current_word
     )
 
-    hint_text = await ask_gpt_async(
-        prompt=DESCRIBE_WORD_PROMPT(current_word=current_word, translation=translation)
-    )
+    try:
+        if HINT_STREAMING_ENABLED:
+            await edit_hint_with_stream(
+                callback=callback, current_word=current_word, translation=translation
+            )
+            return
 
-    safe_hint_text = escape_markdown_v2(text=hint_text)
+        hint_text = await hint_cache.get(word=current_word, translation=translation)
+    except LLMRequestShed:
+        await callback.answer(text=InteractivePhrases.LLM_BUSY.value, show_alert=True)
+        return
 
     await callback.message.edit_text(
-        text=(
-            f"Підказка до слова *{escape_markdown_v2(current_word)}*:\n\n"
-            f"> _{safe_hint_text}_\n\n\n\n"
-            f"👀👀👀 {mask_word(word=translation)}\n\n"
+        text=render_hint_message(
+            current_word=current_word, hint_text=hint_text, translation=translation
         ),
         parse_mode="MarkdownV2",
         reply_markup=ButtonOrchestrator.generate_word_buttons(),
@@ -204,11 +271,14 @@ async def handle_listen_word(callback: CallbackQuery, state: FSMContext):
         callback.message.chat.id, original_word=current_word
     )
 
-    sentence_example = await ask_gpt_async(
-        prompt=CREATE_SENTENCE_PROMPT(
-            current_word=current_word, translation=translation
+    try:
+        sentence_example = await sentence_cache.get(
+            word=current_word, translation=translation
         )
-    )
+    except LLMRequestShed:
+        await callback.answer(text=InteractivePhrases.LLM_BUSY.value, show_alert=True)
+        return
+
     sentence = normalize_word_for_pronunciation(word=sentence_example)
     await synth_and_send_voice(message=callback.message, text=sentence)
 
@@ -216,27 +286,21 @@ async def handle_listen_word(callback: CallbackQuery, state: FSMContext):
 @dispatcher.callback_query(F.data == "skip_word")
 async def handle_skip_word(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    quiz_data: dict = data.get(StateKeys.QUIZ_DATA.value, {})
+    session = QuizSession.from_state(data.get(StateKeys.QUIZ_SESSION.value))
     current_word: str = data.get(StateKeys.CURRENT_WORD.value)
+    correct_answer: str = data.get(StateKeys.CURRENT_TRANSLATION.value)
     UserActivityProcessor.user_passed_word(
         callback.message.chat.id, original_word=current_word
     )
 
-    if not quiz_data or current_word not in quiz_data:
-        try:
-            await callback.message.edit_text(
-                InteractivePhrases.FINISH_QUIZ.value, reply_markup=None
-            )
-        except TelegramBadRequest as e:
-            if "message is not modified" not in str(e).lower():
-                raise
-        await state.clear()
-        await callback.answer()
-        return
-
-    correct_answer = quiz_data.pop(current_word)
+    next_word_pair = (
+        await QuizProcessor.get_next_word_pair(session=session)
+        if session and current_word
+        else None
+    )
 
-    if not quiz_data:
+    if next_word_pair is None:
+        UserActivityProcessor.quiz_finished(user_id=callback.message.chat.id)
         try:
             await callback.message.edit_text(
                 InteractivePhrases.FINISH_QUIZ.value, reply_markup=None
@@ -248,13 +312,11 @@ async def handle_skip_word(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    next_word = random.choice(list(quiz_data.keys()))
+    next_word, next_translation = next_word_pair
     await state.set_data(
-        {
-            StateKeys.QUIZ_DATA.value: quiz_data,
-            StateKeys.CURRENT_WORD.value: next_word,
-            StateKeys.CURRENT_TRANSLATION.value: quiz_data[next_word],
-        }
+        QuizProcessor.make_quiz_state(
+            session=session, word=next_word, translation=next_translation
+        )
     )
 
     text = (
@@ -279,9 +341,13 @@ async def handle_skip_word(callback: CallbackQuery, state: FSMContext):
 
 if __name__ == "__main__":
     # docker exec -it clanitylang-postgres-1 psql -U <username> <database_user>
-    upload_files_to_cache()
+    DeckStore.warm_built_in_decks()
+    AcceptedAnswersIndex.load_from_disk()
     init_tables()
     create_elastic_indexes_if_not_exists()
     StorageServiceProcessor.init_minio_bucket()
 
-    asyncio.run(initialize_bot())
+    try:
+        asyncio.run(initialize_bot())
+    finally:
+        activity_pipeline.close()
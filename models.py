@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional, List
 
@@ -27,11 +27,22 @@ class UserFile(SQLModel, table=True):
         )
     )
 
-    file_link: str = Field(nullable=False)
+    file_link: Optional[str] = Field(default=None, nullable=True)
+    deck_id: Optional[str] = Field(
+        default=None, foreign_key="storeddeck.deck_id", index=True, nullable=True
+    )
+    deck_link: Optional[str] = Field(default=None, nullable=True)
 
     user: Optional["UserData"] = Relationship(back_populates="files")
 
 
+class StoredDeck(SQLModel, table=True):
+    deck_id: str = Field(primary_key=True)
+    ref_count: int = Field(default=0, nullable=False)
+    size_in_bytes: int = Field(nullable=False)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
 class PurchaseRegistry(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -73,3 +84,15 @@ class UserSession(SQLModel, table=True):
     )
     chat_id: int = Field(sa_column=Column(BigInteger, index=True))
     session_datetime: datetime = Field(nullable=False)
+
+
+class UserDailyStats(SQLModel, table=True):
+    user_id: int = Field(sa_column=Column(BigInteger, primary_key=True))
+    day: date = Field(primary_key=True)
+    answered: int = Field(default=0, nullable=False)
+    correct: int = Field(default=0, nullable=False)
+    wrong: int = Field(default=0, nullable=False)
+    hints: int = Field(default=0, nullable=False)
+    listens: int = Field(default=0, nullable=False)
+    skips: int = Field(default=0, nullable=False)
+    distinct_words: int = Field(default=0, nullable=False)
@@ -0,0 +1,84 @@
+import time
+
+from config.openai_config import BATCH_GRADING_ENABLED
+from services.cache_service.verdict_cache import VerdictCache
+from services.gpt_service.client import ask_gpt_async, make_check_prompt
+from services.gpt_service.schemas import LLMPriorities
+from services.grading_service.accepted_answers import AcceptedAnswersIndex
+from services.grading_service.batch_grader import get_batch_answer_grader
+from services.grading_service.local_grader import LocalAnswerGrader
+from services.grading_service.schemas import AnswerVerdicts
+from services.metrics import get_metrics
+
+grading_metrics = get_metrics(name="answer_grading", log_every=500)
+
+
+def record_grading_source(source: str, started: float):
+    elapsed = time.perf_counter() - started
+    grading_metrics.observe(key=source, seconds=elapsed)
+    grading_metrics.observe(key="total", seconds=elapsed)
+    grading_metrics.incr(key=source)
+
+
+class AnswerGradingProcessor:
+    @staticmethod
+    async def grade_answer(
+            word: str, correct_translation: str, user_translation: str
+    ) -> str:
+        started = time.perf_counter()
+
+        verdict = LocalAnswerGrader.grade(
+            correct_translation=correct_translation,
+            user_translation=user_translation,
+        )
+        if verdict:
+            record_grading_source(source="local", started=started)
+            return verdict.render(correct_translation=correct_translation)
+
+        verdict = AcceptedAnswersIndex.grade(
+            word=word,
+            correct_translation=correct_translation,
+            user_translation=user_translation,
+        )
+        if verdict:
+            record_grading_source(source="index", started=started)
+            return verdict.render(correct_translation=correct_translation)
+
+        cached_verdict = VerdictCache.get(
+            word=word,
+            correct_translation=correct_translation,
+            user_translation=user_translation,
+        )
+        if cached_verdict:
+            record_grading_source(source="cache", started=started)
+            return cached_verdict
+
+        if BATCH_GRADING_ENABLED:
+            result = await get_batch_answer_grader().grade(
+                word=word,
+                correct_translation=correct_translation,
+                user_translation=user_translation,
+            )
+        else:
+            result = await ask_gpt_async(
+                prompt=make_check_prompt(
+                    word=word,
+                    correct_translation=correct_translation,
+                    user_translation=user_translation,
+                ),
+                priority=LLMPriorities.GRADING,
+            )
+        if AnswerVerdicts.is_verdict(text=result):
+            VerdictCache.set(
+                word=word,
+                correct_translation=correct_translation,
+                user_translation=user_translation,
+                verdict=result,
+            )
+
+        record_grading_source(source="gpt", started=started)
+        return result
+
+    @staticmethod
+    def get_local_share() -> float:
+        return grading_metrics.ratio("local", "local", "index", "cache", "gpt")
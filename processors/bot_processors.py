@@ -1,36 +1,39 @@
-import io
+import asyncio
 import logging
-import os
 import random
-import tempfile
-from io import BytesIO
+from functools import partial
 from typing import BinaryIO
 
-import pandas as pd
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Document, Message, File
-from pandas.core.interchange.dataframe_protocol import DataFrame
 
-from config.storage_service_config import MINIO_BUCKET_NAME
 from constants.constants import AVAILABLE_FILE_FORMATS
 from constants.enums import StateKeys
-from constants.exceptions import NotValidFileContentType, NotValidColumnSet
+from constants.exceptions import (
+    DeckIngestionBusy,
+    DeckIngestionRejected,
+    NotValidFileContentType,
+)
 from constants.phrases import (
     InteractivePhrases,
     SUCCESS_PHRASES,
     CORRECT_WORD_PHRASES,
     MOTIVATION_PHRASES_FOR_MISTAKES,
 )
+from processors.answer_grading_processor import AnswerGradingProcessor
 from processors.instances_db_processors import FileDBProcessor
 from processors.user_activity_processor import UserActivityProcessor
 from services.bot_services.bot_initializer import bot
 from services.bot_services.buttons import ButtonOrchestrator
 from services.bot_services.states import AvailableStates
-from services.cache_service.cache_service import words_redis_client
-from services.cache_service.schemas import WordsCache
 from services.database import get_database_session
-from services.gpt_service.client import make_check_prompt, ask_gpt_async
-from services.storage_service import storage_client
+from services.deck_service.compiled_deck import CompiledDeck
+from services.deck_service.deck_archive import DeckArchive, LegacyUserFiles
+from services.deck_service.deck_ingestion import check_file_size, get_deck_ingestion_pool
+from services.deck_service.deck_reader import get_file_format, normalize_file_format
+from services.deck_service.deck_store import DeckStore
+from services.deck_service.quiz_session import QuizSession
+from services.utils import normalize_apostrophes
 
 logging.basicConfig(level=logging.INFO)
 
@@ -38,39 +41,23 @@ logging.basicConfig(level=logging.INFO)
 class FileValidator:
     @staticmethod
     def validate_content_type(file_content_type: str):
-        if file_content_type not in AVAILABLE_FILE_FORMATS:
+        if normalize_file_format(file_content_type) not in AVAILABLE_FILE_FORMATS:
             raise NotValidFileContentType(
                 f"The file must be in formats {AVAILABLE_FILE_FORMATS}."
             )
 
-    @classmethod
-    def validate_data(cls, dataframe: DataFrame):
-        width = dataframe.shape[1]
-
-        if width < 2:
-            raise NotValidColumnSet("Excel file must have at least two columns.")
-
-        for column_index in range(1, 3):
-            null_indexes = dataframe[dataframe.iloc[:, column_index].isnull()].index
-
-            if null_indexes.empty:
-                return
-
-            raise ValueError(
-                f"Column at index {column_index} contains nulls at rows: {list(null_indexes)}"
-            )
-
 
 class QuizProcessor(FileValidator):
     @classmethod
     async def handler_quiz_start(cls, message: Message, state: FSMContext):
         state_data = await state.get_data()
-        file_bytes = state_data.get(StateKeys.UPLOADED_FILE_DATA.value)
+        deck_id = state_data.get(StateKeys.QUIZ_DECK_ID.value)
+        deck = None
+        if deck_id:
+            deck = await DeckStore.get_or_restore_async(deck_id=deck_id)
 
-        if file_bytes:
-            await cls.process_file_with_words(
-                file_data=BytesIO(file_bytes), message=message, state=state
-            )
+        if deck:
+            await cls.process_file_with_words(deck=deck, message=message, state=state)
             return
 
         await message.answer(
@@ -94,15 +81,31 @@ class QuizProcessor(FileValidator):
     @classmethod
     async def process_user_new_file(cls, message: Message, state: FSMContext):
         document: Document = message.document
-        file: File = await message.bot.get_file(file_id=document.file_id)
-        file_data: BinaryIO = await message.bot.download_file(file_path=file.file_path)
-        file_data_in_bytes: bytes = file_data.read()
 
         try:
-            await cls.validate_file_format(
+            check_file_size(file_size=document.file_size)
+            file: File = await message.bot.get_file(file_id=document.file_id)
+            file_data: BinaryIO = await message.bot.download_file(
+                file_path=file.file_path
+            )
+            file_data_in_bytes: bytes = file_data.read()
+
+            deck = await cls.validate_file_format(
                 file_data_in_bytes=file_data_in_bytes,
-                file_content_type=document.file_name.split(".")[1],
+                file_content_type=get_file_format(document.file_name),
             )
+        except DeckIngestionBusy:
+            await message.answer(
+                text=InteractivePhrases.FILE_PROCESSING_BUSY.value,
+                disable_notification=True,
+            )
+            return
+        except (DeckIngestionRejected, NotValidFileContentType) as e:
+            await message.answer(
+                text=InteractivePhrases.FILE_REJECTED.value.format(reason=e),
+                disable_notification=True,
+            )
+            return
         except Exception as e:
             print("FILE VALIDATION ERROR", str(e))
             await message.answer(
@@ -111,29 +114,21 @@ class QuizProcessor(FileValidator):
             return
 
         await cls.start_quiz_with_valid_file_data(
-            state=state, message=message, file_data_in_bytes=file_data_in_bytes
+            state=state, message=message, deck=deck
         )
 
-        await cls.create_file_in_storage_client(
-            message=message, file=file, file_data=file_data_in_bytes
-        )
+        await asyncio.to_thread(cls.save_user_deck, message.chat.id, deck)
+        UserActivityProcessor.user_added_file(message.chat.id)
 
     @classmethod
-    async def process_xlsx_file(
-            cls,
-            file_data_in_bytes: bytes,
-            file_content_type: str,
-            message: Message,
-            state: FSMContext,
+    async def start_quiz_with_built_in_deck(
+            cls, file_name: str, message: Message, state: FSMContext
     ):
         try:
-            await cls.validate_file_format(
-                file_data_in_bytes=file_data_in_bytes,
-                file_content_type=file_content_type,
-            )
+            deck = DeckStore.get_built_in_deck(file_name=file_name)
 
             await cls.start_quiz_with_valid_file_data(
-                state=state, message=message, file_data_in_bytes=file_data_in_bytes
+                state=state, message=message, deck=deck
             )
         except Exception as e:
             await message.answer(str(e))
@@ -141,109 +136,106 @@ class QuizProcessor(FileValidator):
     @classmethod
     async def validate_file_format(
             cls, file_content_type: str, file_data_in_bytes: bytes
-    ):
+    ) -> CompiledDeck:
         cls.validate_content_type(file_content_type=file_content_type)
 
-        file_buffer = BytesIO(file_data_in_bytes)
-        file_data_in_dataframe = pd.read_excel(file_buffer)
-        cls.validate_data(dataframe=file_data_in_dataframe)
+        return await DeckStore.get_or_compile_async(
+            file_bytes=file_data_in_bytes,
+            parse=partial(
+                get_deck_ingestion_pool().parse, file_format=file_content_type
+            ),
+        )
 
     @staticmethod
     async def start_quiz_with_valid_file_data(
-            state: FSMContext, file_data_in_bytes: bytes, message: Message
+            state: FSMContext, deck: CompiledDeck, message: Message
     ):
-        await state.update_data(
-            {StateKeys.UPLOADED_FILE_DATA.value: file_data_in_bytes}
-        )
+        await state.update_data({StateKeys.QUIZ_DECK_ID.value: deck.deck_id})
 
         if await QuizProcessor.stop_quiz(message=message, state=state):
             return
 
         await QuizProcessor.handler_quiz_start(message=message, state=state)
 
-    @classmethod
-    async def process_previous_user_file(cls, message: Message, state: FSMContext):
-        file_response = None
+    @staticmethod
+    def save_user_deck(user_id: int, deck: CompiledDeck):
+        DeckArchive.put(deck=deck)
 
-        try:
-            file_response = storage_client.get_object(
-                bucket_name=MINIO_BUCKET_NAME, object_name=f"{message.chat.id}.xlsx"
+        task = FileDBProcessor(session=next(get_database_session()))
+        unused_deck_id = task.assign_user_deck(
+            user_id=user_id,
+            deck_id=deck.deck_id,
+            size_in_bytes=len(deck.to_bytes()),
+            deck_link=DeckArchive.make_file_link(deck_id=deck.deck_id),
+        )
+
+        if unused_deck_id:
+            task.remove_unused_deck(
+                deck_id=unused_deck_id, remove_object=DeckArchive.delete
             )
-            file_data_in_bytes: bytes = file_response.read()
 
+    @staticmethod
+    def load_user_deck(user_id: int) -> CompiledDeck | None:
+        task = FileDBProcessor(session=next(get_database_session()))
+        deck_id = task.get_user_deck_id(user_id=user_id)
+        if deck_id is None:
+            return None
+
+        return DeckStore.get_or_restore(deck_id=deck_id)
+
+    @classmethod
+    async def load_previous_user_deck(cls, user_id: int) -> CompiledDeck:
+        deck = await asyncio.to_thread(cls.load_user_deck, user_id)
+        if deck is not None:
+            return deck
+
+        legacy_file = await asyncio.to_thread(LegacyUserFiles.get_latest, user_id)
+        if legacy_file is None:
+            raise FileNotFoundError(f"User {user_id} has no previous file.")
+
+        file_data_in_bytes, file_format = legacy_file
+        deck = await cls.validate_file_format(
+            file_data_in_bytes=file_data_in_bytes, file_content_type=file_format
+        )
+        await asyncio.to_thread(cls.save_user_deck, user_id, deck)
+        return deck
+
+    @classmethod
+    async def process_previous_user_file(cls, message: Message, state: FSMContext):
+        try:
+            deck = await cls.load_previous_user_deck(user_id=message.chat.id)
         except Exception as e:
             await message.answer(InteractivePhrases.EMPTY_FILE.value)
             print(f"\nUSER BUG. USER ID {message.chat.id}")
             print(str(e), "\n")
             return
 
-        finally:
-            if file_response:
-                file_response.close()
-                file_response.release_conn()
         await cls.start_quiz_with_valid_file_data(
-            state=state, message=message, file_data_in_bytes=file_data_in_bytes
+            state=state, message=message, deck=deck
         )
 
-    @staticmethod
-    async def create_file_in_storage_client(
-            message: Message, file: File, file_data: bytes
-    ):
-        file_content_type = file.file_path.split(".")[1]
-
-        with tempfile.NamedTemporaryFile(
-                delete=False, suffix=f".{file_content_type}"
-        ) as tmp_file:
-            tmp_file.write(file_data)
-            tmp_file_path = tmp_file.name
-
-        object_name = f"{message.chat.id}.{file_content_type}"
-        buf = io.BytesIO(file_data)
-
-        storage_client.put_object(
-            bucket_name=MINIO_BUCKET_NAME,
-            object_name=object_name,
-            data=buf,
-            length=buf.getbuffer().nbytes,
-        )
-        UserActivityProcessor.user_added_file(message.chat.id)
-
-        file_link_in_minio = storage_client.presigned_get_object(
-            MINIO_BUCKET_NAME, object_name
-        )
-
-        task = FileDBProcessor(session=next(get_database_session()))
-        task.create_file_link_if_not_exists(
-            user_id=message.chat.id, file_link=file_link_in_minio
-        )
-
-        os.remove(tmp_file_path)
-
     @staticmethod
     async def process_file_with_words(
-            file_data: BinaryIO, message: Message, state: FSMContext
+            deck: CompiledDeck, message: Message, state: FSMContext
     ):
         try:
-            df = pd.read_excel(BytesIO(file_data.read()))
-            word_pairs = dict(df.itertuples(index=False, name=None))
-            word_pairs = list(word_pairs.items())
-            random.shuffle(word_pairs)
-            word_pairs = dict(word_pairs)
-            current_word = random.choice(list(word_pairs.keys()))
+            session = QuizSession.start(deck_id=deck.deck_id, size=len(deck))
+            current_word, translation = deck.word_pairs[session.current_index]
 
             await state.set_data(
-                {
-                    StateKeys.QUIZ_DATA.value: word_pairs,
-                    StateKeys.CURRENT_WORD.value: current_word,
-                    StateKeys.CURRENT_TRANSLATION.value: word_pairs[current_word],
-                }
+                QuizProcessor.make_quiz_state(
+                    session=session, word=current_word, translation=translation
+                )
             )
 
             await state.set_state(AvailableStates.process_user_word_answer)
+            UserActivityProcessor.quiz_started(
+                user_id=message.chat.id, deck_id=deck.deck_id, deck_size=len(deck)
+            )
 
             await message.answer(
                 text=InteractivePhrases.START_QUIZ.value.format(
-                    len_of_pairs=len(word_pairs),
+                    len_of_pairs=len(deck),
                 ),
                 disable_notification=True,
             )
@@ -258,23 +250,37 @@ class QuizProcessor(FileValidator):
             await message.answer(f"Failed to read Excel file: {e}")
             await ButtonOrchestrator.set_menu_buttons(bot)
 
+    @staticmethod
+    def make_quiz_state(session: QuizSession, word: str, translation: str) -> dict:
+        return {
+            StateKeys.QUIZ_SESSION.value: session.to_state(),
+            StateKeys.CURRENT_WORD.value: word,
+            StateKeys.CURRENT_TRANSLATION.value: translation,
+        }
+
+    @staticmethod
+    async def get_next_word_pair(session: QuizSession) -> tuple[str, str] | None:
+        session.advance()
+        if session.is_finished:
+            return None
+
+        deck = await DeckStore.get_or_restore_async(deck_id=session.deck_id)
+        if deck is None or len(deck) != session.size:
+            return None
+
+        return deck.word_pairs[session.current_index]
+
     @staticmethod
     def normalize_apostrophes(text: str) -> str:
-        return (
-            text.replace("ʼ", "'")
-            .replace("’", "'")
-            .replace("‘", "'")
-            .replace("`", "'")
-            .replace("ʹ", "'")
-        )
+        return normalize_apostrophes(text=text)
 
     @classmethod
     async def process_user_answer(cls, message: Message, state: FSMContext):
         state_data = await state.get_data()
-        quiz_data: dict = state_data.get(StateKeys.QUIZ_DATA.value, {})
+        session = QuizSession.from_state(state_data.get(StateKeys.QUIZ_SESSION.value))
         current_word: str = state_data.get(StateKeys.CURRENT_WORD.value)
 
-        if not quiz_data or not current_word:
+        if not session or not current_word:
             await message.answer(
                 text=InteractivePhrases.FINISH_QUIZ.value, disable_notification=True
             )
@@ -282,17 +288,18 @@ class QuizProcessor(FileValidator):
             await state.clear()
             return
 
-        correct_translation = str(quiz_data[current_word]).strip().lower()
+        correct_translation = str(
+            state_data.get(StateKeys.CURRENT_TRANSLATION.value, "")
+        ).strip().lower()
         correct_translation = cls.normalize_apostrophes(correct_translation)
         user_translation = message.text.strip().lower()
         user_translation = cls.normalize_apostrophes(user_translation)
 
-        prompt = make_check_prompt(
+        result = await AnswerGradingProcessor.grade_answer(
             word=current_word,
             correct_translation=correct_translation,
             user_translation=user_translation,
         )
-        result = await ask_gpt_async(prompt=prompt)
 
         if result.startswith("✅") or result.startswith("ℹ"):
             UserActivityProcessor.user_write_correct_word(
@@ -301,23 +308,30 @@ class QuizProcessor(FileValidator):
                 translated_word=user_translation,
             )
 
-            quiz_data.pop(current_word)
+            next_word_pair = await cls.get_next_word_pair(session=session)
 
-            if not quiz_data:
+            if next_word_pair is None:
+                UserActivityProcessor.quiz_finished(
+                    user_id=message.chat.id,
+                    reason="finished" if session.is_finished else "deck_missing",
+                )
                 await message.answer(
-                    text=random.choice(SUCCESS_PHRASES), disable_notification=True
+                    text=(
+                        random.choice(SUCCESS_PHRASES)
+                        if session.is_finished
+                        else InteractivePhrases.FINISH_QUIZ.value
+                    ),
+                    disable_notification=True,
                 )
                 await ButtonOrchestrator.set_menu_buttons(bot)
                 await state.clear()
                 return
 
-            next_word = random.choice(list(quiz_data.keys()))
+            next_word, next_translation = next_word_pair
             await state.set_data(
-                {
-                    StateKeys.QUIZ_DATA.value: quiz_data,
-                    StateKeys.CURRENT_WORD.value: next_word,
-                    StateKeys.CURRENT_TRANSLATION.value: quiz_data[next_word],
-                }
+                cls.make_quiz_state(
+                    session=session, word=next_word, translation=next_translation
+                )
             )
 
             await message.answer(
@@ -354,57 +368,14 @@ class QuizProcessor(FileValidator):
 
     @staticmethod
     async def start_quiz_with_b1_words(message: Message, state: FSMContext):
-        b1_words_from_cache = words_redis_client.get(
-            name=WordsCache.B_LEVEL_WORDS.value,
-        )
-        if b1_words_from_cache:
-            file_data_in_bytes = b1_words_from_cache
-
-        else:
-            file_path = "constants/files/B1 LEVEL WORDS.xlsx"
-
-            with open(file_path, "rb") as file:
-                file_data_in_bytes = file.read()
-
-            words_redis_client.set(
-                name=WordsCache.B_LEVEL_WORDS.value,
-                value=file_data_in_bytes,
-            )
-            file_data_in_bytes = words_redis_client.get(
-                name=WordsCache.B_LEVEL_WORDS.value,
-            )
-
-        await QuizProcessor.process_xlsx_file(
-            message=message,
-            file_content_type=".xlsx",
-            state=state,
-            file_data_in_bytes=file_data_in_bytes,
+        await QuizProcessor.start_quiz_with_built_in_deck(
+            file_name="B1 LEVEL WORDS.xlsx", message=message, state=state
         )
 
     @staticmethod
     async def start_quiz_with_a2_words(message: Message, state: FSMContext):
-        a2_words_from_cache = words_redis_client.get(
-            name=WordsCache.A_LEVEL_WORDS.value,
-        )
-        if a2_words_from_cache:
-            file_data_in_bytes = a2_words_from_cache
-
-        else:
-            file_path = "constants/files/A2 LEVEL WORDS.xlsx"
-
-            with open(file_path, "rb") as file:
-                file_data_in_bytes = file.read()
-
-            words_redis_client.set(
-                name=WordsCache.A_LEVEL_WORDS.value,
-                value=file_data_in_bytes,
-            )
-
-        await QuizProcessor.process_xlsx_file(
-            message=message,
-            file_content_type=".xlsx",
-            state=state,
-            file_data_in_bytes=file_data_in_bytes,
+        await QuizProcessor.start_quiz_with_built_in_deck(
+            file_name="A2 LEVEL WORDS.xlsx", message=message, state=state
         )
 
     @staticmethod
@@ -412,28 +383,8 @@ class QuizProcessor(FileValidator):
         UserActivityProcessor.user_play_special_mode(
             user_id=message.chat.id, mode_name="HOUSE WORDS"
         )
-        special_words_from_cache = words_redis_client.get(
-            name=WordsCache.SPECIAL_WORDS.value,
-        )
-        if special_words_from_cache:
-            file_data_in_bytes = special_words_from_cache
-
-        else:
-            file_path = "constants/files/HOUSE WORDS.xlsx"
-
-            with open(file_path, "rb") as file:
-                file_data_in_bytes = file.read()
-
-            words_redis_client.set(
-                name=WordsCache.SPECIAL_WORDS.value,
-                value=file_data_in_bytes,
-            )
-
-        await QuizProcessor.process_xlsx_file(
-            message=message,
-            file_content_type=".xlsx",
-            state=state,
-            file_data_in_bytes=file_data_in_bytes,
+        await QuizProcessor.start_quiz_with_built_in_deck(
+            file_name="HOUSE WORDS.xlsx", message=message, state=state
         )
 
     @staticmethod
@@ -443,13 +394,10 @@ class QuizProcessor(FileValidator):
             disable_notification=True,
         )
 
-        file_response = None
         try:
-            file_response = storage_client.get_object(
-                bucket_name=MINIO_BUCKET_NAME, object_name=f"{message.chat.id}.xlsx"
+            deck = await QuizProcessor.load_previous_user_deck(
+                user_id=message.chat.id
             )
-            file_data_in_bytes: bytes = file_response.read()
-
         except Exception as e:
             await message.answer(
                 InteractivePhrases.EMPTY_FILE.value, disable_notification=True
@@ -458,14 +406,7 @@ class QuizProcessor(FileValidator):
             print(str(e), "\n")
             return
 
-        finally:
-            if file_response:
-                file_response.close()
-                file_response.release_conn()
-
-        await state.update_data(
-            {StateKeys.UPLOADED_FILE_DATA.value: file_data_in_bytes}
-        )
+        await state.update_data({StateKeys.QUIZ_DECK_ID.value: deck.deck_id})
 
         if (
                 await QuizProcessor.stop_quiz(message=message, state=state)
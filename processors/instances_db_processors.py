@@ -1,8 +1,13 @@
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlmodel import select
 
 from api.routers.user.schemas import CreateUserRequest
-from models import UserData, UserFile
+from models import StoredDeck, UserDailyStats, UserData, UserFile
 from services.database import get_database_session
 
 
@@ -72,3 +77,85 @@ class FileDBProcessor:
             return
 
         self.create_file_link(user_id=user_id, file_link=file_link)
+
+    def get_user_deck_id(self, user_id: int) -> str | None:
+        file_link_instance = self.get_file_link_by_user_id(user_id=user_id)
+        if file_link_instance:
+            return file_link_instance.deck_id
+
+        return None
+
+    def assign_user_deck(
+            self, user_id: int, deck_id: str, size_in_bytes: int, deck_link: str
+    ) -> str | None:
+        query = select(UserFile).where(UserFile.user_id == user_id).with_for_update()
+        file_link_instance = self._session.execute(query).scalar()
+        if file_link_instance and file_link_instance.deck_id == deck_id:
+            self._session.commit()
+            return None
+
+        self._session.execute(
+            insert(StoredDeck)
+            .values(
+                deck_id=deck_id,
+                ref_count=1,
+                size_in_bytes=size_in_bytes,
+                created_at=datetime.utcnow(),
+            )
+            .on_conflict_do_update(
+                index_elements=[StoredDeck.deck_id],
+                set_={"ref_count": StoredDeck.ref_count + 1},
+            )
+        )
+
+        previous_deck_id = None
+        if file_link_instance:
+            previous_deck_id = file_link_instance.deck_id
+            file_link_instance.deck_id = deck_id
+            file_link_instance.deck_link = deck_link
+        else:
+            self._session.add(
+                UserFile(user_id=user_id, deck_id=deck_id, deck_link=deck_link)
+            )
+
+        unused_deck_id = None
+        if previous_deck_id:
+            ref_count = self._session.execute(
+                update(StoredDeck)
+                .where(StoredDeck.deck_id == previous_deck_id)
+                .values(ref_count=StoredDeck.ref_count - 1)
+                .returning(StoredDeck.ref_count)
+            ).scalar()
+            if ref_count is not None and ref_count <= 0:
+                unused_deck_id = previous_deck_id
+
+        self._session.commit()
+        return unused_deck_id
+
+    def remove_unused_deck(self, deck_id: str, remove_object: Callable[[str], None]):
+        query = (
+            select(StoredDeck).where(StoredDeck.deck_id == deck_id).with_for_update()
+        )
+        stored_deck = self._session.execute(query).scalar()
+        if stored_deck is None or stored_deck.ref_count > 0:
+            self._session.commit()
+            return
+
+        remove_object(deck_id)
+        self._session.delete(stored_deck)
+        self._session.commit()
+
+
+class UserStatsDBProcessor:
+    def __init__(self, session: Session):
+        self._session = session
+
+    def get_daily_stats(self, user_id: int) -> list[dict]:
+        query = (
+            select(UserDailyStats)
+            .where(UserDailyStats.user_id == user_id)
+            .order_by(UserDailyStats.day)
+        )
+        return [
+            row.model_dump() for row in self._session.execute(query).scalars().all()
+        ]
@@ -1,12 +1,69 @@
+import logging
+
+from redis.exceptions import RedisError
+
 from config.elastic_config import ElasticAvailableIndexes
-from services.elastic_service.elastic_service import elastic_client
+from processors.instances_db_processors import UserStatsDBProcessor
+from services.cache_service.cache_service import activity_redis_client
+from services.database import get_database_session
+from services.elastic_service.activity_pipeline import activity_pipeline
+from services.elastic_service.activity_rollup import (
+    is_raw_event_sampled,
+    QuizSessionRollups,
+)
 from services.elastic_service.schemas import CreateUserActivity
+from services.stats_service.user_stats import UserStatsSnapshot, UserStatsStore
 
 
 class UserActivityProcessor:
+    @staticmethod
+    def record_quiz_event(
+            user_id: int, outcome: str, activity: CreateUserActivity, word: str
+    ):
+        pipeline = activity_redis_client.pipeline(transaction=False)
+        UserStatsStore.record(
+            pipeline=pipeline, user_id=user_id, outcome=outcome, word=word
+        )
+        QuizSessionRollups.record(
+            pipeline=pipeline, user_id=user_id, outcome=outcome, word=word
+        )
+        try:
+            pipeline.execute()
+            recorded = True
+        except RedisError as e:
+            logging.warning("Quiz event recording failed: %s", e)
+            recorded = False
+
+        if recorded and not is_raw_event_sampled(user_id=user_id):
+            return
+
+        activity_pipeline.submit(
+            index=ElasticAvailableIndexes.USER_ACTIVITY.value, document=activity.dict()
+        )
+
+    @staticmethod
+    def get_user_stats(user_id: int) -> UserStatsSnapshot:
+        snapshot = UserStatsStore.get_snapshot(user_id=user_id)
+        if snapshot:
+            return snapshot
+
+        history = UserStatsDBProcessor(
+            session=next(get_database_session())
+        ).get_daily_stats(user_id=user_id)
+        UserStatsStore.reconcile(histories={user_id: history})
+        return UserStatsStore.get_snapshot(user_id=user_id)
+
+    @staticmethod
+    def quiz_started(user_id: int, deck_id: str, deck_size: int):
+        QuizSessionRollups.start(user_id=user_id, deck_id=deck_id, deck_size=deck_size)
+
+    @staticmethod
+    def quiz_finished(user_id: int, reason: str = "finished"):
+        QuizSessionRollups.finish(user_id=user_id, reason=reason)
+
     @staticmethod
     def user_tap_start_button(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="SESSION ENTERED", userId=user_id
@@ -15,7 +72,7 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_tap_add_file_button(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="TAP ADD FILE", userId=user_id
@@ -24,7 +81,7 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_added_file(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="UPLOADED FILE", userId=user_id
@@ -33,7 +90,7 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_used_last_file(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="USE LAST FILE", userId=user_id
@@ -42,7 +99,7 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_play_a1_a2_level(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="PLAY A1 AND A2 MODE", userId=user_id
@@ -51,7 +108,7 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_play_b1_b2_level(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="PLAY B1 AND B2 MODE", userId=user_id
@@ -60,7 +117,7 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_play_special_mode(user_id: int, mode_name: str):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="PLAY SPECIAL MODE", userId=user_id, value=mode_name
@@ -69,31 +126,35 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_write_correct_word(user_id: int, original_word: str, translated_word: str):
-        elastic_client.index(
-            index=ElasticAvailableIndexes.USER_ACTIVITY.value,
-            document=CreateUserActivity(
+        UserActivityProcessor.record_quiz_event(
+            user_id=user_id,
+            outcome="correct",
+            word=original_word,
+            activity=CreateUserActivity(
                 activityId="WRITE CORRECT WORD",
                 userId=user_id,
                 value=original_word,
                 additional_value=translated_word,
-            ).dict(),
+            ),
         )
 
     @staticmethod
     def user_write_wrong_word(user_id: int, original_word: str, translated_word: str):
-        elastic_client.index(
-            index=ElasticAvailableIndexes.USER_ACTIVITY.value,
-            document=CreateUserActivity(
+        UserActivityProcessor.record_quiz_event(
+            user_id=user_id,
+            outcome="wrong",
+            word=original_word,
+            activity=CreateUserActivity(
                 activityId="WRITE WRONG WORD",
                 userId=user_id,
                 value=original_word,
                 additional_value=translated_word,
-            ).dict(),
+            ),
         )
 
     @staticmethod
     def user_answer_time(user_id: int, time_difference: str):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="ANSWER TIME", userId=user_id, value=time_difference
@@ -102,34 +163,40 @@ class UserActivityProcessor:
 
     @staticmethod
     def user_used_hint(user_id: int, original_word: str):
-        elastic_client.index(
-            index=ElasticAvailableIndexes.USER_ACTIVITY.value,
-            document=CreateUserActivity(
+        UserActivityProcessor.record_quiz_event(
+            user_id=user_id,
+            outcome="hints",
+            word=original_word,
+            activity=CreateUserActivity(
                 activityId="USED HINT", userId=user_id, value=original_word
-            ).dict(),
+            ),
         )
 
     @staticmethod
     def user_listened_word(user_id: int, original_word: str):
-        elastic_client.index(
-            index=ElasticAvailableIndexes.USER_ACTIVITY.value,
-            document=CreateUserActivity(
+        UserActivityProcessor.record_quiz_event(
+            user_id=user_id,
+            outcome="listens",
+            word=original_word,
+            activity=CreateUserActivity(
                 activityId="LISTENED WORD", userId=user_id, value=original_word
-            ).dict(),
+            ),
         )
 
     @staticmethod
     def user_passed_word(user_id: int, original_word: str):
-        elastic_client.index(
-            index=ElasticAvailableIndexes.USER_ACTIVITY.value,
-            document=CreateUserActivity(
+        UserActivityProcessor.record_quiz_event(
+            user_id=user_id,
+            outcome="skips",
+            word=original_word,
+            activity=CreateUserActivity(
                 activityId="PASSED WORD", userId=user_id, value=original_word
-            ).dict(),
+            ),
         )
 
     @staticmethod
     def user_tap_get_instructions_button(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="GET INSTRUCTIONS",
@@ -139,17 +206,18 @@ class UserActivityProcessor:
 
     @staticmethod
     def stopped_quiz(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="STOPPED QUIZ",
                 userId=user_id
             ).dict(),
         )
+        QuizSessionRollups.finish(user_id=user_id, reason="stopped")
 
     @staticmethod
     def ask_for_help(user_id: int):
-        elastic_client.index(
+        activity_pipeline.submit(
             index=ElasticAvailableIndexes.USER_ACTIVITY.value,
             document=CreateUserActivity(
                 activityId="HELP BUTTON",
@@ -1,3 +1,14 @@
-beat_schedule = {}
+from celery.schedules import crontab
+
+beat_schedule = {
+    "finish-idle-activity-rollups": {
+        "task": "tasks.finish_idle_activity_rollups",
+        "schedule": 600.0,
+    },
+    "compact-user-daily-stats": {
+        "task": "tasks.compact_user_daily_stats",
+        "schedule": crontab(hour=1, minute=0),
+    },
+}
 
 timezone = "UTC"
@@ -5,6 +5,7 @@ from random import choice
 from aiogram.exceptions import TelegramForbiddenError
 from celery import Celery
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import aliased
 from sqlmodel import select
 
@@ -16,9 +17,22 @@ from constants.constants import (
     SUPERUSER_IDS,
 )
 from constants.phrases import USER_NOTIFICATIONS
-from models import UserSession, UserData, UserSubscriptionLevels
+from models import (
+    UserDailyStats,
+    UserSession,
+    UserData,
+    UserSubscriptionLevels,
+)
 from services.bot_services.bot_initializer import bot
 from services.database import get_database_session
+from services.elastic_service.activity_rollup import QuizSessionRollups
+from services.grading_service.accepted_answers import AcceptedAnswersIndexBuilder
+from services.pregeneration_service.pregeneration import BuiltInDeckPregenerator
+from services.stats_service.user_stats import (
+    get_stats_day,
+    STATS_READ_BATCH_SIZE,
+    UserStatsStore,
+)
 
 app = Celery("reports", broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
 app.config_from_object("services.background_task_service.celery_config")
@@ -197,3 +211,60 @@ def update_user_subscription_levels():
         user_instance.subscription_level = UserSubscriptionLevels.NON_SUBSCRIPTION
 
     session.commit()
+
+
+@app.task(name="tasks.build_accepted_answers_index")
+def build_accepted_answers_index(force: bool = False):
+    return asyncio.run(AcceptedAnswersIndexBuilder.build(force=force))
+
+
+@app.task(name="tasks.pregenerate_built_in_decks")
+def pregenerate_built_in_decks(dry_run: bool = False, restart: bool = False):
+    return asyncio.run(
+        BuiltInDeckPregenerator().run(dry_run=dry_run, restart=restart)
+    )
+
+
+@app.task(name="tasks.finish_idle_activity_rollups")
+def finish_idle_activity_rollups():
+    return QuizSessionRollups.finish_idle()
+
+
+@app.task(name="tasks.compact_user_daily_stats")
+def compact_user_daily_stats():
+    session = next(get_database_session())
+
+    compacted_rows = 0
+    for day in UserStatsStore.get_pending_days(before=get_stats_day()):
+        rows = UserStatsStore.read_day(day=day)
+        for start in range(0, len(rows), STATS_READ_BATCH_SIZE):
+            statement = insert(UserDailyStats).values(
+                rows[start:start + STATS_READ_BATCH_SIZE]
+            )
+            session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in rows[0]
+                        if column not in ("user_id", "day")
+                    },
+                )
+            )
+        session.commit()
+
+        user_ids = [row["user_id"] for row in rows]
+        for start in range(0, len(user_ids), STATS_READ_BATCH_SIZE):
+            batch = user_ids[start:start + STATS_READ_BATCH_SIZE]
+            histories = {user_id: [] for user_id in batch}
+            query = select(UserDailyStats).where(
+                UserDailyStats.user_id.in_(batch), UserDailyStats.day <= day
+            )
+            for row in session.execute(query).scalars().all():
+                histories[row.user_id].append(row.model_dump())
+            UserStatsStore.reconcile(histories=histories, compacted_day=day)
+
+        UserStatsStore.drop_day(day=day)
+        compacted_rows += len(rows)
+
+    return compacted_rows
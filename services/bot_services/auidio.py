@@ -1,103 +1,288 @@
-import subprocess
-import tempfile
-import uuid
-from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import io
+import logging
+import time
+from asyncio.subprocess import PIPE
+from concurrent.futures import ThreadPoolExecutor
 from html import escape
-from pathlib import Path
-from subprocess import CalledProcessError, DEVNULL
 
-import deepl
-from aiogram.types import FSInputFile
+from aiogram.types import BufferedInputFile, InputFile
 from aiogram.types import Message
 from gtts import gTTS
+from minio.error import S3Error
+from redis.exceptions import RedisError
 
-from config.deepl_config import DEEPL_TOKEN
+from config.bot_config import (
+    AUDIO_FFMPEG_CONCURRENCY,
+    AUDIO_FFMPEG_TIMEOUT_IN_SEC,
+    AUDIO_TTS_WORKERS,
+)
+from config.storage_service_config import MINIO_BUCKET_NAME
+from services.cache_service.cache_service import (
+    generation_redis_client,
+    GENERATION_CACHE_LIVES_IN_SEC,
+)
+from services.bot_services.telegram_files import send_cached_file
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.metrics import get_metrics
+from services.storage_service import storage_client
+from services.translation_service.translation_service import translation_service
 
+VOICE_OBJECT_PREFIX = "voices"
+VOICE_MAX_TEXT_LENGTH = 60
+VOICE_TTS_SLOW = False
+VOICE_OPUS_BITRATE = "48k"
+VOICE_SETTINGS = f"gtts:slow={VOICE_TTS_SLOW}|libopus:{VOICE_OPUS_BITRATE}:vbr:10"
+
+voice_metrics = get_metrics(name="voice_cache", log_every=200)
+audio_metrics = get_metrics(name="audio_pipeline", log_every=200)
+
+_tts_executor = ThreadPoolExecutor(max_workers=AUDIO_TTS_WORKERS, thread_name_prefix="tts")
 
-@asynccontextmanager
-async def temp_audio_files():
-    created = []
-    try:
-        yield created.append
-    finally:
-        for p in created:
-            try:
-                Path(p).unlink(missing_ok=True)
-            except Exception:
-                pass
+
+def make_asset_hash(*parts: str) -> str:
+    return hashlib.sha1("\x1f".join(parts).encode()).hexdigest()
 
 
 def normalize_word_for_pronunciation(word: str) -> str:
     return word.strip().strip("\"'")
 
 
-def synthesize_tts_to_mp3(text: str, lang: str = "en") -> Path:
-    clean = text.strip()
-    if not clean:
-        raise ValueError("Порожній текст для синтезу.")
-    tts = gTTS(text=clean, lang=lang, slow=False)
-    tmp_mp3 = Path(tempfile.gettempdir()) / f"tts_{uuid.uuid4().hex}.mp3"
-    tts.save(str(tmp_mp3))
-    return tmp_mp3
+def make_voice_hash(text: str, lang: str = "en") -> str:
+    return make_asset_hash(text, lang, VOICE_SETTINGS)
 
 
-async def synth_and_send_voice(message: Message, text: str):
-    if len(text) > 60:
-        await message.reply(
-            "Будь ласка, надішли коротше слово або фразу (до 60 символів)."
-        )
-        return
+class VoiceAssetStore:
+    @staticmethod
+    def make_object_name(text: str, lang: str = "en") -> str:
+        return f"{VOICE_OBJECT_PREFIX}/{make_voice_hash(text=text, lang=lang)}.oga"
 
-    async with temp_audio_files() as remember:
+    @classmethod
+    def exists(cls, text: str, lang: str = "en") -> bool:
         try:
-            mp3_path = synthesize_tts_to_mp3(text, lang="en")
-            remember(mp3_path)
-            ogg_path = convert_mp3_to_ogg_opus(mp3_path)
-            remember(ogg_path)
-
-            original_text = escape(text)
+            storage_client.stat_object(
+                bucket_name=MINIO_BUCKET_NAME,
+                object_name=cls.make_object_name(text=text, lang=lang),
+            )
+        except S3Error:
+            return False
 
-            translator = deepl.Translator(DEEPL_TOKEN)
-            translated = translator.translate_text(text=original_text, target_lang="UK")
+        return True
 
-            safe_caption = f"🇺🇸 {original_text}\n\n 🇺🇦 {translated}"
-            voice_file = FSInputFile(str(ogg_path))
-            await message.answer_voice(
-                voice=voice_file, caption=safe_caption, disable_notification=True
+    @classmethod
+    def get(cls, text: str, lang: str = "en") -> bytes | None:
+        response = None
+        try:
+            response = storage_client.get_object(
+                bucket_name=MINIO_BUCKET_NAME,
+                object_name=cls.make_object_name(text=text, lang=lang),
             )
+            return response.read()
+        except S3Error:
+            return None
+        finally:
+            if response:
+                response.close()
+                response.release_conn()
+
+    @classmethod
+    def put(cls, text: str, ogg_bytes: bytes, lang: str = "en"):
+        storage_client.put_object(
+            bucket_name=MINIO_BUCKET_NAME,
+            object_name=cls.make_object_name(text=text, lang=lang),
+            data=io.BytesIO(ogg_bytes),
+            length=len(ogg_bytes),
+            content_type="audio/ogg",
+        )
+
 
-        except Exception as e:
-            err = escape(str(e))
-            await message.reply(
-                f"Сталася помилка під час синтезу або конвертації: <code>{err}</code>\n"
-                f"Переконайся, що ffmpeg встановлено правильно."
+class VoiceFileIdStore:
+    @staticmethod
+    def make_key(text: str, lang: str = "en") -> str:
+        return f"{CacheKeyPrefixes.VOICE_FILE_ID.value}:{make_voice_hash(text=text, lang=lang)}"
+
+    @classmethod
+    def get(cls, text: str, lang: str = "en") -> str | None:
+        try:
+            return generation_redis_client.get(name=cls.make_key(text=text, lang=lang))
+        except RedisError as e:
+            logging.warning("Voice file_id cache read failed: %s", e)
+            return None
+
+    @classmethod
+    def put(cls, text: str, file_id: str, lang: str = "en"):
+        try:
+            generation_redis_client.set(
+                name=cls.make_key(text=text, lang=lang),
+                value=file_id,
+                ex=GENERATION_CACHE_LIVES_IN_SEC,
             )
+        except RedisError as e:
+            logging.warning("Voice file_id cache write failed: %s", e)
 
+    @classmethod
+    def delete(cls, text: str, lang: str = "en"):
+        try:
+            generation_redis_client.delete(cls.make_key(text=text, lang=lang))
+        except RedisError as e:
+            logging.warning("Voice file_id cache delete failed: %s", e)
 
-def convert_mp3_to_ogg_opus(mp3_path: Path) -> Path:
-    ogg_path = mp3_path.with_suffix(".oga")
+
+def synthesize_tts_to_mp3(text: str, lang: str = "en") -> bytes:
+    clean = text.strip()
+    if not clean:
+        raise ValueError("Порожній текст для синтезу.")
+    tts = gTTS(text=clean, lang=lang, slow=VOICE_TTS_SLOW)
+    mp3_buffer = io.BytesIO()
+    tts.write_to_fp(mp3_buffer)
+    return mp3_buffer.getvalue()
+
+
+async def convert_mp3_to_ogg_opus(mp3_bytes: bytes) -> bytes:
     cmd = [
         "ffmpeg",
-        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "mp3",
         "-i",
-        str(mp3_path),
+        "pipe:0",
         "-c:a",
         "libopus",
         "-b:a",
-        "48k",
+        VOICE_OPUS_BITRATE,
         "-vbr",
         "on",
         "-compression_level",
         "10",
-        str(ogg_path),
+        "-f",
+        "ogg",
+        "pipe:1",
     ]
     try:
-        subprocess.run(cmd, check=True, stdout=DEVNULL, stderr=DEVNULL)
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE
+        )
     except FileNotFoundError as e:
         raise RuntimeError(
             "Не знайдено ffmpeg. Встановіть ffmpeg і переконайтесь, що він у PATH."
         ) from e
-    except CalledProcessError as e:
-        raise RuntimeError("Помилка конвертації аудіо у OGG/Opus.") from e
 
-    return ogg_path
+    try:
+        ogg_bytes, stderr = await asyncio.wait_for(
+            process.communicate(input=mp3_bytes), timeout=AUDIO_FFMPEG_TIMEOUT_IN_SEC
+        )
+    except asyncio.TimeoutError as e:
+        process.kill()
+        await process.wait()
+        raise RuntimeError("Конвертація аудіо у OGG/Opus триває задовго.") from e
+
+    if process.returncode != 0:
+        logging.warning("ffmpeg failed: %s", stderr.decode(errors="replace")[-500:])
+        raise RuntimeError("Помилка конвертації аудіо у OGG/Opus.")
+
+    return ogg_bytes
+
+
+class AudioPipeline:
+    def __init__(
+            self,
+            tts_concurrency: int = AUDIO_TTS_WORKERS,
+            ffmpeg_concurrency: int = AUDIO_FFMPEG_CONCURRENCY,
+    ):
+        self._tts_semaphore = asyncio.Semaphore(tts_concurrency)
+        self._ffmpeg_semaphore = asyncio.Semaphore(ffmpeg_concurrency)
+
+    async def synthesize_voice(self, text: str, lang: str = "en") -> bytes:
+        started = time.perf_counter()
+
+        async with self._tts_semaphore:
+            audio_metrics.observe(key="tts_wait", seconds=time.perf_counter() - started)
+            with audio_metrics.timer(key="tts"):
+                mp3_bytes = await asyncio.get_running_loop().run_in_executor(
+                    _tts_executor, synthesize_tts_to_mp3, text, lang
+                )
+
+        ffmpeg_started = time.perf_counter()
+        async with self._ffmpeg_semaphore:
+            audio_metrics.observe(
+                key="ffmpeg_wait", seconds=time.perf_counter() - ffmpeg_started
+            )
+            with audio_metrics.timer(key="ffmpeg"):
+                ogg_bytes = await convert_mp3_to_ogg_opus(mp3_bytes=mp3_bytes)
+
+        audio_metrics.observe(key="total", seconds=time.perf_counter() - started)
+        audio_metrics.incr(key="voices")
+        return ogg_bytes
+
+
+_audio_pipelines: dict[asyncio.AbstractEventLoop, AudioPipeline] = {}
+
+
+def get_audio_pipeline() -> AudioPipeline:
+    loop = asyncio.get_running_loop()
+
+    if loop not in _audio_pipelines:
+        for stale_loop in [key for key in _audio_pipelines if key.is_closed()]:
+            _audio_pipelines.pop(stale_loop)
+
+        _audio_pipelines[loop] = AudioPipeline()
+
+    return _audio_pipelines[loop]
+
+
+async def synthesize_voice(text: str, lang: str = "en") -> bytes:
+    return await get_audio_pipeline().synthesize_voice(text=text, lang=lang)
+
+
+async def get_or_create_voice(text: str, lang: str = "en") -> bytes:
+    ogg_bytes = await asyncio.to_thread(VoiceAssetStore.get, text, lang)
+    if ogg_bytes is not None:
+        voice_metrics.incr(key="storage_hits")
+        return ogg_bytes
+
+    voice_metrics.incr(key="synthesized")
+    ogg_bytes = await synthesize_voice(text=text, lang=lang)
+    await asyncio.to_thread(VoiceAssetStore.put, text, ogg_bytes, lang)
+    return ogg_bytes
+
+
+async def synth_and_send_voice(message: Message, text: str):
+    if len(text) > VOICE_MAX_TEXT_LENGTH:
+        await message.reply(
+            "Будь ласка, надішли коротше слово або фразу (до 60 символів)."
+        )
+        return
+
+    try:
+        original_text = escape(text)
+        translated = await translation_service.translate(text=original_text)
+        safe_caption = f"🇺🇸 {original_text}\n\n 🇺🇦 {translated}"
+
+        async def make_upload() -> InputFile:
+            ogg_bytes = await get_or_create_voice(text=text, lang="en")
+            return BufferedInputFile(file=ogg_bytes, filename="voice.oga")
+
+        def remember_file_id(sent_message: Message):
+            if sent_message.voice:
+                VoiceFileIdStore.put(text=text, file_id=sent_message.voice.file_id)
+
+        await send_cached_file(
+            send=lambda voice: message.answer_voice(
+                voice=voice, caption=safe_caption, disable_notification=True
+            ),
+            file_id=VoiceFileIdStore.get(text=text),
+            make_upload=make_upload,
+            forget_file_id=lambda: VoiceFileIdStore.delete(text=text),
+            remember_file_id=remember_file_id,
+            metrics=voice_metrics,
+        )
+
+    except Exception as e:
+        err = escape(str(e))
+        await message.reply(
+            f"Сталася помилка під час синтезу або конвертації: <code>{err}</code>\n"
+            f"Переконайся, що ffmpeg встановлено правильно."
+        )
@@ -2,12 +2,23 @@ from aiogram import Bot
 from aiogram import Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from config.bot_config import TOKEN
+from config.bot_config import FSM_STORAGE, TOKEN
 from services.bot_services.buttons import ButtonOrchestrator
+from services.bot_services.fsm_storage import CompactRedisStorage
+from services.cache_service.cache_service import fsm_redis_client
 
-dispatcher = Dispatcher(storage=MemoryStorage())
+
+def create_fsm_storage() -> BaseStorage:
+    if FSM_STORAGE == "memory":
+        return MemoryStorage()
+
+    return CompactRedisStorage(redis=fsm_redis_client)
+
+
+dispatcher = Dispatcher(storage=create_fsm_storage())
 bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 
 
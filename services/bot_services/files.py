@@ -1,25 +1,11 @@
 from pathlib import Path
 
-from services.cache_service.cache_service import words_redis_client
-from services.cache_service.schemas import WordsCache
+from services.deck_service.deck_reader import get_file_format, parse_deck
 
 
-def upload_files_to_cache():
-    file_names = ["B1 LEVEL WORDS.xlsx", "A2 LEVEL WORDS.xlsx", "HOUSE WORDS.xlsx"]
-
-    for file_name in file_names:
-        file_path = Path("constants/files") / file_name
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
-
-        match file_name:
-            case "B1 LEVEL WORDS.xlsx":
-                key = WordsCache.B_LEVEL_WORDS.value
-            case "A2 LEVEL WORDS.xlsx":
-                key = WordsCache.A_LEVEL_WORDS.value
-            case "HOUSE WORDS.xlsx":
-                key = WordsCache.SPECIAL_WORDS.value
-            case _:
-                raise ValueError(f"Неизвестный файл: {file_name}")
-
-        words_redis_client.set(name=key, value=file_bytes)
+def read_word_pairs(file_path: Path | str) -> list[tuple[str, str]]:
+    file_path = Path(file_path)
+    deck = parse_deck(
+        file_bytes=file_path.read_bytes(), file_format=get_file_format(file_path.name)
+    )
+    return list(deck.word_pairs)
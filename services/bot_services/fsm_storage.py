@@ -0,0 +1,243 @@
+import json
+import re
+import struct
+import time
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from redis.asyncio import Redis
+
+from config.bot_config import FSM_SESSION_TTL_IN_SEC
+from constants.enums import StateKeys
+
+FSM_KEY_PREFIX = "fsm"
+FSM_STATE_FIELD = "s"
+FSM_DATA_FIELD = "d"
+FSM_JSON_FORMAT_VERSION = b"\x01"
+FSM_DATA_FORMAT_VERSION = b"\x02"
+FSM_UNKNOWN_KEY_PREFIX = "_"
+FSM_PREFETCH_LIVES_IN_SEC = 1.0
+FSM_PREFETCH_MAX_KEYS = 10000
+
+STATE_KEY_ALIASES = {
+    StateKeys.QUIZ_SESSION.value: "q",
+    StateKeys.QUIZ_DECK_ID.value: "d",
+    StateKeys.CURRENT_WORD.value: "w",
+    StateKeys.CURRENT_TRANSLATION.value: "t",
+    StateKeys.FILE_TYPE.value: "f",
+    StateKeys.ROW_INDEX.value: "i",
+}
+STATE_KEY_NAMES = {alias: name for name, alias in STATE_KEY_ALIASES.items()}
+
+NONE_TAG = 0
+TRUE_TAG = 1
+FALSE_TAG = 2
+INT_TAG = 3
+FLOAT_TAG = 4
+STR_TAG = 5
+HEX_TAG = 6
+LIST_TAG = 7
+DICT_TAG = 8
+
+HEX_PATTERN = re.compile(r"(?:[0-9a-f]{2}){8,}")
+FLOAT_STRUCT = struct.Struct(">d")
+
+
+def write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(raw: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = raw[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def write_value(buffer: bytearray, value: Any):
+    if value is None:
+        buffer.append(NONE_TAG)
+    elif value is True:
+        buffer.append(TRUE_TAG)
+    elif value is False:
+        buffer.append(FALSE_TAG)
+    elif isinstance(value, int):
+        buffer.append(INT_TAG)
+        write_varint(buffer=buffer, value=value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        buffer.append(FLOAT_TAG)
+        buffer += FLOAT_STRUCT.pack(value)
+    elif isinstance(value, str) and HEX_PATTERN.fullmatch(value):
+        buffer.append(HEX_TAG)
+        write_varint(buffer=buffer, value=len(value) // 2)
+        buffer += bytes.fromhex(value)
+    elif isinstance(value, str):
+        encoded = value.encode()
+        buffer.append(STR_TAG)
+        write_varint(buffer=buffer, value=len(encoded))
+        buffer += encoded
+    elif isinstance(value, (list, tuple)):
+        buffer.append(LIST_TAG)
+        write_varint(buffer=buffer, value=len(value))
+        for item in value:
+            write_value(buffer=buffer, value=item)
+    elif isinstance(value, dict):
+        buffer.append(DICT_TAG)
+        write_varint(buffer=buffer, value=len(value))
+        for key, item in value.items():
+            write_value(buffer=buffer, value=str(key))
+            write_value(buffer=buffer, value=item)
+    else:
+        raise TypeError(f"Unsupported FSM data type: {type(value).__name__}")
+
+
+def read_value(raw: bytes, offset: int) -> tuple[Any, int]:
+    tag = raw[offset]
+    offset += 1
+    if tag == NONE_TAG:
+        return None, offset
+    if tag == TRUE_TAG:
+        return True, offset
+    if tag == FALSE_TAG:
+        return False, offset
+    if tag == INT_TAG:
+        value, offset = read_varint(raw=raw, offset=offset)
+        return (-(value >> 1) - 1 if value & 1 else value >> 1), offset
+    if tag == FLOAT_TAG:
+        return FLOAT_STRUCT.unpack_from(raw, offset)[0], offset + FLOAT_STRUCT.size
+
+    if tag in (STR_TAG, HEX_TAG):
+        length, offset = read_varint(raw=raw, offset=offset)
+        chunk = raw[offset:offset + length]
+        return (chunk.decode() if tag == STR_TAG else chunk.hex()), offset + length
+
+    length, offset = read_varint(raw=raw, offset=offset)
+    if tag == LIST_TAG:
+        items = []
+        for _ in range(length):
+            item, offset = read_value(raw=raw, offset=offset)
+            items.append(item)
+        return items, offset
+
+    if tag == DICT_TAG:
+        items = {}
+        for _ in range(length):
+            key, offset = read_value(raw=raw, offset=offset)
+            items[key], offset = read_value(raw=raw, offset=offset)
+        return items, offset
+
+    raise ValueError(f"Unknown FSM data tag: {tag}")
+
+
+def encode_state_data(data: dict[str, Any]) -> bytes:
+    compact = {
+        STATE_KEY_ALIASES.get(key, f"{FSM_UNKNOWN_KEY_PREFIX}{key}"): value
+        for key, value in data.items()
+    }
+    buffer = bytearray(FSM_DATA_FORMAT_VERSION)
+    write_value(buffer=buffer, value=compact)
+    return bytes(buffer)
+
+
+def decode_state_data(raw: bytes | None) -> dict[str, Any]:
+    if not raw:
+        return {}
+
+    version = raw[:1]
+    if version == FSM_DATA_FORMAT_VERSION:
+        compact, _ = read_value(raw=raw, offset=1)
+    elif version == FSM_JSON_FORMAT_VERSION:
+        compact = json.loads(raw[1:])
+    else:
+        return {}
+
+    return {
+        STATE_KEY_NAMES.get(key, key.removeprefix(FSM_UNKNOWN_KEY_PREFIX)): value
+        for key, value in compact.items()
+    }
+
+
+class CompactRedisStorage(BaseStorage):
+    def __init__(self, redis: Redis, ttl_in_sec: int = FSM_SESSION_TTL_IN_SEC):
+        self.redis = redis
+        self.ttl_in_sec = ttl_in_sec
+        self._prefetched_data: dict[str, tuple[float, bytes | None]] = {}
+
+    @staticmethod
+    def make_key(key: StorageKey) -> str:
+        parts = [FSM_KEY_PREFIX, str(key.bot_id), str(key.chat_id), str(key.user_id)]
+        if key.thread_id:
+            parts.append(f"t{key.thread_id}")
+        if key.business_connection_id:
+            parts.append(f"b{key.business_connection_id}")
+        if key.destiny != "default":
+            parts.append(key.destiny)
+
+        return ":".join(parts)
+
+    def _prefetch_data(self, redis_key: str, raw: bytes | None):
+        now = time.monotonic()
+        if len(self._prefetched_data) >= FSM_PREFETCH_MAX_KEYS:
+            self._prefetched_data = {
+                key: value
+                for key, value in self._prefetched_data.items()
+                if value[0] > now
+            }
+            if len(self._prefetched_data) >= FSM_PREFETCH_MAX_KEYS:
+                self._prefetched_data.clear()
+
+        self._prefetched_data[redis_key] = (now + FSM_PREFETCH_LIVES_IN_SEC, raw)
+
+    async def _write_field(
+            self, key: StorageKey, field: str, value: bytes | str | None
+    ):
+        redis_key = self.make_key(key=key)
+        self._prefetched_data.pop(redis_key, None)
+        pipeline = self.redis.pipeline(transaction=False)
+        if value is None:
+            pipeline.hdel(redis_key, field)
+        else:
+            pipeline.hset(redis_key, field, value)
+        pipeline.expire(redis_key, self.ttl_in_sec)
+        await pipeline.execute()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state_name = state.state if isinstance(state, State) else state
+        await self._write_field(key=key, field=FSM_STATE_FIELD, value=state_name)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        redis_key = self.make_key(key=key)
+        state_name, raw_data = await self.redis.hmget(
+            redis_key, FSM_STATE_FIELD, FSM_DATA_FIELD
+        )
+        self._prefetch_data(redis_key=redis_key, raw=raw_data)
+        if isinstance(state_name, bytes):
+            return state_name.decode()
+
+        return state_name
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        await self._write_field(
+            key=key,
+            field=FSM_DATA_FIELD,
+            value=encode_state_data(data=data) if data else None,
+        )
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        redis_key = self.make_key(key=key)
+        expires_at, raw = self._prefetched_data.pop(redis_key, (0.0, None))
+        if expires_at < time.monotonic():
+            raw = await self.redis.hget(redis_key, FSM_DATA_FIELD)
+
+        return decode_state_data(raw=raw)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+from config.bot_config import HINT_EDIT_INTERVAL_IN_SEC
+
+
+class ThrottledMessageEditor:
+    def __init__(self, message: Message, interval: float = HINT_EDIT_INTERVAL_IN_SEC):
+        self.message = message
+        self.interval = interval
+        self._next_edit_at = 0.0
+        self._last_text = None
+
+    async def _edit_text(self, text: str, **kwargs):
+        try:
+            await self.message.edit_text(text=text, **kwargs)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e).lower():
+                raise
+
+    async def edit(self, text: str, force: bool = False, **kwargs):
+        if text == self._last_text:
+            return
+
+        if not force and time.monotonic() < self._next_edit_at:
+            return
+
+        try:
+            await self._edit_text(text=text, **kwargs)
+        except TelegramRetryAfter as e:
+            if not force:
+                self._next_edit_at = time.monotonic() + e.retry_after
+                return
+
+            await asyncio.sleep(e.retry_after)
+            await self._edit_text(text=text, **kwargs)
+
+        self._last_text = text
+        self._next_edit_at = time.monotonic() + self.interval
@@ -0,0 +1,106 @@
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, InputFile, Message
+from redis.exceptions import RedisError
+
+from services.cache_service.cache_service import generation_redis_client
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.metrics import get_metrics, Metrics
+
+telegram_files_metrics = get_metrics(name="telegram_files", log_every=200)
+
+FILE_ID_ERROR_PHRASES = (
+    "wrong file identifier",
+    "wrong remote file identifier",
+    "file reference expired",
+    "file_id_invalid",
+)
+
+
+@lru_cache(maxsize=128)
+def get_content_hash(path: str, modified_at: float) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def is_file_id_error(error: TelegramBadRequest) -> bool:
+    message = error.message.lower()
+    return any(phrase in message for phrase in FILE_ID_ERROR_PHRASES)
+
+
+async def send_cached_file(
+        send: Callable[[InputFile | str], Awaitable[Message]],
+        file_id: str | None,
+        make_upload: Callable[[], Awaitable[InputFile]],
+        forget_file_id: Callable[[], None],
+        remember_file_id: Callable[[Message], None],
+        metrics: Metrics,
+) -> Message:
+    if file_id:
+        try:
+            sent_message = await send(file_id)
+            metrics.incr(key="file_id_hits")
+            return sent_message
+        except TelegramBadRequest as e:
+            if not is_file_id_error(error=e):
+                raise
+
+            logging.warning("Cached file_id was rejected, re-uploading: %s", e)
+            metrics.incr(key="stale_file_ids")
+            forget_file_id()
+
+    sent_message = await send(await make_upload())
+    metrics.incr(key="uploads")
+    remember_file_id(sent_message)
+    return sent_message
+
+
+class StaticFileRegistry:
+    @staticmethod
+    def make_key(path: str) -> str:
+        content_hash = get_content_hash(path=path, modified_at=Path(path).stat().st_mtime)
+        return f"{CacheKeyPrefixes.TELEGRAM_FILE_ID.value}:{content_hash}"
+
+    @staticmethod
+    def get_file_id(key: str) -> str | None:
+        try:
+            return generation_redis_client.get(name=key)
+        except RedisError as e:
+            logging.warning("Telegram file_id registry read failed: %s", e)
+            return None
+
+    @staticmethod
+    def set_file_id(key: str, file_id: str | None):
+        try:
+            if file_id:
+                generation_redis_client.set(name=key, value=file_id)
+            else:
+                generation_redis_client.delete(key)
+        except RedisError as e:
+            logging.warning("Telegram file_id registry write failed: %s", e)
+
+    @classmethod
+    async def send_document(
+            cls, message: Message, path: str, filename: str, **kwargs
+    ) -> Message:
+        key = cls.make_key(path=path)
+
+        async def make_upload() -> InputFile:
+            return FSInputFile(path=path, filename=filename)
+
+        def remember_file_id(sent_message: Message):
+            if sent_message.document:
+                cls.set_file_id(key=key, file_id=sent_message.document.file_id)
+
+        return await send_cached_file(
+            send=lambda document: message.answer_document(document=document, **kwargs),
+            file_id=cls.get_file_id(key=key),
+            make_upload=make_upload,
+            forget_file_id=lambda: cls.set_file_id(key=key, file_id=None),
+            remember_file_id=remember_file_id,
+            metrics=telegram_files_metrics,
+        )
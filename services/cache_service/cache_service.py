@@ -1,12 +1,29 @@
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
-from config.background_tasks_config import REDIS_HOST
+from config.background_tasks_config import REDIS_HOST, REDIS_STATE_HOST
 
 USER_SUB_CACHE_STORES_IN_SEC = 3600
 WORDS_FILE_LIVES_IN_SEC = 86400
+VERDICT_CACHE_LIVES_IN_SEC = 2592000
+GENERATION_CACHE_LIVES_IN_SEC = 2592000
 
 cache_user_sub_redis_client = Redis(
     host=REDIS_HOST, port=6379, db=1, decode_responses=True
 )
 
 words_redis_client = Redis(host=REDIS_HOST, port=6379, db=2)
+
+verdict_redis_client = Redis(
+    host=REDIS_HOST, port=6379, db=3, decode_responses=True
+)
+
+generation_redis_client = Redis(
+    host=REDIS_HOST, port=6379, db=4, decode_responses=True
+)
+
+activity_redis_client = Redis(
+    host=REDIS_STATE_HOST, port=6379, db=6, decode_responses=True
+)
+
+fsm_redis_client = AsyncRedis(host=REDIS_STATE_HOST, port=6379, db=5)
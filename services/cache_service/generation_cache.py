@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from config.openai_config import OPENAI_GENERATION_TEMPERATURE
+from services.cache_service.cache_service import (
+    generation_redis_client,
+    GENERATION_CACHE_LIVES_IN_SEC,
+)
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.gpt_service.client import ask_gpt_async, stream_gpt_async
+from services.gpt_service.prompts import CREATE_SENTENCE_PROMPT, DESCRIBE_WORD_PROMPT
+from services.gpt_service.schemas import LLMPriorities
+from services.metrics import get_metrics
+
+GENERATION_VARIANTS_PER_KEY = 3
+GENERATION_L1_MAX_KEYS = 5000
+
+
+@dataclass
+class CachedVariants:
+    variants: list[str] = field(default_factory=list)
+    position: int = 0
+
+    def rotate(self) -> str:
+        variant = self.variants[self.position % len(self.variants)]
+        self.position += 1
+        return variant
+
+
+class GenerationCache:
+    def __init__(
+            self,
+            name: str,
+            prompt: Callable[..., str],
+            priority: LLMPriorities,
+            generate: Callable[..., Awaitable[str]] = ask_gpt_async,
+            stream_generate: Callable[..., AsyncIterator[str]] = stream_gpt_async,
+            variants_per_key: int = GENERATION_VARIANTS_PER_KEY,
+            l1_max_keys: int = GENERATION_L1_MAX_KEYS,
+            temperature: float = OPENAI_GENERATION_TEMPERATURE,
+    ):
+        self.name = name
+        self.prompt = prompt
+        self.priority = priority
+        self.variants_per_key = variants_per_key
+        self.temperature = temperature
+        self.metrics = get_metrics(name=f"generation_cache.{name}", log_every=1000)
+
+        self._generate = generate
+        self._stream_generate = stream_generate
+        self._l1_max_keys = l1_max_keys
+        self._l1: OrderedDict[str, CachedVariants] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._prompt_version = hashlib.sha1(
+            prompt(current_word="{current_word}", translation="{translation}").encode()
+        ).hexdigest()[:12]
+
+    def make_key(self, word: str, translation: str) -> str:
+        digest = hashlib.sha1(f"{word}\x1f{translation}".encode()).hexdigest()
+        return (
+            f"{CacheKeyPrefixes.GENERATED_TEXT.value}:{self.name}:"
+            f"{self._prompt_version}:{digest}"
+        )
+
+    def _remember(self, key: str, cached: CachedVariants):
+        self._l1[key] = cached
+        self._l1.move_to_end(key)
+
+        while len(self._l1) > self._l1_max_keys:
+            self._l1.popitem(last=False)
+            self.metrics.incr(key="l1_evictions")
+
+    def _load_from_redis(self, key: str) -> list[str]:
+        try:
+            return generation_redis_client.lrange(name=key, start=0, end=-1)
+        except RedisError as e:
+            logging.warning("Generation cache read failed: %s", e)
+            self.metrics.incr(key="redis_errors")
+            return []
+
+    def _store_in_redis(self, key: str, variant: str):
+        try:
+            pipeline = generation_redis_client.pipeline()
+            pipeline.rpush(key, variant)
+            pipeline.ltrim(key, -self.variants_per_key, -1)
+            pipeline.expire(key, GENERATION_CACHE_LIVES_IN_SEC)
+            pipeline.execute()
+        except RedisError as e:
+            logging.warning("Generation cache write failed: %s", e)
+            self.metrics.incr(key="redis_errors")
+
+    def get_cached_variants(self, word: str, translation: str) -> CachedVariants:
+        key = self.make_key(word=word, translation=translation)
+        cached = self._l1.get(key)
+
+        if cached and len(cached.variants) >= self.variants_per_key:
+            self._l1.move_to_end(key)
+            return cached
+
+        variants = self._load_from_redis(key=key)
+        if cached is None or len(variants) > len(cached.variants):
+            cached = CachedVariants(
+                variants=variants, position=cached.position if cached else 0
+            )
+
+        self._remember(key=key, cached=cached)
+        return cached
+
+    def add_variant(self, word: str, translation: str, variant: str):
+        key = self.make_key(word=word, translation=translation)
+        cached = self._l1.get(key) or CachedVariants()
+        cached.variants = (cached.variants + [variant])[-self.variants_per_key:]
+        self._remember(key=key, cached=cached)
+        self._store_in_redis(key=key, variant=variant)
+
+    async def generate_variant(
+            self, word: str, translation: str, priority: LLMPriorities | None = None
+    ) -> str:
+        with self.metrics.timer(key="generation"):
+            variant = await self._generate(
+                self.prompt(current_word=word, translation=translation),
+                priority=priority or self.priority,
+                temperature=self.temperature,
+            )
+
+        self.add_variant(word=word, translation=translation, variant=variant)
+        return variant
+
+    async def get(self, word: str, translation: str) -> str:
+        key = self.make_key(word=word, translation=translation)
+        cached = self.get_cached_variants(word=word, translation=translation)
+
+        if len(cached.variants) >= self.variants_per_key:
+            self.metrics.incr(key="hits")
+            return cached.rotate()
+
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            if cached.variants:
+                self.metrics.incr(key="hits")
+                return cached.rotate()
+
+            self.metrics.incr(key="coalesced")
+            return await asyncio.shield(in_flight)
+
+        self.metrics.incr(key="misses")
+        in_flight = asyncio.ensure_future(
+            self.generate_variant(word=word, translation=translation)
+        )
+        self._in_flight[key] = in_flight
+        try:
+            variant = await asyncio.shield(in_flight)
+        finally:
+            if in_flight.done():
+                self._in_flight.pop(key, None)
+            else:
+                in_flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        return variant
+
+    async def stream(self, word: str, translation: str) -> AsyncIterator[str]:
+        key = self.make_key(word=word, translation=translation)
+        cached = self.get_cached_variants(word=word, translation=translation)
+        in_flight = self._in_flight.get(key)
+
+        if len(cached.variants) >= self.variants_per_key or (
+                in_flight and cached.variants
+        ):
+            self.metrics.incr(key="hits")
+            yield cached.rotate()
+            return
+
+        if in_flight:
+            self.metrics.incr(key="coalesced")
+            yield await asyncio.shield(in_flight)
+            return
+
+        self.metrics.incr(key="misses")
+        in_flight = asyncio.get_running_loop().create_future()
+        in_flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = in_flight
+
+        text = ""
+        try:
+            with self.metrics.timer(key="generation"):
+                async for delta in self._stream_generate(
+                    self.prompt(current_word=word, translation=translation),
+                    priority=self.priority,
+                    temperature=self.temperature,
+                ):
+                    text += delta
+                    yield text
+
+            variant = text.strip()
+            self.add_variant(word=word, translation=translation, variant=variant)
+            in_flight.set_result(variant)
+        except Exception as e:
+            in_flight.set_exception(e)
+            raise
+        finally:
+            if not in_flight.done():
+                in_flight.cancel()
+            self._in_flight.pop(key, None)
+
+    def get_hit_ratio(self) -> float:
+        return self.metrics.ratio("hits", "hits", "coalesced", "misses")
+
+
+hint_cache = GenerationCache(
+    name="hint", prompt=DESCRIBE_WORD_PROMPT, priority=LLMPriorities.HINT
+)
+sentence_cache = GenerationCache(
+    name="sentence", prompt=CREATE_SENTENCE_PROMPT, priority=LLMPriorities.SENTENCE
+)
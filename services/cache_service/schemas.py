@@ -1,7 +1,16 @@
 from enum import Enum
 
 
-class WordsCache(Enum):
-    A_LEVEL_WORDS = "a_level_words"
-    B_LEVEL_WORDS = "b_level_words"
-    SPECIAL_WORDS = "special_words"
+class CacheKeyPrefixes(Enum):
+    ANSWER_VERDICT = "answer_verdict"
+    ACCEPTED_ANSWERS = "accepted_answers"
+    GENERATED_TEXT = "generated_text"
+    TRANSLATION = "translation"
+    VOICE_FILE_ID = "voice_file_id"
+    TELEGRAM_FILE_ID = "telegram_file_id"
+    COMPILED_DECK = "compiled_deck"
+    COMPILED_DECK_SOURCE = "compiled_deck_source"
+    PREGENERATION_CURSOR = "pregeneration_cursor"
+    ACTIVITY_ROLLUP = "activity_rollup"
+    USER_STATS = "user_stats"
+    LLM_RATE_BUCKET = "llm_rate_bucket"
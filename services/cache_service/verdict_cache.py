@@ -0,0 +1,74 @@
+import hashlib
+import logging
+
+from redis.exceptions import RedisError
+
+from services.cache_service.cache_service import (
+    verdict_redis_client,
+    VERDICT_CACHE_LIVES_IN_SEC,
+)
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.gpt_service.client import make_check_prompt
+from services.grading_service.local_grader import normalize_answer
+from services.metrics import get_metrics
+
+verdict_cache_metrics = get_metrics(name="verdict_cache", log_every=500)
+
+CHECK_PROMPT_VERSION = hashlib.sha1(
+    make_check_prompt(
+        word="{word}",
+        correct_translation="{correct_translation}",
+        user_translation="{user_translation}",
+    ).encode()
+).hexdigest()[:12]
+
+
+class VerdictCache:
+    @staticmethod
+    def make_key(word: str, correct_translation: str, user_translation: str) -> str:
+        triple = "\x1f".join(
+            normalize_answer(value)
+            for value in (word, correct_translation, user_translation)
+        )
+        digest = hashlib.sha1(triple.encode()).hexdigest()
+        return f"{CacheKeyPrefixes.ANSWER_VERDICT.value}:{CHECK_PROMPT_VERSION}:{digest}"
+
+    @classmethod
+    def get(
+            cls, word: str, correct_translation: str, user_translation: str
+    ) -> str | None:
+        key = cls.make_key(word, correct_translation, user_translation)
+
+        try:
+            verdict = verdict_redis_client.getex(
+                name=key, ex=VERDICT_CACHE_LIVES_IN_SEC
+            )
+        except RedisError as e:
+            logging.warning("Verdict cache read failed: %s", e)
+            verdict_cache_metrics.incr("errors")
+            return None
+
+        verdict_cache_metrics.incr("hits" if verdict else "misses")
+        return verdict
+
+    @classmethod
+    def set(
+            cls,
+            word: str,
+            correct_translation: str,
+            user_translation: str,
+            verdict: str,
+    ):
+        key = cls.make_key(word, correct_translation, user_translation)
+
+        try:
+            verdict_redis_client.set(
+                name=key, value=verdict, ex=VERDICT_CACHE_LIVES_IN_SEC
+            )
+        except RedisError as e:
+            logging.warning("Verdict cache write failed: %s", e)
+            verdict_cache_metrics.incr("errors")
+
+    @staticmethod
+    def get_hit_ratio() -> float:
+        return verdict_cache_metrics.ratio("hits", "hits", "misses")
@@ -0,0 +1,97 @@
+import hashlib
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from functools import cached_property
+
+from constants.exceptions import NotValidDeckFormat
+
+DECK_MAGIC = b"WDCK"
+DECK_SCHEMA_VERSION = 1
+DECK_HEADER = struct.Struct("<4sHI")
+
+
+def normalize_deck_cell(value) -> str:
+    if value is None or value != value:
+        return ""
+
+    return " ".join(str(value).split())
+
+
+@dataclass(frozen=True)
+class CompiledDeck:
+    word_pairs: tuple[tuple[str, str], ...]
+
+    @classmethod
+    def compile(cls, rows) -> "CompiledDeck":
+        pairs = {}
+        for row in rows:
+            word = normalize_deck_cell(row[0])
+            translation = normalize_deck_cell(row[1])
+            if word and translation:
+                pairs[word] = translation
+
+        return cls(word_pairs=tuple(pairs.items()))
+
+    @cached_property
+    def deck_id(self) -> str:
+        return hashlib.sha1(self.to_bytes()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.word_pairs)
+
+    def as_dict(self) -> dict[str, str]:
+        return dict(self.word_pairs)
+
+    def to_bytes(self) -> bytes:
+        texts = [text for pair in self.word_pairs for text in pair]
+        lengths = array("I", (len(text) for text in texts))
+        if sys.byteorder != "little":
+            lengths.byteswap()
+
+        return b"".join(
+            (
+                DECK_HEADER.pack(DECK_MAGIC, DECK_SCHEMA_VERSION, len(self.word_pairs)),
+                lengths.tobytes(),
+                "".join(texts).encode(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompiledDeck":
+        if len(data) < DECK_HEADER.size:
+            raise NotValidDeckFormat("Compiled deck is truncated.")
+
+        magic, version, pairs_count = DECK_HEADER.unpack_from(data)
+        if magic != DECK_MAGIC or version != DECK_SCHEMA_VERSION:
+            raise NotValidDeckFormat(
+                f"Unsupported compiled deck format {magic!r} v{version}."
+            )
+
+        lengths_end = DECK_HEADER.size + pairs_count * 2 * 4
+        if len(data) < lengths_end:
+            raise NotValidDeckFormat("Compiled deck lengths table is truncated.")
+
+        lengths = array("I")
+        try:
+            lengths.frombytes(data[DECK_HEADER.size:lengths_end])
+            text = data[lengths_end:].decode()
+        except (ValueError, UnicodeDecodeError) as e:
+            raise NotValidDeckFormat("Compiled deck is corrupted.") from e
+        if sys.byteorder != "little":
+            lengths.byteswap()
+
+        if sum(lengths) > len(text):
+            raise NotValidDeckFormat("Compiled deck payload is truncated.")
+
+        texts = []
+        position = 0
+        for length in lengths:
+            texts.append(text[position:position + length])
+            position += length
+
+        if position != len(text):
+            raise NotValidDeckFormat("Compiled deck is corrupted.")
+
+        return cls(word_pairs=tuple(zip(texts[::2], texts[1::2])))
@@ -0,0 +1,122 @@
+import io
+import logging
+
+from minio.error import S3Error
+
+from config.storage_service_config import MINIO_BUCKET_NAME
+from constants.constants import AVAILABLE_FILE_FORMATS
+from constants.exceptions import NotValidDeckFormat
+from services.deck_service.compiled_deck import CompiledDeck, DECK_SCHEMA_VERSION
+from services.metrics import get_metrics
+from services.storage_service import storage_client
+
+DECK_ARCHIVE_PREFIX = "decks"
+DECK_ARCHIVE_CONTENT_TYPE = "application/octet-stream"
+
+deck_archive_metrics = get_metrics(name="deck_archive", log_every=200)
+
+
+def read_object(object_name: str) -> bytes:
+    response = storage_client.get_object(
+        bucket_name=MINIO_BUCKET_NAME, object_name=object_name
+    )
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+class DeckArchive:
+    @staticmethod
+    def make_object_name(deck_id: str) -> str:
+        return f"{DECK_ARCHIVE_PREFIX}/v{DECK_SCHEMA_VERSION}/{deck_id}.wdck"
+
+    @classmethod
+    def exists(cls, deck_id: str) -> bool:
+        try:
+            storage_client.stat_object(
+                bucket_name=MINIO_BUCKET_NAME,
+                object_name=cls.make_object_name(deck_id=deck_id),
+            )
+        except S3Error:
+            return False
+
+        return True
+
+    @classmethod
+    def put(cls, deck: CompiledDeck) -> bool:
+        if cls.exists(deck_id=deck.deck_id):
+            deck_archive_metrics.incr(key="deduplicated")
+            return False
+
+        deck_bytes = deck.to_bytes()
+        storage_client.put_object(
+            bucket_name=MINIO_BUCKET_NAME,
+            object_name=cls.make_object_name(deck_id=deck.deck_id),
+            data=io.BytesIO(deck_bytes),
+            length=len(deck_bytes),
+            content_type=DECK_ARCHIVE_CONTENT_TYPE,
+        )
+        deck_archive_metrics.incr(key="stored")
+        deck_archive_metrics.incr(key="stored_bytes", amount=len(deck_bytes))
+        return True
+
+    @classmethod
+    def get(cls, deck_id: str) -> CompiledDeck | None:
+        try:
+            deck_bytes = read_object(object_name=cls.make_object_name(deck_id=deck_id))
+        except S3Error:
+            deck_archive_metrics.incr(key="misses")
+            return None
+
+        try:
+            return CompiledDeck.from_bytes(deck_bytes)
+        except NotValidDeckFormat as e:
+            logging.warning("Archived deck %s is unreadable: %s", deck_id, e)
+            return None
+
+    @classmethod
+    def delete(cls, deck_id: str):
+        storage_client.remove_object(
+            bucket_name=MINIO_BUCKET_NAME,
+            object_name=cls.make_object_name(deck_id=deck_id),
+        )
+        deck_archive_metrics.incr(key="deleted")
+
+    @classmethod
+    def make_file_link(cls, deck_id: str) -> str:
+        return storage_client.presigned_get_object(
+            MINIO_BUCKET_NAME, cls.make_object_name(deck_id=deck_id)
+        )
+
+
+class LegacyUserFiles:
+    @staticmethod
+    def make_object_name(user_id: int, file_format: str) -> str:
+        return f"{user_id}.{file_format}"
+
+    @classmethod
+    def get_latest(cls, user_id: int) -> tuple[bytes, str] | None:
+        latest_format, latest_modified = None, None
+        for file_format in AVAILABLE_FILE_FORMATS:
+            try:
+                file_stat = storage_client.stat_object(
+                    bucket_name=MINIO_BUCKET_NAME,
+                    object_name=cls.make_object_name(
+                        user_id=user_id, file_format=file_format
+                    ),
+                )
+            except S3Error:
+                continue
+
+            if latest_modified is None or file_stat.last_modified > latest_modified:
+                latest_format, latest_modified = file_format, file_stat.last_modified
+
+        if latest_format is None:
+            return None
+
+        file_bytes = read_object(
+            object_name=cls.make_object_name(user_id=user_id, file_format=latest_format)
+        )
+        return file_bytes, latest_format
@@ -0,0 +1,183 @@
+import asyncio
+import faulthandler
+import logging
+import multiprocessing
+import signal
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from config.deck_ingestion_config import (
+    DECK_INGESTION_MAX_PENDING,
+    DECK_INGESTION_TASKS_PER_WORKER,
+    DECK_INGESTION_WORKERS,
+    DECK_MAX_DECOMPRESSED_SIZE_IN_BYTES,
+    DECK_MAX_FILE_SIZE_IN_BYTES,
+    DECK_MAX_ROWS,
+    DECK_PARSE_TIMEOUT_IN_SEC,
+)
+from constants.exceptions import DeckIngestionBusy, DeckIngestionRejected
+from services.deck_service.compiled_deck import CompiledDeck
+from services.deck_service.deck_reader import normalize_file_format, parse_deck
+from services.metrics import get_metrics
+
+PARENT_TIMEOUT_GRACE_IN_SEC = 2
+WORKER_EXIT_GRACE_IN_SEC = 2 * PARENT_TIMEOUT_GRACE_IN_SEC
+
+ingestion_metrics = get_metrics(name="deck_ingestion", log_every=100)
+
+
+def check_file_size(file_size: int | None):
+    if file_size is not None and file_size > DECK_MAX_FILE_SIZE_IN_BYTES:
+        raise DeckIngestionRejected(
+            f"File is larger than {DECK_MAX_FILE_SIZE_IN_BYTES // (1024 * 1024)} MB."
+        )
+
+
+def check_decompressed_size(file_bytes: bytes, file_format: str, max_size: int):
+    if file_format != "xlsx":
+        return
+
+    try:
+        with zipfile.ZipFile(BytesIO(file_bytes)) as archive:
+            decompressed_size = sum(member.file_size for member in archive.infolist())
+    except zipfile.BadZipFile as e:
+        raise DeckIngestionRejected("File is not a valid xlsx workbook.") from e
+
+    if decompressed_size > max_size:
+        raise DeckIngestionRejected("Workbook is too large once unpacked.")
+
+
+def on_parse_timeout(signum, frame):
+    raise DeckIngestionRejected("File took too long to read.")
+
+
+def parse_deck_in_worker(
+        file_bytes: bytes,
+        file_format: str,
+        max_rows: int,
+        max_decompressed_size: int,
+        timeout_in_sec: float,
+) -> bytes:
+    signal.signal(signal.SIGALRM, on_parse_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout_in_sec)
+    faulthandler.dump_traceback_later(
+        timeout_in_sec + WORKER_EXIT_GRACE_IN_SEC, exit=True
+    )
+    try:
+        check_decompressed_size(
+            file_bytes=file_bytes,
+            file_format=file_format,
+            max_size=max_decompressed_size,
+        )
+        deck = parse_deck(file_bytes=file_bytes, file_format=file_format, max_rows=max_rows)
+        return deck.to_bytes()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        faulthandler.cancel_dump_traceback_later()
+
+
+class DeckIngestionPool:
+    def __init__(
+            self,
+            workers: int = DECK_INGESTION_WORKERS,
+            max_pending: int = DECK_INGESTION_MAX_PENDING,
+            timeout_in_sec: float = DECK_PARSE_TIMEOUT_IN_SEC,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout_in_sec = timeout_in_sec
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._admitted = 0
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                max_tasks_per_child=DECK_INGESTION_TASKS_PER_WORKER,
+            )
+
+        return self._executor
+
+    def recycle_executor(self):
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+
+        executor.shutdown(wait=False, cancel_futures=True)
+        ingestion_metrics.incr(key="pool_recycles")
+
+    async def parse(self, file_bytes: bytes, file_format: str) -> CompiledDeck:
+        check_file_size(file_size=len(file_bytes))
+        file_format = normalize_file_format(file_format)
+
+        if self._admitted >= self.workers + self.max_pending:
+            ingestion_metrics.incr(key="rejected.busy")
+            raise DeckIngestionBusy("Deck ingestion queue is full.")
+
+        self._admitted += 1
+        ingestion_metrics.set_gauge(key="admitted", value=self._admitted)
+        enqueued_at = time.perf_counter()
+        try:
+            async with self._slots:
+                ingestion_metrics.observe(
+                    key="queue_wait", seconds=time.perf_counter() - enqueued_at
+                )
+                return await self._parse_in_pool(
+                    file_bytes=file_bytes, file_format=file_format
+                )
+        finally:
+            self._admitted -= 1
+            ingestion_metrics.set_gauge(key="admitted", value=self._admitted)
+
+    async def _parse_in_pool(self, file_bytes: bytes, file_format: str) -> CompiledDeck:
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(
+            self.get_executor(),
+            parse_deck_in_worker,
+            file_bytes,
+            file_format,
+            DECK_MAX_ROWS,
+            DECK_MAX_DECOMPRESSED_SIZE_IN_BYTES,
+            self.timeout_in_sec,
+        )
+        try:
+            deck_bytes = await asyncio.wait_for(
+                future, timeout=self.timeout_in_sec + PARENT_TIMEOUT_GRACE_IN_SEC
+            )
+        except asyncio.TimeoutError as e:
+            logging.warning("Deck parse worker is stuck, recycling the pool")
+            self.recycle_executor()
+            ingestion_metrics.incr(key="rejected.timeout")
+            raise DeckIngestionRejected("File took too long to read.") from e
+        except BrokenProcessPool as e:
+            self.recycle_executor()
+            ingestion_metrics.incr(key="rejected.crashed")
+            raise DeckIngestionRejected("File could not be read.") from e
+        except DeckIngestionRejected:
+            ingestion_metrics.incr(key="rejected.limits")
+            raise
+        finally:
+            ingestion_metrics.observe(key="parse", seconds=time.perf_counter() - started)
+
+        ingestion_metrics.incr(key="parsed")
+        return CompiledDeck.from_bytes(deck_bytes)
+
+
+_deck_ingestion_pools: dict[asyncio.AbstractEventLoop, DeckIngestionPool] = {}
+
+
+def get_deck_ingestion_pool() -> DeckIngestionPool:
+    loop = asyncio.get_running_loop()
+
+    if loop not in _deck_ingestion_pools:
+        for stale_loop in [key for key in _deck_ingestion_pools if key.is_closed()]:
+            _deck_ingestion_pools.pop(stale_loop).recycle_executor()
+
+        _deck_ingestion_pools[loop] = DeckIngestionPool()
+
+    return _deck_ingestion_pools[loop]
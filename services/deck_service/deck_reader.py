@@ -0,0 +1,96 @@
+import codecs
+import csv
+from io import BytesIO
+from typing import Iterable, Iterator
+
+from openpyxl import load_workbook
+
+from constants.constants import AVAILABLE_FILE_FORMATS
+from constants.exceptions import (
+    DeckIngestionRejected,
+    NotValidColumnSet,
+    NotValidFileContentType,
+)
+from services.deck_service.compiled_deck import CompiledDeck, normalize_deck_cell
+
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+
+def normalize_file_format(file_format: str) -> str:
+    return file_format.strip().lstrip(".").lower()
+
+
+def get_file_format(file_name: str) -> str:
+    return normalize_file_format(file_name.rsplit(".", 1)[-1])
+
+
+def iter_xlsx_rows(file_bytes: bytes) -> Iterator[tuple]:
+    workbook = load_workbook(BytesIO(file_bytes), read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_delimited_rows(file_bytes: bytes, delimiter: str) -> Iterator[list[str]]:
+    reader = codecs.getreader("utf-8-sig")(BytesIO(file_bytes))
+    yield from csv.reader(reader, delimiter=delimiter)
+
+
+def iter_raw_rows(file_bytes: bytes, file_format: str) -> Iterator[tuple | list]:
+    file_format = normalize_file_format(file_format)
+
+    if file_format == "xlsx":
+        return iter_xlsx_rows(file_bytes=file_bytes)
+
+    if file_format in DELIMITERS:
+        return iter_delimited_rows(
+            file_bytes=file_bytes, delimiter=DELIMITERS[file_format]
+        )
+
+    raise NotValidFileContentType(f"The file must be in formats {AVAILABLE_FILE_FORMATS}.")
+
+
+def validate_rows(
+        rows: Iterable[tuple | list], max_rows: int | None = None
+) -> Iterator[tuple[str, str]]:
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None or len(header) < 2:
+        raise NotValidColumnSet("File must have at least two columns.")
+
+    for row_number, row in enumerate(rows, start=2):
+        if max_rows is not None and row_number - 1 > max_rows:
+            raise DeckIngestionRejected(f"File has more than {max_rows} rows.")
+
+        cells = [normalize_deck_cell(cell) for cell in row[:2]]
+        if not any(cells):
+            continue
+
+        if len(cells) < 2 or not all(cells):
+            raise ValueError(f"Row {row_number} has an empty word or translation.")
+
+        yield cells[0], cells[1]
+
+
+def read_deck_rows(
+        file_bytes: bytes, file_format: str, max_rows: int | None = None
+) -> Iterator[tuple[str, str]]:
+    return validate_rows(
+        rows=iter_raw_rows(file_bytes=file_bytes, file_format=file_format),
+        max_rows=max_rows,
+    )
+
+
+def parse_deck(
+        file_bytes: bytes, file_format: str = "xlsx", max_rows: int | None = None
+) -> CompiledDeck:
+    deck = CompiledDeck.compile(
+        rows=read_deck_rows(
+            file_bytes=file_bytes, file_format=file_format, max_rows=max_rows
+        )
+    )
+    if not deck:
+        raise NotValidColumnSet("File has no word pairs.")
+
+    return deck
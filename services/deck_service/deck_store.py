@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from constants.constants import BUILT_IN_WORD_FILES, PATH_TO_WORD_FILES
+from constants.exceptions import NotValidDeckFormat
+from services.cache_service.cache_service import (
+    words_redis_client,
+    WORDS_FILE_LIVES_IN_SEC,
+)
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.deck_service.compiled_deck import CompiledDeck, DECK_SCHEMA_VERSION
+from services.deck_service.deck_archive import DeckArchive
+from services.deck_service.deck_reader import parse_deck
+from services.metrics import get_metrics
+
+DECK_L1_MAX_ITEMS = 256
+
+deck_store_metrics = get_metrics(name="deck_store", log_every=500)
+
+
+def make_source_hash(file_bytes: bytes) -> str:
+    return hashlib.sha1(file_bytes).hexdigest()
+
+
+class DeckStore:
+    _l1: OrderedDict[str, CompiledDeck] = OrderedDict()
+    _sources: OrderedDict[str, str] = OrderedDict()
+    _l1_lock = threading.Lock()
+    _built_in_deck_ids: dict[str, str] = {}
+
+    @staticmethod
+    def make_key(deck_id: str) -> str:
+        return f"{CacheKeyPrefixes.COMPILED_DECK.value}:v{DECK_SCHEMA_VERSION}:{deck_id}"
+
+    @staticmethod
+    def make_source_key(source_hash: str) -> str:
+        return (
+            f"{CacheKeyPrefixes.COMPILED_DECK_SOURCE.value}:v{DECK_SCHEMA_VERSION}:"
+            f"{source_hash}"
+        )
+
+    @staticmethod
+    def _remember_in(cache: OrderedDict, key: str, value):
+        cache[key] = value
+        cache.move_to_end(key)
+
+        while len(cache) > DECK_L1_MAX_ITEMS:
+            cache.popitem(last=False)
+
+    @classmethod
+    def _remember(cls, deck: CompiledDeck, source_hash: str | None = None):
+        with cls._l1_lock:
+            cls._remember_in(cache=cls._l1, key=deck.deck_id, value=deck)
+            if source_hash:
+                cls._remember_in(cache=cls._sources, key=source_hash, value=deck.deck_id)
+
+    @classmethod
+    def get_from_l1(cls, deck_id: str) -> CompiledDeck | None:
+        with cls._l1_lock:
+            deck = cls._l1.get(deck_id)
+            if deck is not None:
+                cls._l1.move_to_end(deck_id)
+
+        return deck
+
+    @classmethod
+    def get(cls, deck_id: str) -> CompiledDeck | None:
+        deck = cls.get_from_l1(deck_id=deck_id)
+        if deck is not None:
+            deck_store_metrics.incr(key="l1_hits")
+            return deck
+
+        try:
+            data = words_redis_client.getex(
+                name=cls.make_key(deck_id=deck_id), ex=WORDS_FILE_LIVES_IN_SEC
+            )
+        except RedisError as e:
+            logging.warning("Compiled deck cache read failed: %s", e)
+            return None
+
+        if data is None:
+            deck_store_metrics.incr(key="misses")
+            return None
+
+        try:
+            deck = CompiledDeck.from_bytes(data)
+        except NotValidDeckFormat as e:
+            logging.warning("Dropping unreadable compiled deck %s: %s", deck_id, e)
+            return None
+
+        deck_store_metrics.incr(key="redis_hits")
+        cls._remember(deck=deck)
+        return deck
+
+    @classmethod
+    def get_by_source(cls, source_hash: str) -> CompiledDeck | None:
+        with cls._l1_lock:
+            deck_id = cls._sources.get(source_hash)
+
+        if deck_id is None:
+            try:
+                deck_id = words_redis_client.get(
+                    name=cls.make_source_key(source_hash=source_hash)
+                )
+            except RedisError as e:
+                logging.warning("Compiled deck source read failed: %s", e)
+                return None
+
+            if deck_id is None:
+                return None
+            deck_id = deck_id.decode()
+
+        deck = cls.get(deck_id=deck_id)
+        if deck is not None:
+            cls._remember(deck=deck, source_hash=source_hash)
+
+        return deck
+
+    @classmethod
+    def put(cls, deck: CompiledDeck, source_hash: str | None = None):
+        cls._remember(deck=deck, source_hash=source_hash)
+        try:
+            pipeline = words_redis_client.pipeline(transaction=False)
+            pipeline.set(
+                name=cls.make_key(deck_id=deck.deck_id),
+                value=deck.to_bytes(),
+                ex=WORDS_FILE_LIVES_IN_SEC,
+            )
+            if source_hash:
+                pipeline.set(
+                    name=cls.make_source_key(source_hash=source_hash),
+                    value=deck.deck_id,
+                    ex=WORDS_FILE_LIVES_IN_SEC,
+                )
+            pipeline.execute()
+        except RedisError as e:
+            logging.warning("Compiled deck cache write failed: %s", e)
+
+    @classmethod
+    def get_or_compile(
+            cls, file_bytes: bytes, parse: Callable[[bytes], CompiledDeck]
+    ) -> CompiledDeck:
+        source_hash = make_source_hash(file_bytes=file_bytes)
+        deck = cls.get_by_source(source_hash=source_hash)
+        if deck is not None:
+            return deck
+
+        deck_store_metrics.incr(key="compiles")
+        with deck_store_metrics.timer(key="compile"):
+            deck = parse(file_bytes)
+
+        cls.put(deck=deck, source_hash=source_hash)
+        return deck
+
+    @classmethod
+    async def get_or_compile_async(
+            cls, file_bytes: bytes, parse: Callable[[bytes], Awaitable[CompiledDeck]]
+    ) -> CompiledDeck:
+        source_hash = make_source_hash(file_bytes=file_bytes)
+        deck = cls.get_by_source(source_hash=source_hash)
+        if deck is not None:
+            return deck
+
+        deck_store_metrics.incr(key="compiles")
+        deck = await parse(file_bytes)
+
+        cls.put(deck=deck, source_hash=source_hash)
+        return deck
+
+    @classmethod
+    def get_built_in_deck(cls, file_name: str) -> CompiledDeck:
+        deck_id = cls._built_in_deck_ids.get(file_name)
+        if deck_id:
+            deck = cls.get(deck_id=deck_id)
+            if deck is not None:
+                return deck
+
+        file_bytes = (Path(PATH_TO_WORD_FILES) / file_name).read_bytes()
+        deck = cls.get_or_compile(file_bytes=file_bytes, parse=parse_deck)
+        cls._built_in_deck_ids[file_name] = deck.deck_id
+        return deck
+
+    @classmethod
+    def get_built_in_deck_by_id(cls, deck_id: str) -> CompiledDeck | None:
+        if len(cls._built_in_deck_ids) < len(BUILT_IN_WORD_FILES):
+            cls.warm_built_in_decks()
+
+        for file_name, built_in_deck_id in cls._built_in_deck_ids.items():
+            if built_in_deck_id == deck_id:
+                return cls.get_built_in_deck(file_name=file_name)
+
+        return None
+
+    @classmethod
+    def get_or_restore(cls, deck_id: str) -> CompiledDeck | None:
+        deck = cls.get(deck_id=deck_id)
+        if deck is not None:
+            return deck
+
+        deck = cls.get_built_in_deck_by_id(deck_id=deck_id)
+        if deck is not None:
+            deck_store_metrics.incr(key="built_in_restores")
+            return deck
+
+        deck = DeckArchive.get(deck_id=deck_id)
+        if deck is not None:
+            deck_store_metrics.incr(key="archive_restores")
+            cls.put(deck=deck)
+
+        return deck
+
+    @classmethod
+    async def get_or_restore_async(cls, deck_id: str) -> CompiledDeck | None:
+        deck = cls.get_from_l1(deck_id=deck_id)
+        if deck is not None:
+            deck_store_metrics.incr(key="l1_hits")
+            return deck
+
+        return await asyncio.to_thread(cls.get_or_restore, deck_id)
+
+    @classmethod
+    def warm_built_in_decks(cls):
+        for file_name in BUILT_IN_WORD_FILES:
+            cls.get_built_in_deck(file_name=file_name)
@@ -0,0 +1,63 @@
+import math
+import random
+from dataclasses import dataclass
+
+
+def pick_coprime_multiplier(size: int) -> int:
+    if size <= 2:
+        return 1
+
+    while True:
+        multiplier = random.randrange(1, size)
+        if math.gcd(multiplier, size) == 1:
+            return multiplier
+
+
+@dataclass
+class QuizSession:
+    deck_id: str
+    size: int
+    multiplier: int
+    offset: int
+    cursor: int = 0
+
+    @classmethod
+    def start(cls, deck_id: str, size: int) -> "QuizSession":
+        return cls(
+            deck_id=deck_id,
+            size=size,
+            multiplier=pick_coprime_multiplier(size=size),
+            offset=random.randrange(size) if size else 0,
+        )
+
+    @property
+    def is_finished(self) -> bool:
+        return self.cursor >= self.size
+
+    @property
+    def remaining(self) -> int:
+        return max(self.size - self.cursor, 0)
+
+    @property
+    def current_index(self) -> int:
+        return (self.multiplier * self.cursor + self.offset) % self.size
+
+    def advance(self):
+        self.cursor += 1
+
+    def to_state(self) -> list:
+        return [self.deck_id, self.size, self.multiplier, self.offset, self.cursor]
+
+    @classmethod
+    def from_state(cls, value: list | None) -> "QuizSession | None":
+        if not value:
+            return None
+
+        deck_id, size, multiplier, offset, cursor = value
+        return cls(
+            deck_id=deck_id,
+            size=size,
+            multiplier=multiplier,
+            offset=offset,
+            cursor=cursor,
+        )
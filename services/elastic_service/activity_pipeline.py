@@ -0,0 +1,261 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from elasticsearch import ApiError, Elasticsearch, TransportError
+
+from config.elastic_config import (
+    ACTIVITY_BULK_MAX_EVENTS,
+    ACTIVITY_BULK_MAX_RETRIES,
+    ACTIVITY_FLUSH_INTERVAL_IN_SEC,
+    ACTIVITY_QUEUE_MAX_EVENTS,
+    ACTIVITY_REPLAY_INTERVAL_IN_SEC,
+    ACTIVITY_SHUTDOWN_TIMEOUT_IN_SEC,
+    ACTIVITY_SPOOL_DIR,
+    ACTIVITY_SPOOL_MAX_BYTES,
+    ACTIVITY_SPOOL_SEGMENT_MAX_AGE_IN_SEC,
+    ACTIVITY_SPOOL_SEGMENT_MAX_BYTES,
+)
+from services.elastic_service.elastic_service import elastic_client
+from services.elastic_service.event_spool import EventSpool
+from services.metrics import get_metrics
+
+BULK_RETRY_BACKOFF_IN_SEC = 0.5
+RETRYABLE_ITEM_STATUSES = {429, 502, 503, 504}
+
+activity_metrics = get_metrics(name="activity_pipeline", log_every=5000)
+
+
+def make_bulk_operations(events: list[tuple[str, dict]]) -> list[dict]:
+    operations = []
+    for index, document in events:
+        operations.append({"index": {"_index": index}})
+        operations.append(document)
+
+    return operations
+
+
+def split_bulk_response(
+        events: list[tuple[str, dict]], response: dict
+) -> tuple[int, list[tuple[str, dict]], int]:
+    if not response.get("errors"):
+        return len(events), [], 0
+
+    indexed, retryable, rejected = 0, [], 0
+    for event, item in zip(events, response["items"]):
+        result = next(iter(item.values()))
+        status = result.get("status", 500)
+        if status < 300:
+            indexed += 1
+        elif status in RETRYABLE_ITEM_STATUSES or status >= 500:
+            retryable.append(event)
+        else:
+            logging.warning("Activity event rejected by Elasticsearch: %s", result)
+            rejected += 1
+
+    return indexed, retryable, rejected
+
+
+def index_events(
+        client: Elasticsearch, events: list[tuple[str, dict]]
+) -> list[tuple[str, dict]]:
+    try:
+        with activity_metrics.timer(key="bulk"):
+            response = client.bulk(operations=make_bulk_operations(events=events))
+    except (ApiError, TransportError) as e:
+        logging.warning("Activity bulk request failed: %s", e)
+        activity_metrics.incr(key="bulk_errors")
+        return events
+
+    indexed, retryable, rejected = split_bulk_response(
+        events=events, response=response.body
+    )
+    activity_metrics.incr(key="indexed", amount=indexed)
+    if rejected:
+        activity_metrics.incr(key="dropped.rejected", amount=rejected)
+
+    return retryable
+
+
+class ActivityEventPipeline:
+    def __init__(
+            self,
+            client: Elasticsearch,
+            spool: EventSpool,
+            max_queue_events: int = ACTIVITY_QUEUE_MAX_EVENTS,
+            bulk_max_events: int = ACTIVITY_BULK_MAX_EVENTS,
+            flush_interval_in_sec: float = ACTIVITY_FLUSH_INTERVAL_IN_SEC,
+            max_retries: int = ACTIVITY_BULK_MAX_RETRIES,
+            replay_interval_in_sec: float = ACTIVITY_REPLAY_INTERVAL_IN_SEC,
+    ):
+        self.client = client
+        self.spool = spool
+        self.replay_interval_in_sec = replay_interval_in_sec
+        self.bulk_max_events = bulk_max_events
+        self.flush_interval_in_sec = flush_interval_in_sec
+        self.max_retries = max_retries
+        self._queue: queue.Queue[tuple[str, dict]] = queue.Queue(
+            maxsize=max_queue_events
+        )
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._healthy = True
+        self._next_replay_at = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(
+                target=self._run, name="activity-pipeline", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, index: str, document: dict) -> bool:
+        if self._stopping.is_set():
+            activity_metrics.incr(key="dropped.closed")
+            return False
+
+        self.start()
+        try:
+            self._queue.put_nowait((index, document))
+        except queue.Full:
+            activity_metrics.incr(key="dropped.queue_full")
+            return False
+
+        activity_metrics.incr(key="enqueued")
+        return True
+
+    def close(self, timeout_in_sec: float = ACTIVITY_SHUTDOWN_TIMEOUT_IN_SEC):
+        if self._stopping.is_set():
+            return
+
+        self._stopping.set()
+        if self._thread is None:
+            return
+
+        self._thread.join(timeout=timeout_in_sec)
+        if self._thread.is_alive():
+            pending = self._queue.qsize()
+            logging.warning("Activity pipeline closed with %s unsent events", pending)
+            activity_metrics.incr(key="dropped.shutdown", amount=pending)
+
+    def _collect_batch(self) -> list[tuple[str, dict]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval_in_sec)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval_in_sec
+        while len(batch) < self.bulk_max_events:
+            timeout = 0 if self._stopping.is_set() else deadline - time.monotonic()
+            try:
+                if timeout <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            activity_metrics.set_gauge(key="queue_depth", value=self._queue.qsize())
+            if batch:
+                self._flush(batch=batch)
+
+            if self._stopping.is_set() or time.monotonic() < self._next_replay_at:
+                continue
+
+            if not self._replay_next_segment():
+                self._next_replay_at = time.monotonic() + self.replay_interval_in_sec
+
+        self.spool.seal()
+
+    def _send(self, events: list[tuple[str, dict]]) -> list[tuple[str, dict]]:
+        return index_events(client=self.client, events=events)
+
+    def _flush(self, batch: list[tuple[str, dict]]):
+        if not self._healthy:
+            self._spool(events=batch)
+            return
+
+        attempts = 1
+        if not self._stopping.is_set():
+            attempts += self.max_retries
+
+        pending = batch
+        for attempt in range(attempts):
+            if attempt:
+                activity_metrics.incr(key="retries")
+                time.sleep(BULK_RETRY_BACKOFF_IN_SEC * 2 ** (attempt - 1))
+
+            pending = self._send(events=pending)
+            if not pending:
+                self._healthy = True
+                return
+
+        self._healthy = False
+        self._spool(events=pending)
+
+    def _spool(self, events: list[tuple[str, dict]]):
+        try:
+            self.spool.append(events=events)
+        except OSError as e:
+            logging.warning(
+                "Dropping %s activity events, spool failed: %s", len(events), e
+            )
+            activity_metrics.incr(key="dropped.failed", amount=len(events))
+
+    def _replay_next_segment(self) -> bool:
+        self.spool.seal_if_full()
+        sealed_segments = self.spool.sealed_segments()
+        if not sealed_segments:
+            return False
+
+        path = sealed_segments[0]
+        started = time.perf_counter()
+        events = self.spool.read_segment(path=path)
+        for start in range(0, len(events), self.bulk_max_events):
+            end = start + self.bulk_max_events
+            failed = self._send(events=events[start:end])
+            if not failed:
+                continue
+
+            self._healthy = False
+            if start or len(failed) < len(events[start:end]):
+                try:
+                    self.spool.rewrite(path=path, events=failed + events[end:])
+                except OSError as e:
+                    logging.warning("Activity spool rewrite failed: %s", e)
+            return False
+
+        self._healthy = True
+        self.spool.remove(path=path)
+        elapsed = time.perf_counter() - started
+        activity_metrics.incr(key="replayed", amount=len(events))
+        activity_metrics.observe(key="replay_segment", seconds=elapsed)
+        if elapsed:
+            activity_metrics.set_gauge(
+                key="replay_events_per_sec", value=round(len(events) / elapsed, 1)
+            )
+
+        return len(sealed_segments) > 1
+
+
+activity_pipeline = ActivityEventPipeline(
+    client=elastic_client,
+    spool=EventSpool(
+        directory=ACTIVITY_SPOOL_DIR,
+        segment_max_bytes=ACTIVITY_SPOOL_SEGMENT_MAX_BYTES,
+        max_total_bytes=ACTIVITY_SPOOL_MAX_BYTES,
+        segment_max_age_in_sec=ACTIVITY_SPOOL_SEGMENT_MAX_AGE_IN_SEC,
+    ),
+)
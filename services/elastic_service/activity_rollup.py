@@ -0,0 +1,194 @@
+import json
+import logging
+import time
+import zlib
+from datetime import datetime
+
+from redis.client import Pipeline
+from redis.exceptions import RedisError
+
+from config.elastic_config import (
+    ACTIVITY_RAW_EVENT_SAMPLE_RATE,
+    ACTIVITY_ROLLUP_IDLE_IN_SEC,
+    ACTIVITY_ROLLUP_LIVES_IN_SEC,
+    ElasticAvailableIndexes,
+)
+from services.cache_service.cache_service import activity_redis_client
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.elastic_service.activity_pipeline import (
+    activity_pipeline,
+    index_events,
+)
+from services.elastic_service.elastic_service import elastic_client
+from services.elastic_service.schemas import QuizSessionSummary, WordOutcome
+from services.metrics import get_metrics
+
+SAMPLE_BUCKETS = 10000
+UNSENT_SUMMARIES_MAX = 10000
+
+rollup_metrics = get_metrics(name="activity_rollup", log_every=2000)
+
+
+def is_raw_event_sampled(user_id: int) -> bool:
+    bucket = zlib.crc32(str(user_id).encode()) % SAMPLE_BUCKETS
+    return bucket < ACTIVITY_RAW_EVENT_SAMPLE_RATE * SAMPLE_BUCKETS
+
+
+class QuizSessionRollups:
+    active_key = f"{CacheKeyPrefixes.ACTIVITY_ROLLUP.value}:active"
+    unsent_key = f"{CacheKeyPrefixes.ACTIVITY_ROLLUP.value}:unsent"
+
+    @staticmethod
+    def make_key(user_id: int) -> str:
+        return f"{CacheKeyPrefixes.ACTIVITY_ROLLUP.value}:{user_id}"
+
+    @classmethod
+    def make_words_key(cls, user_id: int) -> str:
+        return f"{cls.make_key(user_id=user_id)}:words"
+
+    @classmethod
+    def start(cls, user_id: int, deck_id: str, deck_size: int):
+        cls.finish(user_id=user_id, reason="replaced")
+
+        now = time.time()
+        key = cls.make_key(user_id=user_id)
+        try:
+            pipeline = activity_redis_client.pipeline(transaction=False)
+            pipeline.hset(
+                key,
+                mapping={
+                    "started_at": now,
+                    "last_at": now,
+                    "deck_id": deck_id,
+                    "deck_size": deck_size,
+                },
+            )
+            pipeline.expire(key, ACTIVITY_ROLLUP_LIVES_IN_SEC)
+            pipeline.zadd(cls.active_key, {str(user_id): now})
+            pipeline.execute()
+        except RedisError as e:
+            logging.warning("Activity rollup start failed: %s", e)
+            rollup_metrics.incr(key="redis_errors")
+
+    @classmethod
+    def record(
+            cls, pipeline: Pipeline, user_id: int, outcome: str, word: str | None = None
+    ):
+        now = time.time()
+        key = cls.make_key(user_id=user_id)
+        words_key = cls.make_words_key(user_id=user_id)
+        pipeline.hsetnx(key, "started_at", now)
+        pipeline.hset(key, "last_at", now)
+        pipeline.hincrby(key, f"count:{outcome}", 1)
+        pipeline.expire(key, ACTIVITY_ROLLUP_LIVES_IN_SEC)
+        if word:
+            pipeline.hincrby(words_key, f"{outcome}:{word}", 1)
+            pipeline.expire(words_key, ACTIVITY_ROLLUP_LIVES_IN_SEC)
+        pipeline.zadd(cls.active_key, {str(user_id): now})
+
+    @staticmethod
+    def build_summary(
+            user_id: int, session: dict, words: dict, reason: str
+    ) -> QuizSessionSummary:
+        started_at = float(session.get("started_at", time.time()))
+        last_at = float(session.get("last_at", started_at))
+
+        counts = {
+            field.removeprefix("count:"): int(value)
+            for field, value in session.items()
+            if field.startswith("count:")
+        }
+
+        outcomes: dict[str, WordOutcome] = {}
+        for field, value in words.items():
+            outcome, word = field.split(":", 1)
+            word_outcome = outcomes.setdefault(word, WordOutcome(word=word))
+            if outcome in WordOutcome.model_fields:
+                setattr(word_outcome, outcome, int(value))
+
+        return QuizSessionSummary(
+            userId=user_id,
+            activityDate=datetime.fromtimestamp(started_at),
+            endedDate=datetime.fromtimestamp(last_at),
+            endReason=reason,
+            deckId=session.get("deck_id"),
+            deckSize=int(session.get("deck_size", 0)),
+            durationSeconds=round(last_at - started_at, 3),
+            counts=counts,
+            words=list(outcomes.values()),
+        )
+
+    @classmethod
+    def finish(
+            cls, user_id: int, reason: str, publish: bool = True
+    ) -> QuizSessionSummary | None:
+        key = cls.make_key(user_id=user_id)
+        words_key = cls.make_words_key(user_id=user_id)
+        try:
+            pipeline = activity_redis_client.pipeline(transaction=True)
+            pipeline.hgetall(key)
+            pipeline.hgetall(words_key)
+            pipeline.delete(key, words_key)
+            pipeline.zrem(cls.active_key, str(user_id))
+            session, words, _, _ = pipeline.execute()
+        except RedisError as e:
+            logging.warning("Activity rollup finish failed: %s", e)
+            rollup_metrics.incr(key="redis_errors")
+            return None
+
+        if not session or not any(field.startswith("count:") for field in session):
+            return None
+
+        summary = cls.build_summary(
+            user_id=user_id, session=session, words=words, reason=reason
+        )
+        if publish:
+            activity_pipeline.submit(
+                index=ElasticAvailableIndexes.USER_ACTIVITY.value,
+                document=summary.model_dump(),
+            )
+        rollup_metrics.incr(key=f"finished.{reason}")
+        return summary
+
+    @classmethod
+    def pop_unsent(cls) -> list[tuple[str, dict]]:
+        pipeline = activity_redis_client.pipeline(transaction=True)
+        pipeline.lrange(cls.unsent_key, 0, -1)
+        pipeline.delete(cls.unsent_key)
+        unsent, _ = pipeline.execute()
+        return [tuple(json.loads(event)) for event in unsent]
+
+    @classmethod
+    def keep_unsent(cls, events: list[tuple[str, dict]]):
+        pipeline = activity_redis_client.pipeline(transaction=True)
+        pipeline.rpush(cls.unsent_key, *(json.dumps(event) for event in events))
+        pipeline.ltrim(cls.unsent_key, -UNSENT_SUMMARIES_MAX, -1)
+        pipeline.execute()
+        rollup_metrics.incr(key="unsent", amount=len(events))
+
+    @classmethod
+    def finish_idle(cls, idle_in_sec: int = ACTIVITY_ROLLUP_IDLE_IN_SEC) -> int:
+        # Runs in Celery workers, which do not own an activity spool, so the
+        # summaries are indexed directly and failures are parked in Redis.
+        events = cls.pop_unsent()
+        user_ids = activity_redis_client.zrangebyscore(
+            cls.active_key, 0, time.time() - idle_in_sec
+        )
+        for user_id in user_ids:
+            summary = cls.finish(user_id=int(user_id), reason="idle", publish=False)
+            if summary:
+                events.append(
+                    (
+                        ElasticAvailableIndexes.USER_ACTIVITY.value,
+                        summary.model_dump(mode="json"),
+                    )
+                )
+
+        if not events:
+            return 0
+
+        failed = index_events(client=elastic_client, events=events)
+        if failed:
+            cls.keep_unsent(events=failed)
+
+        return len(events) - len(failed)
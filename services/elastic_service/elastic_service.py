@@ -1,12 +1,169 @@
-from elasticsearch import Elasticsearch
+import logging
 
-from config.elastic_config import ES_URL, ELASTIC_INDEXES, ElasticAvailableIndexes
+from elasticsearch import BadRequestError, Elasticsearch, NotFoundError
+
+from config.elastic_config import (
+    ES_URL,
+    ELASTIC_INDEXES,
+    ElasticAvailableIndexes,
+    USER_ACTIVITY_DELETE_AFTER,
+    USER_ACTIVITY_ROLLOVER_MAX_AGE,
+    USER_ACTIVITY_ROLLOVER_MAX_SHARD_SIZE,
+    USER_ACTIVITY_WARM_AFTER,
+)
 
 elastic_client = Elasticsearch(ES_URL)
 
+USER_ACTIVITY_ALIAS = ElasticAvailableIndexes.USER_ACTIVITY.value
+USER_ACTIVITY_POLICY = f"{USER_ACTIVITY_ALIAS}_policy"
+USER_ACTIVITY_TEMPLATE = f"{USER_ACTIVITY_ALIAS}_template"
+USER_ACTIVITY_INDEX_PATTERN = f"{USER_ACTIVITY_ALIAS}-*"
+USER_ACTIVITY_FIRST_INDEX = f"<{USER_ACTIVITY_ALIAS}-{{now/d}}-000001>"
+USER_ACTIVITY_LEGACY_INDEX = f"{USER_ACTIVITY_ALIAS}-legacy"
+
+USER_ACTIVITY_MAPPINGS = {
+    "dynamic_templates": [
+        {
+            "strings_as_keywords": {
+                "match_mapping_type": "string",
+                "mapping": {"type": "keyword", "ignore_above": 256},
+            }
+        }
+    ],
+    "properties": {
+        "activityId": {"type": "keyword", "ignore_above": 128},
+        "userId": {"type": "keyword", "ignore_above": 128},
+        "activityDate": {
+            "type": "date",
+            "format": "strict_date_optional_time||epoch_millis",
+        },
+        "tags": {"type": "keyword"},
+        "value": {"type": "keyword"},
+        "additional_value": {"type": "keyword"},
+        "endedDate": {
+            "type": "date",
+            "format": "strict_date_optional_time||epoch_millis",
+        },
+        "endReason": {"type": "keyword"},
+        "deckId": {"type": "keyword"},
+        "deckSize": {"type": "integer"},
+        "durationSeconds": {"type": "float"},
+        "counts": {"type": "object"},
+        "words": {
+            "properties": {
+                "word": {"type": "keyword", "ignore_above": 256},
+                "correct": {"type": "short"},
+                "wrong": {"type": "short"},
+                "hints": {"type": "short"},
+                "listens": {"type": "short"},
+                "skips": {"type": "short"},
+            }
+        },
+    },
+}
+
+
+def put_user_activity_lifecycle():
+    elastic_client.ilm.put_lifecycle(
+        name=USER_ACTIVITY_POLICY,
+        policy={
+            "phases": {
+                "hot": {
+                    "actions": {
+                        "rollover": {
+                            "max_age": USER_ACTIVITY_ROLLOVER_MAX_AGE,
+                            "max_primary_shard_size": (
+                                USER_ACTIVITY_ROLLOVER_MAX_SHARD_SIZE
+                            ),
+                        }
+                    }
+                },
+                "warm": {
+                    "min_age": USER_ACTIVITY_WARM_AFTER,
+                    "actions": {
+                        "readonly": {},
+                        "forcemerge": {"max_num_segments": 1},
+                    },
+                },
+                "delete": {
+                    "min_age": USER_ACTIVITY_DELETE_AFTER,
+                    "actions": {"delete": {}},
+                },
+            }
+        },
+    )
+    elastic_client.indices.put_index_template(
+        name=USER_ACTIVITY_TEMPLATE,
+        index_patterns=[USER_ACTIVITY_INDEX_PATTERN],
+        priority=100,
+        template={
+            "settings": {
+                "number_of_shards": 1,
+                "number_of_replicas": 1,
+                "index.lifecycle.name": USER_ACTIVITY_POLICY,
+                "index.lifecycle.rollover_alias": USER_ACTIVITY_ALIAS,
+            },
+            "mappings": USER_ACTIVITY_MAPPINGS,
+        },
+    )
+
+
+def is_resource_already_exists(error: BadRequestError) -> bool:
+    return error.error == "resource_already_exists_exception"
+
+
+def move_legacy_user_activity_index():
+    logging.info("Moving legacy %s index behind the alias", USER_ACTIVITY_ALIAS)
+    elastic_client.indices.add_block(index=USER_ACTIVITY_ALIAS, block="write")
+    try:
+        elastic_client.indices.clone(
+            index=USER_ACTIVITY_ALIAS, target=USER_ACTIVITY_LEGACY_INDEX
+        )
+    except BadRequestError as e:
+        if not is_resource_already_exists(error=e):
+            raise
+
+    try:
+        elastic_client.indices.update_aliases(
+            actions=[
+                {"remove_index": {"index": USER_ACTIVITY_ALIAS}},
+                {
+                    "add": {
+                        "index": USER_ACTIVITY_LEGACY_INDEX,
+                        "alias": USER_ACTIVITY_ALIAS,
+                        "is_write_index": False,
+                    }
+                },
+            ]
+        )
+    except NotFoundError:
+        logging.info("Legacy %s index was already moved", USER_ACTIVITY_ALIAS)
+
+
+def bootstrap_user_activity_alias():
+    if elastic_client.indices.exists_alias(name=USER_ACTIVITY_ALIAS):
+        return
+
+    if elastic_client.indices.exists(index=USER_ACTIVITY_ALIAS):
+        move_legacy_user_activity_index()
+
+    try:
+        elastic_client.indices.create(
+            index=USER_ACTIVITY_FIRST_INDEX,
+            aliases={USER_ACTIVITY_ALIAS: {"is_write_index": True}},
+        )
+    except BadRequestError as e:
+        if not is_resource_already_exists(error=e):
+            raise
+
+        logging.info("%s was bootstrapped by another worker", USER_ACTIVITY_ALIAS)
+
 
 def create_elastic_indexes_if_not_exists():
-    for elastic_index in ELASTIC_INDEXES:
+    put_user_activity_lifecycle()
+    bootstrap_user_activity_alias()
+
+    for elastic_index in ELASTIC_INDEXES - {USER_ACTIVITY_ALIAS}:
         if elastic_client.indices.exists(index=elastic_index):
             continue
 
@@ -47,31 +204,6 @@ def create_elastic_indexes_if_not_exists():
                     },
                 }
 
-            case ElasticAvailableIndexes.USER_ACTIVITY.value:
-                body = {
-                    "settings": {"number_of_shards": 1, "number_of_replicas": 1},
-                    "mappings": {
-                        "dynamic_templates": [
-                            {
-                                "strings_as_keywords": {
-                                    "match_mapping_type": "string",
-                                    "mapping": {"type": "keyword", "ignore_above": 256},
-                                }
-                            }
-                        ],
-                        "properties": {
-                            "activityId": {"type": "integer"},
-                            "userId": {"type": "keyword", "ignore_above": 128},
-                            "activityDate": {
-                                "type": "date",
-                                "format": "strict_date_optional_time||epoch_millis",
-                            },
-                            "tags": {"type": "keyword"},
-                            "value": {"type": "keyword"},
-                        },
-                    },
-                }
-
             case _:
                 body = {
                     "settings": {"number_of_shards": 1, "number_of_replicas": 1},
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from datetime import date, datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from services.metrics import get_metrics
+
+SPOOL_SEGMENT_SUFFIX = ".seg"
+SPOOL_REWRITE_SUFFIX = ".tmp"
+SPOOL_RECORD_HEADER = struct.Struct("<II")
+
+spool_metrics = get_metrics(name="activity_spool", log_every=1000)
+
+
+def serialize_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    raise TypeError(f"Cannot spool value of type {type(value).__name__}")
+
+
+def encode_record(event: tuple[str, dict]) -> bytes:
+    payload = json.dumps(
+        event, default=serialize_value, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    return SPOOL_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def iter_records(segment: BinaryIO) -> Iterator[tuple[str, dict]]:
+    while True:
+        header = segment.read(SPOOL_RECORD_HEADER.size)
+        if not header:
+            return
+
+        if len(header) < SPOOL_RECORD_HEADER.size:
+            spool_metrics.incr(key="torn_records")
+            return
+
+        length, checksum = SPOOL_RECORD_HEADER.unpack(header)
+        payload = segment.read(length)
+        if len(payload) < length:
+            spool_metrics.incr(key="torn_records")
+            return
+
+        if zlib.crc32(payload) != checksum:
+            spool_metrics.incr(key="corrupted_records")
+            return
+
+        index, document = json.loads(payload)
+        yield index, document
+
+
+class EventSpool:
+    def __init__(
+            self,
+            directory: str,
+            segment_max_bytes: int,
+            max_total_bytes: int,
+            segment_max_age_in_sec: float,
+    ):
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.segment_max_age_in_sec = segment_max_age_in_sec
+        self._active: BinaryIO | None = None
+        self._active_path: Path | None = None
+        self._active_size = 0
+        self._active_opened_at = 0.0
+        self._next_sequence: int | None = None
+
+    def _segment_paths(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+
+        return sorted(self.directory.glob(f"*{SPOOL_SEGMENT_SUFFIX}"))
+
+    def _total_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self._segment_paths())
+
+    def _open_segment(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._next_sequence is None:
+            paths = self._segment_paths()
+            self._next_sequence = int(paths[-1].stem) + 1 if paths else 0
+
+        self._active_path = (
+            self.directory / f"{self._next_sequence:012d}{SPOOL_SEGMENT_SUFFIX}"
+        )
+        self._next_sequence += 1
+        self._active = open(self._active_path, "ab")
+        self._active_size = 0
+        self._active_opened_at = time.monotonic()
+
+    def seal(self):
+        if self._active is None:
+            return
+
+        self._active.close()
+        self._active, self._active_path, self._active_size = None, None, 0
+
+    def is_active_full(self) -> bool:
+        return (
+            self._active_size >= self.segment_max_bytes
+            or time.monotonic() - self._active_opened_at >= self.segment_max_age_in_sec
+        )
+
+    def seal_if_full(self):
+        if self._active is not None and self.is_active_full():
+            self.seal()
+
+    def _evict_oldest(self, needed_bytes: int):
+        total_bytes = self._total_bytes()
+        for path in self.sealed_segments():
+            if total_bytes + needed_bytes <= self.max_total_bytes:
+                return
+
+            total_bytes -= path.stat().st_size
+            path.unlink()
+            logging.warning("Activity spool is full, evicted %s", path.name)
+            spool_metrics.incr(key="evicted_segments")
+
+    def append(self, events: list[tuple[str, dict]]):
+        records = b"".join(encode_record(event=event) for event in events)
+        if self._active is None or self.is_active_full():
+            self.seal()
+            self._evict_oldest(needed_bytes=len(records))
+            self._open_segment()
+
+        self._active.write(records)
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._active_size += len(records)
+
+        spool_metrics.incr(key="spooled", amount=len(events))
+        spool_metrics.set_gauge(key="bytes", value=self._total_bytes())
+
+    def sealed_segments(self) -> list[Path]:
+        return [path for path in self._segment_paths() if path != self._active_path]
+
+    @staticmethod
+    def read_segment(path: Path) -> list[tuple[str, dict]]:
+        with open(path, "rb") as segment:
+            return list(iter_records(segment=segment))
+
+    def rewrite(self, path: Path, events: list[tuple[str, dict]]):
+        temporary_path = path.with_suffix(SPOOL_REWRITE_SUFFIX)
+        with open(temporary_path, "wb") as segment:
+            segment.write(b"".join(encode_record(event=event) for event in events))
+            segment.flush()
+            os.fsync(segment.fileno())
+        os.replace(temporary_path, path)
+        spool_metrics.set_gauge(key="bytes", value=self._total_bytes())
+
+    def remove(self, path: Path):
+        path.unlink(missing_ok=True)
+        spool_metrics.set_gauge(key="bytes", value=self._total_bytes())
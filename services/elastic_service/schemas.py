@@ -10,3 +10,25 @@ class CreateUserActivity(BaseModel):
     tags: list[str] | None = None
     value: str | None = None
     additional_value: str | None = None
+
+
+class WordOutcome(BaseModel):
+    word: str
+    correct: int = 0
+    wrong: int = 0
+    hints: int = 0
+    listens: int = 0
+    skips: int = 0
+
+
+class QuizSessionSummary(BaseModel):
+    activityId: str = "QUIZ SESSION"
+    userId: int
+    activityDate: datetime
+    endedDate: datetime
+    endReason: str
+    deckId: str | None = None
+    deckSize: int = 0
+    durationSeconds: float = 0
+    counts: dict[str, int] = Field(default_factory=dict)
+    words: list[WordOutcome] = Field(default_factory=list)
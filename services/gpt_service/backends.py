@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+import httpx
+from openai import NOT_GIVEN, AsyncOpenAI
+
+from config.openai_config import (
+    LLM_BACKEND,
+    LLM_OFFLINE_LATENCY_IN_SEC,
+    LLM_OFFLINE_LATENCY_JITTER_IN_SEC,
+    OPENAI_BASE_URL,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MODEL,
+    OPENAI_TIMEOUT_IN_SEC,
+    OPENAI_TOKEN,
+)
+from services.grading_service.schemas import AnswerVerdicts
+from services.utils import normalize_apostrophes
+
+OFFLINE_BATCH_ANSWERS = re.compile(r"Відповіді користувачів: (\[.*\])", re.DOTALL)
+OFFLINE_USER_ANSWER = re.compile(r"Відповідь користувача: (.*)$", re.DOTALL)
+OFFLINE_CORRECT_TRANSLATION = re.compile(r"правильніше буде: (.*?)\"?$", re.MULTILINE)
+OFFLINE_QUOTED_WORD = re.compile(r"'([^']+)'")
+OFFLINE_VERDICTS = [AnswerVerdicts.CORRECT, AnswerVerdicts.SIMILAR, AnswerVerdicts.WRONG]
+
+
+class LLMBackend(ABC):
+    @abstractmethod
+    async def complete(
+            self,
+            prompt: str,
+            timeout: float,
+            response_format: dict | None = None,
+            temperature: float = 0,
+    ) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def open_stream(
+            self, prompt: str, timeout: float, temperature: float = 0
+    ) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    def __init__(self):
+        self._clients: dict[asyncio.AbstractEventLoop, AsyncOpenAI] = {}
+
+    def get_client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+
+        if loop not in self._clients:
+            for stale_loop in [key for key in self._clients if key.is_closed()]:
+                self._clients.pop(stale_loop)
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                ),
+                timeout=OPENAI_TIMEOUT_IN_SEC,
+            )
+            self._clients[loop] = AsyncOpenAI(
+                api_key=OPENAI_TOKEN,
+                base_url=OPENAI_BASE_URL,
+                http_client=http_client,
+                max_retries=0,
+            )
+
+        return self._clients[loop]
+
+    async def complete(
+            self,
+            prompt: str,
+            timeout: float,
+            response_format: dict | None = None,
+            temperature: float = 0,
+    ) -> str:
+        response = await self.get_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            timeout=timeout,
+            response_format=response_format or NOT_GIVEN,
+        )
+        return response.choices[0].message.content.strip()
+
+    async def open_stream(
+            self, prompt: str, timeout: float, temperature: float = 0
+    ) -> AsyncIterator[str]:
+        stream = await self.get_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            timeout=timeout,
+            stream=True,
+        )
+
+        async def iterate_chunks() -> AsyncIterator[str]:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        return iterate_chunks()
+
+
+class OfflineLLMBackend(LLMBackend):
+    def __init__(
+            self,
+            latency_in_sec: float = LLM_OFFLINE_LATENCY_IN_SEC,
+            jitter_in_sec: float = LLM_OFFLINE_LATENCY_JITTER_IN_SEC,
+    ):
+        self.latency_in_sec = latency_in_sec
+        self.jitter_in_sec = jitter_in_sec
+
+    @staticmethod
+    def make_digest(*parts: str) -> int:
+        return int(hashlib.sha1("\x1f".join(parts).encode()).hexdigest()[:8], 16)
+
+    @classmethod
+    def pick_verdict(cls, correct_translation: str, user_translation: str) -> AnswerVerdicts:
+        normalized_correct = normalize_apostrophes(correct_translation).strip().lower()
+        normalized_user = normalize_apostrophes(user_translation).strip().lower()
+        if normalized_correct == normalized_user:
+            return AnswerVerdicts.CORRECT
+
+        digest = cls.make_digest(normalized_correct, normalized_user)
+        return OFFLINE_VERDICTS[digest % len(OFFLINE_VERDICTS)]
+
+    @classmethod
+    def respond(cls, prompt: str) -> str:
+        batch_answers = OFFLINE_BATCH_ANSWERS.search(prompt)
+        if batch_answers:
+            answers = json.loads(batch_answers.group(1))
+            return json.dumps(
+                {
+                    "verdicts": [
+                        {
+                            "id": answer["id"],
+                            "verdict": cls.pick_verdict(
+                                correct_translation=answer["correct_translation"],
+                                user_translation=answer["user_translation"],
+                            ).name.lower(),
+                        }
+                        for answer in answers
+                    ]
+                }
+            )
+
+        user_answer = OFFLINE_USER_ANSWER.search(prompt)
+        correct_translation = OFFLINE_CORRECT_TRANSLATION.search(prompt)
+        if user_answer and correct_translation:
+            correct = correct_translation.group(1).strip()
+            return cls.pick_verdict(
+                correct_translation=correct, user_translation=user_answer.group(1)
+            ).render(correct_translation=correct)
+
+        quoted = OFFLINE_QUOTED_WORD.findall(prompt)
+        word = quoted[0] if quoted else ""
+        translation = quoted[1] if len(quoted) > 1 else ""
+        if '"accepted"' in prompt:
+            return json.dumps(
+                {"accepted": [translation], "typos": []}, ensure_ascii=False
+            )
+
+        return f"Offline text #{cls.make_digest(prompt) % 1000} about '{word}'."
+
+    async def simulate_latency(self, timeout: float, share: float = 1.0):
+        delay = max(
+            self.latency_in_sec + random.uniform(-self.jitter_in_sec, self.jitter_in_sec),
+            0,
+        )
+        if delay * share > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError("Offline LLM backend timed out")
+
+        await asyncio.sleep(delay * share)
+
+    async def complete(
+            self,
+            prompt: str,
+            timeout: float,
+            response_format: dict | None = None,
+            temperature: float = 0,
+    ) -> str:
+        await self.simulate_latency(timeout=timeout)
+        return self.respond(prompt=prompt)
+
+    async def open_stream(
+            self, prompt: str, timeout: float, temperature: float = 0
+    ) -> AsyncIterator[str]:
+        words = self.respond(prompt=prompt).split(" ")
+
+        async def iterate_chunks() -> AsyncIterator[str]:
+            for index, word in enumerate(words):
+                await self.simulate_latency(timeout=timeout, share=1 / len(words))
+                yield word if index == 0 else f" {word}"
+
+        return iterate_chunks()
+
+
+LLM_BACKENDS = {
+    "openai": OpenAIBackend,
+    "offline": OfflineLLMBackend,
+}
+
+_llm_backend: LLMBackend | None = None
+
+
+def get_llm_backend() -> LLMBackend:
+    global _llm_backend
+
+    if _llm_backend is None:
+        if LLM_BACKEND not in LLM_BACKENDS:
+            raise ValueError(
+                f"Unknown LLM_BACKEND {LLM_BACKEND!r}, expected one of {list(LLM_BACKENDS)}"
+            )
+        _llm_backend = LLM_BACKENDS[LLM_BACKEND]()
+
+    return _llm_backend
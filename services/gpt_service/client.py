@@ -1,23 +1,91 @@
 import asyncio
+import json
+import random
+from typing import AsyncIterator
 
-from openai import OpenAI
+from openai import APIConnectionError, InternalServerError, RateLimitError
 
-from config.openai_config import OPENAI_TOKEN
+from config.openai_config import (
+    OPENAI_TIMEOUT_IN_SEC,
+    OPENAI_MAX_RETRIES,
+    OPENAI_RETRY_BASE_DELAY_IN_SEC,
+)
+from services.gpt_service.backends import get_llm_backend
+from services.gpt_service.scheduler import get_llm_scheduler
+from services.gpt_service.schemas import LLMPriorities
+from services.metrics import get_metrics
 
-openai_client = OpenAI(api_key=OPENAI_TOKEN)
+RETRYABLE_OPENAI_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
 
+openai_metrics = get_metrics(name="openai_client")
 
-async def ask_gpt_async(prompt: str) -> str:
-    loop = asyncio.get_event_loop()
-    response = await loop.run_in_executor(
-        executor=None,
-        func=lambda: openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        ),
-    )
-    return response.choices[0].message.content.strip()
+
+def get_retry_delay(attempt: int) -> float:
+    return random.uniform(0, OPENAI_RETRY_BASE_DELAY_IN_SEC * 2 ** attempt)
+
+
+async def ask_gpt_async(
+        prompt: str,
+        timeout: float | None = None,
+        priority: LLMPriorities = LLMPriorities.GRADING,
+        response_format: dict | None = None,
+        temperature: float = 0,
+) -> str:
+    backend = get_llm_backend()
+    scheduler = get_llm_scheduler()
+
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            async with scheduler.slot(priority=priority):
+                with openai_metrics.timer(key="request"):
+                    result = await backend.complete(
+                        prompt=prompt,
+                        timeout=timeout or OPENAI_TIMEOUT_IN_SEC,
+                        response_format=response_format,
+                        temperature=temperature,
+                    )
+
+            openai_metrics.incr(key="requests")
+            return result
+
+        except RETRYABLE_OPENAI_ERRORS:
+            if attempt == OPENAI_MAX_RETRIES:
+                openai_metrics.incr(key="failures")
+                raise
+
+            openai_metrics.incr(key="retries")
+            await asyncio.sleep(get_retry_delay(attempt=attempt))
+
+
+async def stream_gpt_async(
+        prompt: str,
+        timeout: float | None = None,
+        priority: LLMPriorities = LLMPriorities.HINT,
+        temperature: float = 0,
+) -> AsyncIterator[str]:
+    backend = get_llm_backend()
+
+    async with get_llm_scheduler().slot(priority=priority):
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            try:
+                stream = await backend.open_stream(
+                    prompt=prompt,
+                    timeout=timeout or OPENAI_TIMEOUT_IN_SEC,
+                    temperature=temperature,
+                )
+                break
+
+            except RETRYABLE_OPENAI_ERRORS:
+                if attempt == OPENAI_MAX_RETRIES:
+                    openai_metrics.incr(key="failures")
+                    raise
+
+                openai_metrics.incr(key="retries")
+                await asyncio.sleep(get_retry_delay(attempt=attempt))
+
+        openai_metrics.incr(key="streams")
+        async for chunk in stream:
+            yield chunk
 
 
 def make_check_prompt(word, correct_translation, user_translation):
@@ -35,3 +103,20 @@ def make_check_prompt(word, correct_translation, user_translation):
         
         Відповідь користувача: {user_translation}
 """.strip()
+
+
+def make_batch_check_prompt(answers: list[dict]) -> str:
+    answers_json = json.dumps(answers, ensure_ascii=False)
+    return f"""
+        Оцініть, чи правильні переклади українською для кожного слова зі списку.
+        
+        Правила для кожного елемента:
+        1. Якщо переклад правильний – verdict "correct".
+        2. Якщо переклад схожий або містить помилки, але близький за змістом, або відрізняється 1-2 літерами
+        (можливо користувач помилився в самому слові, але знає переклад) – verdict "similar".
+        3. Якщо переклад неправильний – verdict "wrong".
+        
+        Відповідайте лише JSON у форматі: {{"verdicts": [{{"id": 0, "verdict": "correct"}}]}}
+        
+        Відповіді користувачів: {answers_json}
+""".strip()
@@ -10,3 +10,10 @@ DESCRIBE_WORD_PROMPT = lambda current_word, translation: (
     f"але не використовуй його в описі слова простими словами. Максимум 2 речення, а загалом слів 5-7,"
     f"простою мовою, в стилі, що ти хочеш пояснити підлітку це слово, щоб він просто його зрозумів, як би нагадати йому сенс цього слова"
 )
+
+ACCEPTED_ANSWERS_PROMPT = lambda current_word, translation: (
+    f"Англійське слово '{current_word}' у словнику перекладено українською як '{translation}'. "
+    f"Перелічи всі українські переклади цього слова, які вчитель зарахував би як правильні "
+    f"(синоніми, інші форми запису), а також типові описки, які роблять учні в цих перекладах. "
+    f'Відповідай лише JSON без пояснень у форматі: {{"accepted": ["..."], "typos": ["..."]}}'
+)
@@ -0,0 +1,222 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from config.background_tasks_config import REDIS_HOST
+from config.openai_config import (
+    OPENAI_MAX_IN_FLIGHT,
+    OPENAI_RATE_BUCKET_TIMEOUT_IN_SEC,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_RATE_BURST,
+    OPENAI_SHED_QUEUE_DEPTH,
+)
+from constants.exceptions import LLMRequestShed
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.gpt_service.schemas import LLMPriorities
+from services.metrics import get_metrics
+
+SHED_QUEUE_DEPTH_FACTORS = {
+    LLMPriorities.GRADING: None,
+    LLMPriorities.HINT: 2,
+    LLMPriorities.SENTENCE: 1,
+    LLMPriorities.BACKGROUND: 1,
+}
+
+SHARED_BUCKET_RETRY_IN_SEC = 5
+
+scheduler_metrics = get_metrics(name="llm_scheduler")
+
+TAKE_TOKEN_SCRIPT = """
+local rate_per_sec = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated_at, 0) * rate_per_sec)
+local delay_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    delay_ms = math.ceil((1 - tokens) / rate_per_sec * 1000)
+end
+redis.call(
+    'HSET', KEYS[1],
+    'tokens', string.format('%.6f', tokens),
+    'updated_at', string.format('%.6f', now)
+)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate_per_sec * 1000) + 1000)
+return delay_ms
+"""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: int):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def try_acquire(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_sec
+        )
+        self._updated_at = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate_per_sec
+
+
+class SharedTokenBucket:
+    key = CacheKeyPrefixes.LLM_RATE_BUCKET.value
+
+    def __init__(self, rate_per_sec: float, capacity: int):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._fallback = TokenBucket(rate_per_sec=rate_per_sec, capacity=capacity)
+        self._retry_shared_at = 0.0
+        self._redis = AsyncRedis(
+            host=REDIS_HOST,
+            port=6379,
+            db=4,
+            socket_timeout=OPENAI_RATE_BUCKET_TIMEOUT_IN_SEC,
+            socket_connect_timeout=OPENAI_RATE_BUCKET_TIMEOUT_IN_SEC,
+        )
+        self._take_token = self._redis.register_script(TAKE_TOKEN_SCRIPT)
+
+    async def try_acquire(self) -> float:
+        if time.monotonic() < self._retry_shared_at:
+            return self._fallback.try_acquire()
+
+        try:
+            delay_ms = await self._take_token(
+                keys=[self.key], args=[self.rate_per_sec, self.capacity]
+            )
+        except (RedisError, OSError) as e:
+            logging.warning("Shared LLM rate bucket is unavailable: %s", e)
+            scheduler_metrics.incr(key="bucket_fallbacks")
+            self._retry_shared_at = time.monotonic() + SHARED_BUCKET_RETRY_IN_SEC
+            return self._fallback.try_acquire()
+
+        return int(delay_ms) / 1000
+
+
+class LLMScheduler:
+    def __init__(
+            self,
+            max_in_flight: int = OPENAI_MAX_IN_FLIGHT,
+            requests_per_minute: int = OPENAI_REQUESTS_PER_MINUTE,
+            burst: int = OPENAI_RATE_BURST,
+            shed_queue_depth: int = OPENAI_SHED_QUEUE_DEPTH,
+    ):
+        self.max_in_flight = max_in_flight
+        self.shed_queue_depth = shed_queue_depth
+        self._bucket = SharedTokenBucket(
+            rate_per_sec=requests_per_minute / 60, capacity=burst
+        )
+        self._queue: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._dispatcher: asyncio.Task | None = None
+
+    def get_shed_limit(self, priority: LLMPriorities) -> int | None:
+        factor = SHED_QUEUE_DEPTH_FACTORS[priority]
+        if factor is None:
+            return None
+
+        return self.shed_queue_depth * factor
+
+    def _wake_dispatcher(self):
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    def _drop_abandoned_waiters(self):
+        while self._queue and self._queue[0][3].done():
+            heapq.heappop(self._queue)
+
+    async def _dispatch(self):
+        try:
+            while True:
+                self._drop_abandoned_waiters()
+                if not self._queue or self._in_flight >= self.max_in_flight:
+                    return
+
+                delay = await self._bucket.try_acquire()
+                if delay:
+                    await asyncio.sleep(delay)
+                    continue
+
+                self._drop_abandoned_waiters()
+                if not self._queue:
+                    return
+
+                priority, _, enqueued_at, waiter = heapq.heappop(self._queue)
+                self._in_flight += 1
+                waiter.set_result(None)
+                scheduler_metrics.observe(
+                    key=f"wait.{LLMPriorities(priority).name.lower()}",
+                    seconds=time.monotonic() - enqueued_at,
+                )
+        finally:
+            self._dispatcher = None
+            scheduler_metrics.set_gauge(key="queue_depth", value=len(self._queue))
+            scheduler_metrics.set_gauge(key="in_flight", value=self._in_flight)
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake_dispatcher()
+
+    @asynccontextmanager
+    async def slot(self, priority: LLMPriorities) -> AsyncIterator[None]:
+        shed_limit = self.get_shed_limit(priority=priority)
+        if shed_limit is not None and len(self._queue) >= shed_limit:
+            scheduler_metrics.incr(key=f"shed.{priority.name.lower()}")
+            raise LLMRequestShed(
+                f"LLM queue is too deep ({len(self._queue)}) for {priority.name} requests"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue, (priority, next(self._sequence), time.monotonic(), waiter)
+        )
+        scheduler_metrics.incr(key=f"scheduled.{priority.name.lower()}")
+        self._wake_dispatcher()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+
+_llm_schedulers: dict[asyncio.AbstractEventLoop, LLMScheduler] = {}
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    loop = asyncio.get_running_loop()
+
+    if loop not in _llm_schedulers:
+        for stale_loop in [key for key in _llm_schedulers if key.is_closed()]:
+            _llm_schedulers.pop(stale_loop)
+
+        _llm_schedulers[loop] = LLMScheduler()
+
+    return _llm_schedulers[loop]
@@ -0,0 +1,8 @@
+from enum import IntEnum
+
+
+class LLMPriorities(IntEnum):
+    GRADING = 0
+    HINT = 1
+    SENTENCE = 2
+    BACKGROUND = 3
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+
+from redis.exceptions import RedisError
+
+from constants.constants import (
+    BUILT_IN_WORD_FILES,
+    PATH_TO_ACCEPTED_ANSWERS_INDEX,
+    PATH_TO_WORD_FILES,
+)
+from services.bot_services.files import read_word_pairs
+from services.cache_service.cache_service import verdict_redis_client
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.gpt_service.client import ask_gpt_async
+from services.gpt_service.prompts import ACCEPTED_ANSWERS_PROMPT
+from services.gpt_service.schemas import LLMPriorities
+from services.grading_service.local_grader import (
+    LocalAnswerGrader,
+    get_answer_variants,
+    normalize_answer,
+)
+from services.grading_service.schemas import AcceptedAnswersEntry, AnswerVerdicts
+
+BUILD_CONCURRENCY = 8
+REDIS_WRITE_CHUNK_SIZE = 500
+
+ACCEPTED_ANSWERS_PROMPT_VERSION = hashlib.sha1(
+    ACCEPTED_ANSWERS_PROMPT(
+        current_word="{current_word}", translation="{translation}"
+    ).encode()
+).hexdigest()[:12]
+ACCEPTED_ANSWERS_INDEX_KEY = (
+    f"{CacheKeyPrefixes.ACCEPTED_ANSWERS.value}:{ACCEPTED_ANSWERS_PROMPT_VERSION}"
+)
+
+
+def make_index_field(word: str, translation: str) -> str:
+    pair = f"{normalize_answer(word)}\x1f{normalize_answer(translation)}"
+    return hashlib.sha1(pair.encode()).hexdigest()[:16]
+
+
+def parse_accepted_answers(raw_answer: str) -> AcceptedAnswersEntry:
+    raw_answer = raw_answer.strip().removeprefix("```json").strip("`").strip()
+    entry = AcceptedAnswersEntry(**json.loads(raw_answer))
+
+    return AcceptedAnswersEntry(
+        accepted=sorted({normalize_answer(answer) for answer in entry.accepted} - {""}),
+        typos=sorted({normalize_answer(answer) for answer in entry.typos} - {""}),
+    )
+
+
+class AcceptedAnswersIndex:
+    @staticmethod
+    def get_entry(word: str, correct_translation: str) -> AcceptedAnswersEntry | None:
+        try:
+            raw_entry = verdict_redis_client.hget(
+                name=ACCEPTED_ANSWERS_INDEX_KEY,
+                key=make_index_field(word=word, translation=correct_translation),
+            )
+        except RedisError as e:
+            logging.warning("Accepted answers index read failed: %s", e)
+            return None
+
+        if not raw_entry:
+            return None
+
+        return AcceptedAnswersEntry.model_validate_json(raw_entry)
+
+    @classmethod
+    def grade(
+            cls, word: str, correct_translation: str, user_translation: str
+    ) -> AnswerVerdicts | None:
+        entry = cls.get_entry(word=word, correct_translation=correct_translation)
+        if not entry:
+            return None
+
+        user_answer = normalize_answer(user_translation)
+        verdict = LocalAnswerGrader.match(
+            user_answer=user_answer,
+            variants=get_answer_variants(correct_translation).union(entry.accepted),
+        )
+        if verdict:
+            return verdict
+
+        if user_answer in entry.typos:
+            return AnswerVerdicts.SIMILAR
+
+        return AnswerVerdicts.WRONG
+
+    @staticmethod
+    def load_from_disk(path: str = PATH_TO_ACCEPTED_ANSWERS_INDEX) -> int:
+        index_path = Path(path)
+        if not index_path.exists():
+            return 0
+
+        index_data = json.loads(index_path.read_text(encoding="utf-8"))
+        if index_data.get("version") != ACCEPTED_ANSWERS_PROMPT_VERSION:
+            logging.warning(
+                "Accepted answers index on disk was built with another prompt, skipping"
+            )
+            return 0
+
+        entries = index_data.get("entries", {})
+        if entries:
+            verdict_redis_client.hset(
+                name=ACCEPTED_ANSWERS_INDEX_KEY,
+                mapping={
+                    field: json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+                    for field, entry in entries.items()
+                },
+            )
+
+        return len(entries)
+
+
+class AcceptedAnswersIndexBuilder:
+    @staticmethod
+    def read_built_in_decks() -> dict[str, list[tuple[str, str]]]:
+        return {
+            file_name: read_word_pairs(file_path=Path(PATH_TO_WORD_FILES) / file_name)
+            for file_name in BUILT_IN_WORD_FILES
+        }
+
+    @staticmethod
+    async def ask_accepted_answers(word: str, translation: str) -> AcceptedAnswersEntry:
+        raw_answer = await ask_gpt_async(
+            prompt=ACCEPTED_ANSWERS_PROMPT(current_word=word, translation=translation),
+            priority=LLMPriorities.BACKGROUND,
+        )
+        return parse_accepted_answers(raw_answer=raw_answer)
+
+    @staticmethod
+    def save_entries(entries: dict[str, AcceptedAnswersEntry]):
+        items = [
+            (field, entry.model_dump_json()) for field, entry in entries.items()
+        ]
+        for start in range(0, len(items), REDIS_WRITE_CHUNK_SIZE):
+            verdict_redis_client.hset(
+                name=ACCEPTED_ANSWERS_INDEX_KEY,
+                mapping=dict(items[start:start + REDIS_WRITE_CHUNK_SIZE]),
+            )
+
+    @staticmethod
+    def dump_to_disk(path: str = PATH_TO_ACCEPTED_ANSWERS_INDEX):
+        entries = verdict_redis_client.hgetall(name=ACCEPTED_ANSWERS_INDEX_KEY)
+        index_data = {
+            "version": ACCEPTED_ANSWERS_PROMPT_VERSION,
+            "entries": {field: json.loads(entry) for field, entry in entries.items()},
+        }
+        Path(path).write_text(
+            json.dumps(index_data, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    async def build(cls, force: bool = False) -> dict:
+        started = time.perf_counter()
+        decks = cls.read_built_in_decks()
+
+        indexed_fields = (
+            set()
+            if force
+            else set(verdict_redis_client.hkeys(name=ACCEPTED_ANSWERS_INDEX_KEY))
+        )
+        deck_pairs = {}
+        for word_pairs in decks.values():
+            for word, translation in word_pairs:
+                field = make_index_field(word=word, translation=translation)
+                deck_pairs[field] = (word, translation)
+
+        pending_pairs = {
+            field: pair
+            for field, pair in deck_pairs.items()
+            if field not in indexed_fields
+        }
+
+        semaphore = asyncio.Semaphore(BUILD_CONCURRENCY)
+        built_entries: dict[str, AcceptedAnswersEntry] = {}
+        failed_words = []
+
+        async def build_entry(field: str, word: str, translation: str):
+            async with semaphore:
+                try:
+                    built_entries[field] = await cls.ask_accepted_answers(
+                        word=word, translation=translation
+                    )
+                except Exception as e:
+                    logging.warning("Bad accepted answers for %r: %s", word, e)
+                    failed_words.append(word)
+
+        await asyncio.gather(
+            *(
+                build_entry(field=field, word=word, translation=translation)
+                for field, (word, translation) in pending_pairs.items()
+            )
+        )
+
+        cls.save_entries(entries=built_entries)
+        cls.dump_to_disk()
+
+        indexed_fields = set(verdict_redis_client.hkeys(name=ACCEPTED_ANSWERS_INDEX_KEY))
+        coverage = {}
+        for file_name, word_pairs in decks.items():
+            covered = sum(
+                make_index_field(word=word, translation=translation) in indexed_fields
+                for word, translation in word_pairs
+            )
+            coverage[file_name] = {
+                "words": len(word_pairs),
+                "covered": covered,
+                "coverage": round(covered / len(word_pairs), 4) if word_pairs else 1.0,
+            }
+
+        report = {
+            "prompt_version": ACCEPTED_ANSWERS_PROMPT_VERSION,
+            "built": len(built_entries),
+            "skipped": len(deck_pairs) - len(pending_pairs),
+            "failed": len(failed_words),
+            "failed_words": failed_words[:50],
+            "decks": coverage,
+            "build_seconds": round(time.perf_counter() - started, 2),
+        }
+        logging.info("Accepted answers index build report: %s", report)
+        return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Build accepted answers index for built-in decks"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild already indexed words"
+    )
+    arguments = parser.parse_args()
+
+    build_report = asyncio.run(AcceptedAnswersIndexBuilder.build(force=arguments.force))
+    print(json.dumps(build_report, ensure_ascii=False, indent=2))
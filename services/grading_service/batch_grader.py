@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+from config.openai_config import BATCH_GRADING_MAX_ITEMS, BATCH_GRADING_WINDOW_IN_SEC
+from services.gpt_service.client import (
+    ask_gpt_async,
+    make_batch_check_prompt,
+    make_check_prompt,
+)
+from services.gpt_service.schemas import LLMPriorities
+from services.grading_service.schemas import AnswerVerdicts, PendingAnswer
+from services.metrics import get_metrics
+
+batch_grading_metrics = get_metrics(name="batch_grading", log_every=500)
+
+
+def parse_batch_verdicts(raw_answer: str) -> dict[int, AnswerVerdicts]:
+    verdicts = {}
+    for item in json.loads(raw_answer).get("verdicts", []):
+        verdict_name = str(item.get("verdict", "")).upper()
+        if verdict_name in AnswerVerdicts.__members__:
+            verdicts[int(item["id"])] = AnswerVerdicts[verdict_name]
+
+    return verdicts
+
+
+class BatchAnswerGrader:
+    def __init__(
+            self,
+            window_in_sec: float = BATCH_GRADING_WINDOW_IN_SEC,
+            max_items: int = BATCH_GRADING_MAX_ITEMS,
+            ask: Callable[..., Awaitable[str]] = ask_gpt_async,
+    ):
+        self.window_in_sec = window_in_sec
+        self.max_items = max_items
+        self._ask = ask
+        self._pending: list[PendingAnswer] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def grade(
+            self, word: str, correct_translation: str, user_translation: str
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        pending_answer = PendingAnswer(
+            word=word,
+            correct_translation=correct_translation,
+            user_translation=user_translation,
+            future=loop.create_future(),
+        )
+        self._pending.append(pending_answer)
+
+        if len(self._pending) >= self.max_items:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_in_sec, self.flush)
+
+        return await pending_answer.future
+
+    def flush(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._grade_batch(batch=batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _grade_one(self, pending_answer: PendingAnswer):
+        try:
+            result = await self._ask(
+                make_check_prompt(
+                    word=pending_answer.word,
+                    correct_translation=pending_answer.correct_translation,
+                    user_translation=pending_answer.user_translation,
+                ),
+                priority=LLMPriorities.GRADING,
+            )
+        except Exception as e:
+            if not pending_answer.future.done():
+                pending_answer.future.set_exception(e)
+            return
+
+        if not pending_answer.future.done():
+            pending_answer.future.set_result(result)
+
+    async def _grade_batch(self, batch: list[PendingAnswer]):
+        batch_grading_metrics.incr(key="batches")
+        batch_grading_metrics.incr(key="answers", amount=len(batch))
+
+        if len(batch) == 1:
+            await self._grade_one(pending_answer=batch[0])
+            return
+
+        verdicts = {}
+        try:
+            raw_answer = await self._ask(
+                make_batch_check_prompt(
+                    answers=[
+                        {
+                            "id": index,
+                            "word": pending_answer.word,
+                            "correct_translation": pending_answer.correct_translation,
+                            "user_translation": pending_answer.user_translation,
+                        }
+                        for index, pending_answer in enumerate(batch)
+                    ]
+                ),
+                priority=LLMPriorities.GRADING,
+                response_format={"type": "json_object"},
+            )
+            verdicts = parse_batch_verdicts(raw_answer=raw_answer)
+        except Exception as e:
+            logging.warning("Batch grading failed, grading one by one: %s", e)
+            batch_grading_metrics.incr(key="batch_failures")
+
+        fallback = []
+        for index, pending_answer in enumerate(batch):
+            if pending_answer.future.done():
+                continue
+
+            verdict = verdicts.get(index)
+            if verdict is None:
+                fallback.append(pending_answer)
+                continue
+
+            pending_answer.future.set_result(
+                verdict.render(correct_translation=pending_answer.correct_translation)
+            )
+
+        if fallback:
+            batch_grading_metrics.incr(key="fallback_answers", amount=len(fallback))
+            await asyncio.gather(
+                *(self._grade_one(pending_answer=answer) for answer in fallback)
+            )
+
+
+_batch_answer_graders: dict[asyncio.AbstractEventLoop, BatchAnswerGrader] = {}
+
+
+def get_batch_answer_grader() -> BatchAnswerGrader:
+    loop = asyncio.get_running_loop()
+
+    if loop not in _batch_answer_graders:
+        for stale_loop in [key for key in _batch_answer_graders if key.is_closed()]:
+            _batch_answer_graders.pop(stale_loop)
+
+        _batch_answer_graders[loop] = BatchAnswerGrader()
+
+    return _batch_answer_graders[loop]
@@ -0,0 +1,104 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterable
+
+from services.grading_service.schemas import AnswerVerdicts
+from services.utils import normalize_apostrophes
+
+VARIANT_SEPARATORS = re.compile(r"[,;/|]")
+PARENTHESES = re.compile(r"\(([^)]*)\)")
+NOT_ANSWER_CHARS = re.compile(r"[^\w' -]+")
+SPACES = re.compile(r"\s+")
+
+
+def normalize_answer(text: str) -> str:
+    text = unicodedata.normalize("NFKC", str(text))
+    text = normalize_apostrophes(text=text).casefold()
+    text = NOT_ANSWER_CHARS.sub(" ", text)
+    return SPACES.sub(" ", text).strip(" -")
+
+
+@lru_cache(maxsize=20_000)
+def get_answer_variants(correct_translation: str) -> frozenset[str]:
+    candidates = [correct_translation]
+    candidates.extend(VARIANT_SEPARATORS.split(correct_translation))
+
+    variants = set()
+    for candidate in candidates:
+        variants.add(normalize_answer(PARENTHESES.sub(" ", candidate)))
+        variants.add(normalize_answer(PARENTHESES.sub(r"\1", candidate)))
+        variants.add(normalize_answer(candidate))
+
+    variants.discard("")
+    return frozenset(variants)
+
+
+def allowed_typos(answer_length: int) -> int:
+    if answer_length <= 3:
+        return 0
+
+    if answer_length <= 7:
+        return 1
+
+    return 2
+
+
+def bounded_edit_distance(first: str, second: str, limit: int) -> int:
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    previous_row = None
+    current_row = list(range(len(second) + 1))
+
+    for i in range(1, len(first) + 1):
+        before_previous_row, previous_row = previous_row, current_row
+        current_row = [i] + [0] * len(second)
+
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current_row[j] = min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + cost,
+            )
+            if (
+                i > 1
+                and j > 1
+                and first[i - 1] == second[j - 2]
+                and first[i - 2] == second[j - 1]
+            ):
+                current_row[j] = min(current_row[j], before_previous_row[j - 2] + 1)
+
+        if min(current_row) > limit:
+            return limit + 1
+
+    return current_row[-1]
+
+
+class LocalAnswerGrader:
+    @staticmethod
+    def match(user_answer: str, variants: Iterable[str]) -> AnswerVerdicts | None:
+        if user_answer in variants:
+            return AnswerVerdicts.CORRECT
+
+        for variant in variants:
+            limit = allowed_typos(answer_length=len(variant))
+            if not limit:
+                continue
+
+            if bounded_edit_distance(user_answer, variant, limit=limit) <= limit:
+                return AnswerVerdicts.SIMILAR
+
+        return None
+
+    @classmethod
+    def grade(cls, correct_translation: str, user_translation: str) -> AnswerVerdicts | None:
+        user_answer = normalize_answer(user_translation)
+        if not user_answer:
+            return AnswerVerdicts.WRONG
+
+        return cls.match(
+            user_answer=user_answer,
+            variants=get_answer_variants(str(correct_translation)),
+        )
@@ -0,0 +1,31 @@
+import asyncio
+from dataclasses import dataclass
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class AnswerVerdicts(Enum):
+    CORRECT = "✅ Правильно!"
+    SIMILAR = "ℹ Схоже за змістом, але правильніше буде: {correct_translation}"
+    WRONG = "❌ Неправильно! Правильний переклад: {correct_translation}"
+
+    def render(self, correct_translation: str) -> str:
+        return self.value.format(correct_translation=correct_translation)
+
+    @classmethod
+    def is_verdict(cls, text: str) -> bool:
+        return text.startswith(tuple(verdict.value[0] for verdict in cls))
+
+
+class AcceptedAnswersEntry(BaseModel):
+    accepted: list[str] = []
+    typos: list[str] = []
+
+
+@dataclass
+class PendingAnswer:
+    word: str
+    correct_translation: str
+    user_translation: str
+    future: asyncio.Future
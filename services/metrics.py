@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+TIMINGS_WINDOW_SIZE = 2000
+
+
+class Metrics:
+    def __init__(self, name: str, log_every: int = 0):
+        self.name = name
+        self._log_every = log_every
+        self._counters: Counter = Counter()
+        self._timings: dict[str, deque] = {}
+        self._gauges: dict[str, float] = {}
+        self._events = 0
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, amount: int = 1):
+        with self._lock:
+            self._counters[key] += amount
+            self._events += 1
+            need_log = self._log_every and self._events % self._log_every == 0
+
+        if need_log:
+            logging.info("%s metrics: %s", self.name, self.snapshot())
+
+    def set_gauge(self, key: str, value: float):
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, key: str, seconds: float):
+        with self._lock:
+            samples = self._timings.setdefault(
+                key, deque(maxlen=TIMINGS_WINDOW_SIZE)
+            )
+            samples.append(seconds)
+
+    @contextmanager
+    def timer(self, key: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(key=key, seconds=time.perf_counter() - started)
+
+    def count(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def ratio(self, key: str, *total_keys: str) -> float:
+        total = sum(self.count(total_key) for total_key in total_keys)
+        if not total:
+            return 0.0
+
+        return self.count(key) / total
+
+    def percentile(self, key: str, percent: float) -> float:
+        with self._lock:
+            samples = sorted(self._timings.get(key, ()))
+
+        if not samples:
+            return 0.0
+
+        index = min(len(samples) - 1, int(len(samples) * percent / 100))
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            timing_keys = list(self._timings)
+
+        timings = {
+            key: {
+                "p50_ms": round(self.percentile(key, 50) * 1000, 2),
+                "p95_ms": round(self.percentile(key, 95) * 1000, 2),
+                "p99_ms": round(self.percentile(key, 99) * 1000, 2),
+            }
+            for key in timing_keys
+        }
+        return {"counters": counters, "gauges": gauges, "timings": timings}
+
+
+METRICS_REGISTRY: dict[str, Metrics] = {}
+
+
+def get_metrics(name: str, log_every: int = 0) -> Metrics:
+    if name not in METRICS_REGISTRY:
+        METRICS_REGISTRY[name] = Metrics(name=name, log_every=log_every)
+
+    return METRICS_REGISTRY[name]
+
+
+def format_metrics_report() -> str:
+    lines = []
+    for name, metrics in METRICS_REGISTRY.items():
+        lines.append(f"[{name}]")
+        snapshot = metrics.snapshot()
+        for key, value in snapshot["counters"].items():
+            lines.append(f"  {key}: {value}")
+        for key, value in snapshot["gauges"].items():
+            lines.append(f"  {key}: {value}")
+        for key, value in snapshot["timings"].items():
+            lines.append(
+                f"  {key}: p50={value['p50_ms']}ms p95={value['p95_ms']}ms p99={value['p99_ms']}ms"
+            )
+
+    return "\n".join(lines) or "no metrics yet"
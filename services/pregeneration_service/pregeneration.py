@@ -0,0 +1,306 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from html import escape
+from pathlib import Path
+
+from constants.constants import BUILT_IN_WORD_FILES, PATH_TO_WORD_FILES
+from services.bot_services.auidio import (
+    VoiceAssetStore,
+    VOICE_MAX_TEXT_LENGTH,
+    normalize_word_for_pronunciation,
+    synthesize_voice,
+)
+from services.bot_services.files import read_word_pairs
+from services.cache_service.cache_service import (
+    GENERATION_CACHE_LIVES_IN_SEC,
+    generation_redis_client,
+)
+from services.cache_service.generation_cache import (
+    GenerationCache,
+    hint_cache,
+    sentence_cache,
+)
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.gpt_service.schemas import LLMPriorities
+from services.translation_service.translation_service import translation_service
+
+PREGENERATION_CHUNK_SIZE = 50
+PREGENERATION_GPT_CONCURRENCY = 8
+PREGENERATION_MEDIA_CONCURRENCY = 4
+
+GPT_PROMPT_PRICE_PER_1K_TOKENS_USD = 0.0005
+GPT_COMPLETION_PRICE_PER_1K_TOKENS_USD = 0.0015
+GPT_ESTIMATED_COMPLETION_TOKENS = 60
+GPT_ESTIMATED_CHARACTERS_PER_TOKEN = 3
+DEEPL_PRICE_PER_CHARACTER_USD = 0.00002
+ESTIMATED_SENTENCE_CHARACTERS = 45
+
+
+class BuiltInDeckPregenerator:
+    def __init__(
+            self,
+            chunk_size: int = PREGENERATION_CHUNK_SIZE,
+            gpt_concurrency: int = PREGENERATION_GPT_CONCURRENCY,
+            media_concurrency: int = PREGENERATION_MEDIA_CONCURRENCY,
+    ):
+        self.chunk_size = chunk_size
+        self.report = Counter()
+        self._gpt_semaphore = asyncio.Semaphore(gpt_concurrency)
+        self._media_semaphore = asyncio.Semaphore(media_concurrency)
+
+    @staticmethod
+    def make_cursor_key(file_name: str) -> str:
+        return f"{CacheKeyPrefixes.PREGENERATION_CURSOR.value}:{file_name}"
+
+    @staticmethod
+    def get_voice_text(sentence: str) -> str | None:
+        text = normalize_word_for_pronunciation(word=sentence)
+        if len(text) > VOICE_MAX_TEXT_LENGTH:
+            return None
+
+        return text
+
+    async def fill_generation_cache(
+            self, cache: GenerationCache, word: str, translation: str
+    ):
+        cached = cache.get_cached_variants(word=word, translation=translation)
+        missing = cache.variants_per_key - len(cached.variants)
+        self.report[f"{cache.name}_skipped"] += cache.variants_per_key - max(missing, 0)
+
+        for _ in range(missing):
+            async with self._gpt_semaphore:
+                await cache.generate_variant(
+                    word=word,
+                    translation=translation,
+                    priority=LLMPriorities.BACKGROUND,
+                )
+            self.report[f"{cache.name}_generated"] += 1
+
+    async def fill_voice_assets(self, sentence: str) -> str | None:
+        text = self.get_voice_text(sentence=sentence)
+        if text is None:
+            self.report["voice_too_long"] += 1
+            return None
+
+        if VoiceAssetStore.exists(text=text):
+            self.report["voice_skipped"] += 1
+        else:
+            async with self._media_semaphore:
+                ogg_bytes = await synthesize_voice(text=text)
+            await asyncio.to_thread(VoiceAssetStore.put, text, ogg_bytes)
+            self.report["voice_generated"] += 1
+
+        return escape(text)
+
+    async def fill_translations(self, caption_texts: list[str]) -> bool:
+        caption_texts = list(dict.fromkeys(caption_texts))
+        cached = translation_service.get_cached_many(texts=caption_texts)
+        self.report["translation_skipped"] += len(cached)
+
+        missing = [text for text in caption_texts if text not in cached]
+        if not missing:
+            return True
+
+        try:
+            await translation_service.translate_many(texts=missing)
+            self.report["translation_generated"] += len(missing)
+        except Exception as e:
+            logging.warning("Pregeneration translation batch failed: %s", e)
+            self.report["translation_failed"] += len(missing)
+            return False
+
+        return True
+
+    async def pregenerate_word(
+            self, word: str, translation: str
+    ) -> tuple[list[str], bool]:
+        caption_texts = []
+        try:
+            await self.fill_generation_cache(
+                cache=hint_cache, word=word, translation=translation
+            )
+            await self.fill_generation_cache(
+                cache=sentence_cache, word=word, translation=translation
+            )
+
+            sentences = sentence_cache.get_cached_variants(
+                word=word, translation=translation
+            ).variants
+            for sentence in sentences:
+                caption_text = await self.fill_voice_assets(sentence=sentence)
+                if caption_text:
+                    caption_texts.append(caption_text)
+
+            self.report["words_done"] += 1
+        except Exception as e:
+            logging.warning("Pregeneration failed for %r: %s", word, e)
+            self.report["words_failed"] += 1
+            return caption_texts, False
+
+        return caption_texts, True
+
+    async def pregenerate_deck(
+            self, file_name: str, word_pairs: list[tuple[str, str]], restart: bool
+    ):
+        cursor_key = self.make_cursor_key(file_name=file_name)
+        if restart:
+            generation_redis_client.delete(cursor_key)
+
+        start = int(generation_redis_client.get(cursor_key) or 0)
+        self.report["words_resumed_past"] += start
+
+        # The cursor only moves past a contiguous run of fully generated chunks,
+        # so words that failed are retried on the next run.
+        cursor_blocked = False
+        for chunk_start in range(start, len(word_pairs), self.chunk_size):
+            chunk = word_pairs[chunk_start:chunk_start + self.chunk_size]
+            chunk_results = await asyncio.gather(
+                *(
+                    self.pregenerate_word(word=word, translation=translation)
+                    for word, translation in chunk
+                )
+            )
+            translated = await self.fill_translations(
+                caption_texts=[
+                    text for captions, _ in chunk_results for text in captions
+                ]
+            )
+
+            chunk_end = chunk_start + len(chunk)
+            if not translated or not all(done for _, done in chunk_results):
+                cursor_blocked = True
+                self.report["chunks_incomplete"] += 1
+            elif not cursor_blocked:
+                generation_redis_client.set(
+                    name=cursor_key,
+                    value=chunk_end,
+                    ex=GENERATION_CACHE_LIVES_IN_SEC,
+                )
+            logging.info(
+                "Pregeneration %s: %s/%s words, %s",
+                file_name,
+                chunk_end,
+                len(word_pairs),
+                dict(self.report),
+            )
+
+        if not cursor_blocked:
+            generation_redis_client.delete(cursor_key)
+
+    def estimate_word(self, word: str, translation: str) -> Counter:
+        estimate = Counter()
+
+        for cache in (hint_cache, sentence_cache):
+            cached = cache.get_cached_variants(word=word, translation=translation)
+            missing = max(cache.variants_per_key - len(cached.variants), 0)
+            prompt_tokens = (
+                len(cache.prompt(current_word=word, translation=translation))
+                // GPT_ESTIMATED_CHARACTERS_PER_TOKEN
+            )
+            estimate["gpt_calls"] += missing
+            estimate["gpt_prompt_tokens"] += missing * prompt_tokens
+            estimate["gpt_completion_tokens"] += (
+                missing * GPT_ESTIMATED_COMPLETION_TOKENS
+            )
+
+        sentences = sentence_cache.get_cached_variants(
+            word=word, translation=translation
+        ).variants
+        missing_sentences = sentence_cache.variants_per_key - len(sentences)
+        estimate["tts_calls"] += missing_sentences
+        estimate["deepl_characters"] += missing_sentences * ESTIMATED_SENTENCE_CHARACTERS
+
+        for sentence in sentences:
+            text = self.get_voice_text(sentence=sentence)
+            if text is None:
+                continue
+
+            if not VoiceAssetStore.exists(text=text):
+                estimate["tts_calls"] += 1
+            if translation_service.get_cached(text=escape(text)) is None:
+                estimate["deepl_characters"] += len(text)
+
+        return estimate
+
+    def estimate(self, decks: dict[str, list[tuple[str, str]]]) -> dict:
+        estimate = Counter()
+        for word_pairs in decks.values():
+            for word, translation in word_pairs:
+                estimate.update(self.estimate_word(word=word, translation=translation))
+
+        gpt_cost = (
+            estimate["gpt_prompt_tokens"] / 1000 * GPT_PROMPT_PRICE_PER_1K_TOKENS_USD
+            + estimate["gpt_completion_tokens"]
+            / 1000
+            * GPT_COMPLETION_PRICE_PER_1K_TOKENS_USD
+        )
+        deepl_cost = estimate["deepl_characters"] * DEEPL_PRICE_PER_CHARACTER_USD
+
+        return {
+            **estimate,
+            "gpt_cost_usd": round(gpt_cost, 4),
+            "deepl_cost_usd": round(deepl_cost, 4),
+            "total_cost_usd": round(gpt_cost + deepl_cost, 4),
+        }
+
+    async def run(self, dry_run: bool = False, restart: bool = False) -> dict:
+        started = time.perf_counter()
+        decks = {
+            file_name: read_word_pairs(file_path=Path(PATH_TO_WORD_FILES) / file_name)
+            for file_name in BUILT_IN_WORD_FILES
+        }
+
+        if dry_run:
+            estimate = self.estimate(decks=decks)
+            logging.info("Pregeneration dry run estimate: %s", estimate)
+            return estimate
+
+        for file_name, word_pairs in decks.items():
+            await self.pregenerate_deck(
+                file_name=file_name, word_pairs=word_pairs, restart=restart
+            )
+
+        report = {
+            **self.report,
+            "words_total": sum(len(word_pairs) for word_pairs in decks.values()),
+            "run_seconds": round(time.perf_counter() - started, 2),
+        }
+        logging.info("Pregeneration report: %s", report)
+        return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Pregenerate hints, sentences, translations and voices for built-in decks"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only estimate the cost")
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore saved progress cursors"
+    )
+    parser.add_argument("--chunk-size", type=int, default=PREGENERATION_CHUNK_SIZE)
+    parser.add_argument(
+        "--gpt-concurrency", type=int, default=PREGENERATION_GPT_CONCURRENCY
+    )
+    parser.add_argument(
+        "--media-concurrency", type=int, default=PREGENERATION_MEDIA_CONCURRENCY
+    )
+    arguments = parser.parse_args()
+
+    async def run_pregeneration() -> dict:
+        pregenerator = BuiltInDeckPregenerator(
+            chunk_size=arguments.chunk_size,
+            gpt_concurrency=arguments.gpt_concurrency,
+            media_concurrency=arguments.media_concurrency,
+        )
+        return await pregenerator.run(
+            dry_run=arguments.dry_run, restart=arguments.restart
+        )
+
+    pregeneration_report = asyncio.run(run_pregeneration())
+    print(json.dumps(pregeneration_report, ensure_ascii=False, indent=2))
@@ -0,0 +1,261 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import pytz
+from redis.client import Pipeline
+
+from config.stats_config import STATS_DAY_LIVES_IN_SEC, STATS_TIMEZONE
+from services.cache_service.cache_service import activity_redis_client
+from services.cache_service.schemas import CacheKeyPrefixes
+
+STATS_COUNTER_FIELDS = ("answered", "correct", "wrong", "hints", "listens", "skips")
+ANSWER_OUTCOMES = {"correct", "wrong"}
+STATS_READ_BATCH_SIZE = 500
+DAY_FIELD_PREFIX = "day"
+
+
+def get_stats_day(moment: datetime | None = None) -> date:
+    moment = moment or datetime.now(pytz.UTC)
+    return moment.astimezone(pytz.timezone(STATS_TIMEZONE)).date()
+
+
+@dataclass
+class UserStatsSnapshot:
+    today: dict[str, int]
+    total: dict[str, int]
+    distinct_words_today: int
+    distinct_words_total: int
+    streak: int
+    best_streak: int
+
+    @property
+    def correct_rate_today(self) -> float:
+        if not self.today["answered"]:
+            return 0.0
+
+        return self.today["correct"] / self.today["answered"]
+
+    @property
+    def correct_rate_total(self) -> float:
+        if not self.total["answered"]:
+            return 0.0
+
+        return self.total["correct"] / self.total["answered"]
+
+
+def parse_counters(values: dict) -> dict[str, int]:
+    return {field: int(values.get(field, 0)) for field in STATS_COUNTER_FIELDS}
+
+
+def extend_streak(
+        streak: int,
+        best_streak: int,
+        streak_end: date | None,
+        days: list[date],
+        today: date,
+) -> tuple[int, int]:
+    for day in sorted(days):
+        if streak_end is not None and day <= streak_end:
+            continue
+
+        streak = streak + 1 if streak_end == day - timedelta(days=1) else 1
+        best_streak = max(best_streak, streak)
+        streak_end = day
+
+    if streak_end is None or streak_end < today - timedelta(days=1):
+        streak = 0
+
+    return streak, best_streak
+
+
+def make_day_field(day: date, field: str) -> str:
+    return f"{DAY_FIELD_PREFIX}:{day.isoformat()}:{field}"
+
+
+def split_summary(values: dict) -> tuple[dict[str, int], dict[date, dict[str, int]]]:
+    pending_days: dict[date, dict[str, int]] = {}
+    for field, value in values.items():
+        if not field.startswith(f"{DAY_FIELD_PREFIX}:"):
+            continue
+
+        _, day, counter = field.split(":")
+        counters = pending_days.setdefault(
+            date.fromisoformat(day), parse_counters(values={})
+        )
+        counters[counter] = int(value)
+
+    return parse_counters(values=values), pending_days
+
+
+class UserStatsStore:
+    prefix = CacheKeyPrefixes.USER_STATS.value
+    days_key = f"{prefix}:days"
+
+    @classmethod
+    def make_summary_key(cls, user_id: int) -> str:
+        return f"{cls.prefix}:{user_id}"
+
+    @classmethod
+    def make_words_key(cls, user_id: int) -> str:
+        return f"{cls.prefix}:{user_id}:words"
+
+    @classmethod
+    def make_day_words_key(cls, day: date, user_id: int) -> str:
+        return f"{cls.prefix}:day:{day.isoformat()}:{user_id}:words"
+
+    @classmethod
+    def make_day_users_key(cls, day: date) -> str:
+        return f"{cls.prefix}:day:{day.isoformat()}:users"
+
+    @classmethod
+    def record(
+            cls, pipeline: Pipeline, user_id: int, outcome: str, word: str | None = None
+    ):
+        day = get_stats_day()
+        summary_key = cls.make_summary_key(user_id=user_id)
+        day_words_key = cls.make_day_words_key(day=day, user_id=user_id)
+        day_users_key = cls.make_day_users_key(day=day)
+
+        for field in [outcome, "answered"] if outcome in ANSWER_OUTCOMES else [outcome]:
+            pipeline.hincrby(summary_key, make_day_field(day=day, field=field), 1)
+        if word:
+            pipeline.pfadd(day_words_key, word)
+            pipeline.expire(day_words_key, STATS_DAY_LIVES_IN_SEC)
+            pipeline.pfadd(cls.make_words_key(user_id=user_id), word)
+        pipeline.sadd(day_users_key, user_id)
+        pipeline.expire(day_users_key, STATS_DAY_LIVES_IN_SEC)
+        pipeline.zadd(cls.days_key, {day.isoformat(): day.toordinal()})
+
+    @classmethod
+    def get_snapshot(cls, user_id: int) -> UserStatsSnapshot | None:
+        today = get_stats_day()
+        pipeline = activity_redis_client.pipeline(transaction=False)
+        pipeline.hgetall(cls.make_summary_key(user_id=user_id))
+        pipeline.pfcount(cls.make_day_words_key(day=today, user_id=user_id))
+        pipeline.pfcount(cls.make_words_key(user_id=user_id))
+        summary, distinct_words_today, distinct_words_total = pipeline.execute()
+
+        if "synced" not in summary:
+            return None
+
+        total, pending_days = split_summary(values=summary)
+        for counters in pending_days.values():
+            for field in STATS_COUNTER_FIELDS:
+                total[field] += counters[field]
+
+        streak_end = summary.get("streak_end")
+        streak, best_streak = extend_streak(
+            streak=int(summary.get("streak", 0)),
+            best_streak=int(summary.get("best_streak", 0)),
+            streak_end=date.fromisoformat(streak_end) if streak_end else None,
+            days=list(pending_days),
+            today=today,
+        )
+
+        return UserStatsSnapshot(
+            today=pending_days.get(today, parse_counters(values={})),
+            total=total,
+            distinct_words_today=distinct_words_today,
+            distinct_words_total=distinct_words_total,
+            streak=streak,
+            best_streak=best_streak,
+        )
+
+    @classmethod
+    def reconcile(
+            cls, histories: dict[int, list[dict]], compacted_day: date | None = None
+    ):
+        pipeline = activity_redis_client.pipeline(transaction=True)
+        for user_id, history in histories.items():
+            days = [row["day"] for row in history]
+            streak, best_streak = (
+                extend_streak(
+                    streak=0, best_streak=0, streak_end=None, days=days, today=max(days)
+                )
+                if days
+                else (0, 0)
+            )
+            summary = {
+                field: sum(row[field] for row in history)
+                for field in STATS_COUNTER_FIELDS
+            }
+            summary.update(streak=streak, best_streak=best_streak, synced=1)
+            if days:
+                summary["streak_end"] = max(days).isoformat()
+
+            summary_key = cls.make_summary_key(user_id=user_id)
+            pipeline.hset(summary_key, mapping=summary)
+            if compacted_day:
+                pipeline.hdel(
+                    summary_key,
+                    *(
+                        make_day_field(day=compacted_day, field=field)
+                        for field in STATS_COUNTER_FIELDS
+                    ),
+                )
+        pipeline.execute()
+
+    @classmethod
+    def get_pending_days(cls, before: date) -> list[date]:
+        days = activity_redis_client.zrangebyscore(
+            cls.days_key, 0, before.toordinal() - 1
+        )
+        return [date.fromisoformat(day) for day in days]
+
+    @classmethod
+    def get_day_user_ids(cls, day: date) -> list[int]:
+        return sorted(
+            int(user_id)
+            for user_id in activity_redis_client.smembers(
+                cls.make_day_users_key(day=day)
+            )
+        )
+
+    @classmethod
+    def read_day(cls, day: date) -> list[dict]:
+        user_ids = cls.get_day_user_ids(day=day)
+        day_fields = [
+            make_day_field(day=day, field=field) for field in STATS_COUNTER_FIELDS
+        ]
+
+        rows = []
+        for start in range(0, len(user_ids), STATS_READ_BATCH_SIZE):
+            batch = user_ids[start:start + STATS_READ_BATCH_SIZE]
+            pipeline = activity_redis_client.pipeline(transaction=False)
+            for user_id in batch:
+                pipeline.hmget(cls.make_summary_key(user_id=user_id), day_fields)
+                pipeline.pfcount(cls.make_day_words_key(day=day, user_id=user_id))
+            results = pipeline.execute()
+
+            for index, user_id in enumerate(batch):
+                values, distinct_words = results[2 * index], results[2 * index + 1]
+                if not any(values):
+                    continue
+
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        "day": day,
+                        **{
+                            field: int(value or 0)
+                            for field, value in zip(STATS_COUNTER_FIELDS, values)
+                        },
+                        "distinct_words": distinct_words,
+                    }
+                )
+
+        return rows
+
+    @classmethod
+    def drop_day(cls, day: date):
+        user_ids = cls.get_day_user_ids(day=day)
+        for start in range(0, len(user_ids), STATS_READ_BATCH_SIZE):
+            activity_redis_client.delete(
+                *(
+                    cls.make_day_words_key(day=day, user_id=user_id)
+                    for user_id in user_ids[start:start + STATS_READ_BATCH_SIZE]
+                )
+            )
+
+        activity_redis_client.delete(cls.make_day_users_key(day=day))
+        activity_redis_client.zrem(cls.days_key, day.isoformat())
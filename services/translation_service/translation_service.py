@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import deepl
+from redis.exceptions import RedisError
+
+from config.deepl_config import DEEPL_TOKEN
+from services.cache_service.cache_service import (
+    generation_redis_client,
+    GENERATION_CACHE_LIVES_IN_SEC,
+)
+from services.cache_service.schemas import CacheKeyPrefixes
+from services.metrics import get_metrics
+
+TRANSLATION_TARGET_LANG = "UK"
+TRANSLATION_L1_MAX_KEYS = 10000
+DEEPL_BATCH_MAX_TEXTS = 50
+
+translation_metrics = get_metrics(name="translation", log_every=500)
+
+_deepl_translator: deepl.Translator | None = None
+_deepl_translator_lock = threading.Lock()
+
+
+def get_deepl_translator() -> deepl.Translator:
+    global _deepl_translator
+
+    with _deepl_translator_lock:
+        if _deepl_translator is None:
+            _deepl_translator = deepl.Translator(DEEPL_TOKEN)
+
+    return _deepl_translator
+
+
+class TranslationStore:
+    @staticmethod
+    def make_key(text: str, target_lang: str) -> str:
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        return f"{CacheKeyPrefixes.TRANSLATION.value}:{target_lang}:{digest}"
+
+    @classmethod
+    def get_many(cls, texts: list[str], target_lang: str) -> list[str | None]:
+        try:
+            return generation_redis_client.mget(
+                [cls.make_key(text=text, target_lang=target_lang) for text in texts]
+            )
+        except RedisError as e:
+            logging.warning("Translation cache read failed: %s", e)
+            translation_metrics.incr(key="redis_errors")
+            return [None] * len(texts)
+
+    @classmethod
+    def put_many(cls, translations: dict[str, str], target_lang: str):
+        try:
+            pipeline = generation_redis_client.pipeline(transaction=False)
+            for text, translated in translations.items():
+                pipeline.set(
+                    name=cls.make_key(text=text, target_lang=target_lang),
+                    value=translated,
+                    ex=GENERATION_CACHE_LIVES_IN_SEC,
+                )
+            pipeline.execute()
+        except RedisError as e:
+            logging.warning("Translation cache write failed: %s", e)
+            translation_metrics.incr(key="redis_errors")
+
+
+class TranslationService:
+    def __init__(self, l1_max_keys: int = TRANSLATION_L1_MAX_KEYS):
+        self._l1_max_keys = l1_max_keys
+        self._l1: OrderedDict[tuple[str, str], str] = OrderedDict()
+
+    def _remember(self, text: str, target_lang: str, translated: str):
+        key = (text, target_lang)
+        self._l1[key] = translated
+        self._l1.move_to_end(key)
+
+        while len(self._l1) > self._l1_max_keys:
+            self._l1.popitem(last=False)
+
+    def get_cached_many(
+            self, texts: list[str], target_lang: str = TRANSLATION_TARGET_LANG
+    ) -> dict[str, str]:
+        cached = {}
+        redis_texts = []
+        for text in dict.fromkeys(texts):
+            translated = self._l1.get((text, target_lang))
+            if translated is None:
+                redis_texts.append(text)
+                continue
+
+            self._l1.move_to_end((text, target_lang))
+            translation_metrics.incr(key="l1_hits")
+            cached[text] = translated
+
+        if redis_texts:
+            stored = TranslationStore.get_many(texts=redis_texts, target_lang=target_lang)
+            for text, translated in zip(redis_texts, stored):
+                if translated is None:
+                    continue
+
+                translation_metrics.incr(key="redis_hits")
+                self._remember(text=text, target_lang=target_lang, translated=translated)
+                cached[text] = translated
+
+        return cached
+
+    def get_cached(
+            self, text: str, target_lang: str = TRANSLATION_TARGET_LANG
+    ) -> str | None:
+        return self.get_cached_many(texts=[text], target_lang=target_lang).get(text)
+
+    @staticmethod
+    def _translate_with_deepl(texts: list[str], target_lang: str) -> list[str]:
+        results = get_deepl_translator().translate_text(
+            text=texts, target_lang=target_lang
+        )
+        return [str(result) for result in results]
+
+    async def translate_many(
+            self, texts: list[str], target_lang: str = TRANSLATION_TARGET_LANG
+    ) -> list[str]:
+        translations = self.get_cached_many(texts=texts, target_lang=target_lang)
+        missing = [text for text in dict.fromkeys(texts) if text not in translations]
+        translation_metrics.incr(key="misses", amount=len(missing))
+
+        for start in range(0, len(missing), DEEPL_BATCH_MAX_TEXTS):
+            batch = missing[start:start + DEEPL_BATCH_MAX_TEXTS]
+            with translation_metrics.timer(key="deepl"):
+                translated_batch = await asyncio.to_thread(
+                    self._translate_with_deepl, batch, target_lang
+                )
+            translation_metrics.incr(key="deepl_requests")
+
+            fresh = dict(zip(batch, translated_batch))
+            TranslationStore.put_many(translations=fresh, target_lang=target_lang)
+            for text, translated in fresh.items():
+                self._remember(text=text, target_lang=target_lang, translated=translated)
+            translations.update(fresh)
+
+        return [translations[text] for text in texts]
+
+    async def translate(
+            self, text: str, target_lang: str = TRANSLATION_TARGET_LANG
+    ) -> str:
+        with translation_metrics.timer(key="translate"):
+            translations = await self.translate_many(texts=[text], target_lang=target_lang)
+
+        return translations[0]
+
+    @staticmethod
+    def get_hit_ratio() -> float:
+        hits = translation_metrics.count("l1_hits") + translation_metrics.count("redis_hits")
+        total = hits + translation_metrics.count("misses")
+        if not total:
+            return 0.0
+
+        return hits / total
+
+
+translation_service = TranslationService()
@@ -17,3 +17,13 @@ def mask_word(word: str) -> str:
 def escape_markdown_v2(text: str) -> str:
     escape_chars = r"_*[]()~`>#+-=|{}.!"
     return "".join("\\" + c if c in escape_chars else c for c in text)
+
+
+def normalize_apostrophes(text: str) -> str:
+    return (
+        text.replace("ʼ", "'")
+        .replace("’", "'")
+        .replace("‘", "'")
+        .replace("`", "'")
+        .replace("ʹ", "'")
+    )
@@ -0,0 +1,27 @@
+import pytest
+
+from constants.exceptions import NotValidDeckFormat
+from services.deck_service.compiled_deck import CompiledDeck, DECK_HEADER
+
+DECK = CompiledDeck.compile(
+    [("to look forward to", "з нетерпінням чекати"), ("apple", "яблуко")]
+)
+
+
+def test_round_trip():
+    assert CompiledDeck.from_bytes(DECK.to_bytes()) == DECK
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        DECK_HEADER.size - 1,
+        DECK_HEADER.size,
+        DECK_HEADER.size + 4 * 3,
+        DECK_HEADER.size + 4 * 4,
+        len(DECK.to_bytes()) - 1,
+    ],
+)
+def test_truncated_blob(size):
+    with pytest.raises(NotValidDeckFormat):
+        CompiledDeck.from_bytes(DECK.to_bytes()[:size])